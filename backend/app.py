@@ -1,6 +1,5 @@
 import asyncio
 import json
-import math
 import os
 import sys
 from datetime import datetime
@@ -20,7 +19,7 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from src.grid_topology.load_france_grid import load_france_grid
-from src.load_data.load_profile_fr import load_fr_load_profile
+from src.load_data.load_profile_fr import load_fr_load_profile, pv_shape_from_timestamp
 from src.attacks.attack_fr import apply_attack_to_pv
 
 app = FastAPI()
@@ -33,14 +32,6 @@ app.add_middleware(
 )
 
 
-def pv_shape_from_timestamp(ts: pd.Timestamp) -> float:
-    hour = ts.hour + ts.minute / 60.0
-    if hour <= 6 or hour >= 18:
-        return 0.0
-    x = (hour - 6) / 12.0 * math.pi
-    return max(0.0, min(1.0, math.sin(x)))
-
-
 class SimulationState:
     def __init__(self):
         self.net = load_france_grid()
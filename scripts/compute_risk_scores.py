@@ -1,10 +1,8 @@
-import math
 import os
 import sys
 from pathlib import Path
 
 import pandas as pd
-import pandapower as pp
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
@@ -12,58 +10,30 @@ if str(ROOT) not in sys.path:
 
 from src.grid_topology.load_france_grid import load_france_grid
 from src.load_data.load_profile_fr import load_fr_load_profile
-from src.attacks.attack_fr import apply_attack_to_pv
+from src.onset_sweep import run_onset_sweep
+from src.timeseries import run_timeseries
 
 
 ATTACK_CSV = "data/france_sprint3/fr_attack_scenarios_S1_S5.csv"
 OUT_CSV = "results/risk_scores_S1_S5.csv"
+ONSET_CSV = "results/risk_by_onset_S1_S5.csv"
+ATTACK_TIME = "2026-02-04 12:00:00"
 
 P_SYS_GW = 100.0
 SENS_10pct = 0.5  # Hz drop for 10% loss
 
 
-def pv_shape_from_timestamp(ts: pd.Timestamp) -> float:
-    hour = ts.hour + ts.minute / 60.0
-    if hour <= 6 or hour >= 18:
-        return 0.0
-    x = (hour - 6) / 12.0 * math.pi
-    return max(0.0, min(1.0, math.sin(x)))
-
-
-def compute_metrics_for_scenario(scenario: str) -> dict:
+def compute_metrics_for_scenario(scenario: str, attack_time_str: str = ATTACK_TIME) -> dict:
     net = load_france_grid()
-    base_load = net.load["p_mw"].copy()
-    base_pv = net.sgen["p_mw"].copy()
     profile = load_fr_load_profile()
-    attack_time = pd.to_datetime("2026-02-04 12:00:00")
-
-    max_line_loading = 0.0
-    min_vm = 10.0
-    max_vm = 0.0
-    fleet_multiplier = 1.0
-    attack_applied = False
-
-    for _, row in profile.iterrows():
-        ts = row["timestamp"]
-        mult = row["load_multiplier"]
-        net.load["p_mw"] = base_load * mult
-
-        if (not attack_applied) and (ts == attack_time):
-            fleet_multiplier = apply_attack_to_pv(net, scenario)
-            attack_applied = True
-
-        pv_shape = pv_shape_from_timestamp(ts)
-        net.sgen["p_mw"] = base_pv * pv_shape * fleet_multiplier
-        pp.runpp(net)
+    attack_time = pd.to_datetime(attack_time_str)
 
-        max_line_loading = max(max_line_loading, net.res_line["loading_percent"].max())
-        min_vm = min(min_vm, net.res_bus["vm_pu"].min())
-        max_vm = max(max_vm, net.res_bus["vm_pu"].max())
+    df = run_timeseries(net, profile, attack_time, scenario=scenario, with_attack=True)
 
     return {
-        "max_line_loading": max_line_loading,
-        "min_vm": min_vm,
-        "max_vm": max_vm,
+        "max_line_loading": df["max_line_loading"].max(),
+        "min_vm": df["min_vm_pu"].min(),
+        "max_vm": df["max_vm_pu"].max(),
     }
 
 
@@ -107,6 +77,32 @@ def estimate_delta_f(affected_power_gw: float, change_pct_of_affected: float) ->
     return -SENS_10pct * (fraction_lost / 0.10)
 
 
+def risk_by_onset(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Time-of-day risk profile: impact and risk score for every
+    (scenario, onset) pair, from one onset sweep instead of 480 full days.
+    """
+    sweep, info = run_onset_sweep(load_france_grid(), load_fr_load_profile(), scenarios=df["scenario"].tolist())
+    print(f"Onset sweep: {info['n_solves']} power flows (naive: {info['naive_solves']})")
+
+    scen = df.set_index("scenario")
+    impacts = []
+    for _, row in sweep.iterrows():
+        info_row = scen.loc[row["scenario"]]
+        delta_f = estimate_delta_f(info_row["affected_power_gw"], info_row["change_pct_of_affected"])
+        metrics = {
+            "max_line_loading": row["max_line_loading"],
+            "min_vm": row["min_vm_pu"],
+            "max_vm": row["max_vm_pu"],
+        }
+        impacts.append(impact_from_metrics(metrics, delta_f))
+
+    sweep["impact"] = impacts
+    sweep["likelihood"] = sweep["scenario"].map(scen["likelihood"])
+    sweep["risk_score"] = sweep["impact"] * sweep["likelihood"]
+    return sweep
+
+
 def main():
     df = pd.read_csv(ATTACK_CSV)
 
@@ -130,6 +126,11 @@ def main():
     out.to_csv(OUT_CSV, index=False)
     print(f"Saved risk scores to {OUT_CSV}")
 
+    if "--onset-sweep" in sys.argv[1:]:
+        by_onset = risk_by_onset(df)
+        by_onset.to_csv(ONSET_CSV, index=False)
+        print(f"Saved time-of-day risk profile to {ONSET_CSV}")
+
 
 if __name__ == "__main__":
     main()
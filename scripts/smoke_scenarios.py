@@ -3,17 +3,10 @@ import pandas as pd
 import pandapower as pp
 
 from src.grid_topology.load_france_grid import load_france_grid
-from src.load_data.load_profile_fr import load_fr_load_profile
+from src.load_data.load_profile_fr import load_fr_load_profile, pv_shape_from_timestamp
 from src.attacks.attack_fr import apply_attack_to_pv
 
 
-def pv_shape_from_timestamp(ts: pd.Timestamp) -> float:
-    hour = ts.hour + ts.minute / 60.0
-    if hour <= 6 or hour >= 18:
-        return 0.0
-    return max(0.0, min(1.0, __import__("math").sin((hour - 6) / 12.0 * __import__("math").pi)))
-
-
 def main():
     scenarios = ["S1", "S2", "S3", "S4", "S5"]
     net = load_france_grid()
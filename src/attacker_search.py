@@ -0,0 +1,263 @@
+"""
+Worst-case attacker search over compromised PV subsets.
+
+apply_attack_to_pv models a uniform fleet multiplier; here the attacker picks
+which PV_AGG_* sgens to compromise under a capacity budget (MW of rated PV)
+so as to maximize the voltage deviation or the line loading at a snapshot.
+
+The search is a beam search: every level extends each beam by one more sgen,
+ranks the children with linearized sensitivities around the base operating
+point, and only the most promising ones are verified with an AC solve. All
+AC solves of a level go through the Z-bus solver as one batch and are
+cached per subset. beam_width=1 is the plain greedy search. For small fleets
+the exhaustive search is run too, so the report includes the cost against
+brute force and the optimality gap.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from src.config import SimulationConfig
+from src.grid_topology.load_france_grid import load_france_grid
+from src.load_data.load_profile_fr import load_fr_load_profile, pv_shape
+from src.powerflow.network import NetworkModel
+from src.powerflow.sensitivity import Sensitivities
+from src.powerflow.zbus import ZBusSolver
+
+OBJECTIVES = ("voltage_deviation", "line_loading")
+
+# Largest fleet for which the exhaustive search is run for comparison.
+MAX_BRUTE_FORCE_SGENS = 16
+
+# Largest fleet for which the subsets within the budget are counted.
+MAX_COUNTED_SGENS = 40
+
+
+@dataclass
+class AttackSearchResult:
+    compromised: list
+    objective: float
+    capacity_mw: float
+    n_evaluations: int
+    brute_force_evaluations: int          # subsets within the budget (None if too many sgens to count)
+    brute_force_objective: float = None
+    history: list = field(default_factory=list)
+
+
+class AttackEvaluator:
+    """
+    AC objective of compromised-sgen masks at one operating point,
+    batched and memoized per mask. Masks whose power flow does not converge
+    score -inf, so the searches never pick them.
+    """
+
+    def __init__(self, net, load_p_mw, sgen_p_mw, objective: str = "voltage_deviation",
+                 change_pct: float = -100.0):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"objective must be one of {OBJECTIVES}")
+        self.model = NetworkModel.from_net(net)
+        self.solver = ZBusSolver(self.model)
+        self.load_p = np.asarray(load_p_mw, dtype=float)
+        self.sgen_p = np.asarray(sgen_p_mw, dtype=float)
+        self.objective = objective
+        self.change_frac = change_pct / 100.0
+        self.cache = {}
+        self.n_evaluations = 0
+
+        S0 = self.model.bus_injections(self.load_p, self.sgen_p)
+        V0, converged = self.solver.solve(S0)
+        if not converged[0]:
+            raise ValueError("base operating point did not converge")
+        self.V0 = V0[0]
+        self.base_objective = self._score(V0)[0]
+        self.sens = Sensitivities(self.solver, self.V0, S0[0])
+
+    def _score(self, V) -> np.ndarray:
+        if self.objective == "voltage_deviation":
+            return np.nanmax(np.abs(np.abs(V) - 1.0), axis=-1)
+        return self.model.line_loading(V).max(axis=-1)
+
+    def evaluate(self, masks) -> np.ndarray:
+        """AC objective for each boolean mask (B × n_sgen); new masks are solved as one batch."""
+        masks = np.atleast_2d(np.asarray(masks, dtype=bool))
+        keys = [m.tobytes() for m in masks]
+        new = [k for k in dict.fromkeys(keys) if k not in self.cache]
+
+        if new:
+            new_masks = np.array([np.frombuffer(k, dtype=bool) for k in new])
+            sgen = self.sgen_p * (1.0 + self.change_frac * new_masks)
+            V, converged = self.solver.solve(self.model.bus_injections(self.load_p, sgen),
+                                             V0=np.repeat(self.V0[None, :], len(new), axis=0))
+            scores = np.where(converged, self._score(V), -np.inf)
+            for k, score in zip(new, scores):
+                self.cache[k] = float(score)
+            self.n_evaluations += len(new)
+
+        return np.array([self.cache[k] for k in keys])
+
+    def predict(self, masks) -> np.ndarray:
+        """Linearized objective for each mask, from sensitivities at the base point."""
+        masks = np.atleast_2d(np.asarray(masks, dtype=bool))
+        dP = self.change_frac * self.sgen_p[None, :] * masks / self.model.sn_mva
+        buses = self.model.sgen_bus
+        if self.objective == "voltage_deviation":
+            vm = np.abs(self.V0) + dP @ self.sens.dVm(buses).T
+            return np.nanmax(np.abs(vm - 1.0), axis=-1)
+        loading = self.model.line_loading(self.V0) + dP @ self.sens.dLoading(buses).T
+        return loading.max(axis=-1)
+
+
+def beam_search(evaluator: AttackEvaluator, rated_mw, budget_mw: float,
+                beam_width: int = 3, expand: int = 4):
+    """
+    Returns (best_mask, best_objective, history). At each level at most
+    beam_width * expand children (ranked by evaluator.predict) are verified
+    with AC solves.
+    """
+    rated_mw = np.asarray(rated_mw, dtype=float)
+    n = len(rated_mw)
+    beams = [np.zeros(n, dtype=bool)]
+    best_mask, best_obj = beams[0], evaluator.evaluate(beams[0])[0]
+    history = []
+
+    while beams:
+        children = {}
+        for mask in beams:
+            used = rated_mw[mask].sum()
+            for j in np.flatnonzero(~mask):
+                if used + rated_mw[j] <= budget_mw + 1e-12:
+                    child = mask.copy()
+                    child[j] = True
+                    children[child.tobytes()] = child
+        if not children:
+            break
+
+        cand = np.array(list(children.values()))
+        keep = np.argsort(-evaluator.predict(cand))[:beam_width * expand]
+        cand = cand[keep]
+        scores = evaluator.evaluate(cand)
+
+        order = np.argsort(-scores)[:beam_width]
+        beams = [cand[i] for i in order]
+        history.append({"level": len(history) + 1, "candidates": len(children),
+                        "verified": len(cand), "best_level_objective": float(scores[order[0]])})
+        if scores[order[0]] > best_obj:
+            best_mask, best_obj = cand[order[0]], float(scores[order[0]])
+
+    return best_mask, best_obj, history
+
+
+def brute_force(evaluator: AttackEvaluator, rated_mw, budget_mw: float, batch: int = 4096):
+    """Exhaustive search over every subset within the budget."""
+    rated_mw = np.asarray(rated_mw, dtype=float)
+    n = len(rated_mw)
+    best_mask, best_obj = np.zeros(n, dtype=bool), -np.inf
+    for start in range(0, 2 ** n, batch):
+        codes = np.arange(start, min(start + batch, 2 ** n))
+        masks = ((codes[:, None] >> np.arange(n)) & 1).astype(bool)
+        masks = masks[masks @ rated_mw <= budget_mw + 1e-12]
+        if not len(masks):
+            continue
+        scores = evaluator.evaluate(masks)
+        i = int(np.argmax(scores))
+        if scores[i] > best_obj:
+            best_mask, best_obj = masks[i], float(scores[i])
+    return best_mask, best_obj
+
+
+def count_within_budget(rated_mw, budget_mw: float) -> int:
+    """
+    Number of sgen subsets (the empty one included) within the budget, the
+    candidates brute_force evaluates. Meet in the middle: subset sums of
+    each half, paired by a sorted search.
+    """
+    rated_mw = np.asarray(rated_mw, dtype=float)
+    half = len(rated_mw) // 2
+
+    def subset_sums(values):
+        sums = np.zeros(1)
+        for v in values:
+            sums = np.concatenate([sums, sums + v])
+        return sums
+
+    left, right = subset_sums(rated_mw[:half]), np.sort(subset_sums(rated_mw[half:]))
+    return int(np.searchsorted(right, budget_mw + 1e-12 - left, side="right").sum())
+
+
+def search_worst_attack(net, profile: pd.DataFrame = None, timestamp=None, budget_mw: float = None,
+                        objective: str = "voltage_deviation", change_pct: float = -100.0,
+                        beam_width: int = 3, expand: int = 4, compare_brute_force: bool = None,
+                        base_load=None, base_pv=None) -> AttackSearchResult:
+    """
+    Find the compromised PV set maximizing `objective` at `timestamp`
+    (default: the configured attack time) under `budget_mw` of rated
+    capacity (default: half the fleet).
+    """
+    profile = load_fr_load_profile() if profile is None else profile
+    timestamp = pd.to_datetime(SimulationConfig().attack_time if timestamp is None else timestamp)
+    base_load = net.load["p_mw"].to_numpy(copy=True) if base_load is None else np.asarray(base_load)
+    base_pv = net.sgen["p_mw"].to_numpy(copy=True) if base_pv is None else np.asarray(base_pv)
+    budget_mw = 0.5 * base_pv.sum() if budget_mw is None else budget_mw
+
+    row = profile.set_index("timestamp")["load_multiplier"]
+    if not row.index[0] <= timestamp <= row.index[-1]:
+        raise ValueError(f"timestamp {timestamp} is outside the profile ({row.index[0]} to {row.index[-1]})")
+    load_p = base_load * float(row.asof(timestamp))
+    sgen_p = base_pv * pv_shape([timestamp])[0]
+
+    evaluator = AttackEvaluator(net, load_p, sgen_p, objective=objective, change_pct=change_pct)
+    mask, obj, history = beam_search(evaluator, base_pv, budget_mw, beam_width=beam_width, expand=expand)
+    n_eval = evaluator.n_evaluations
+
+    n = len(base_pv)
+    if compare_brute_force is None:
+        compare_brute_force = n <= MAX_BRUTE_FORCE_SGENS
+    bf_obj = None
+    n_feasible = count_within_budget(base_pv, budget_mw) if n <= MAX_COUNTED_SGENS else None
+    if compare_brute_force:
+        _, bf_obj = brute_force(evaluator, base_pv, budget_mw)
+
+    names = net.sgen["name"].to_numpy()
+    return AttackSearchResult(
+        compromised=list(names[mask]),
+        objective=obj,
+        capacity_mw=float(base_pv[mask].sum()),
+        n_evaluations=n_eval,
+        brute_force_evaluations=n_feasible,
+        brute_force_objective=bf_obj,
+        history=history,
+    )
+
+
+def main():
+    net = load_france_grid()
+
+    print("\n=== WORST-CASE ATTACKER SEARCH (compromised PV subsets) ===")
+    rows = []
+    for objective in OBJECTIVES:
+        res = search_worst_attack(net, objective=objective)
+        rows.append({
+            "objective": objective,
+            "compromised": ";".join(res.compromised),
+            "capacity_mw": res.capacity_mw,
+            "value": res.objective,
+            "ac_evaluations": res.n_evaluations,
+            "brute_force_evaluations": res.brute_force_evaluations,
+            "brute_force_value": res.brute_force_objective,
+        })
+        print(f"\nObjective: {objective}")
+        print(f"  Compromised: {res.compromised} ({res.capacity_mw:.3f} MW)")
+        print(f"  Objective value: {res.objective:.5f}")
+        print(f"  AC evaluations: {res.n_evaluations} (brute force: {res.brute_force_evaluations})")
+        if res.brute_force_objective is not None:
+            print(f"  Brute-force optimum: {res.brute_force_objective:.5f}")
+
+    out_path = "results/worst_case_attack.csv"
+    pd.DataFrame(rows).to_csv(out_path, index=False)
+    print(f"\nSaved attacker search results to: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,53 @@
-from pathlib import Path
+import logging
 
+import numpy as np
 import pandas as pd
 
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
-ATTACK_CSV = PROJECT_ROOT / "data" / "france_sprint3" / "fr_attack_scenarios_S1_S5.csv"
+from src.attacks.catalog import ScenarioCatalog, default_catalog
+
+logger = logging.getLogger(__name__)
 
 def load_attack_scenarios():
     """Return the full attack scenarios table as a DataFrame."""
-    return pd.read_csv(ATTACK_CSV)
+    return default_catalog().to_frame()
 
-def get_scenario(scenario_name: str):
-    """Return one row (as dict) for S1, S2, ..., S5."""
-    df = load_attack_scenarios()
-    row = df[df["scenario"] == scenario_name]
-    if row.empty:
-        raise ValueError(f"Scenario {scenario_name} not found")
-    return row.iloc[0].to_dict()
+def get_scenario(scenario_name: str, catalog: ScenarioCatalog = None):
+    """Return one row (as dict) for S1, S2, ..., S5 (or a scenario of `catalog`)."""
+    return (default_catalog() if catalog is None else catalog).row(scenario_name)
 
-def apply_attack_to_pv(net, scenario_name: str) -> float:
+def apply_attack_to_pv(net, scenario_name: str, catalog: ScenarioCatalog = None) -> float:
     """
     Sprint-3 logic:
 
-    - Look up scenario S1–S5
+    - Look up scenario S1–S5 (or a scenario of `catalog`)
     - Compute a global multiplier for the PV fleet.
     - We DO NOT modify net.sgen here; instead we return the multiplier.
       The time-series loop will apply it to the PV profile at each step.
     """
-    info = get_scenario(scenario_name)
-
-    compromised_pct = info["compromised_pct"]           # e.g. 5.0 (% of fleet)
-    change_pct_of_affected = info["change_pct_of_affected"]  # usually -100
-    ramp_seconds = info["ramp_seconds"]
-
-    print(f"\n=== APPLYING ATTACK {scenario_name} ===")
-    print(f"Description: {info['description']}")
-    print(f"Compromised fleet: {compromised_pct}%")
-    print(f"Change of affected PV: {change_pct_of_affected}%")
-    print(f"Ramp (s): {ramp_seconds}")
-
-    # Total PV before the attack (peak fleet capacity, not time-series shaped)
-    total_pv_before = net.sgen["p_mw"].sum()
-    print(f"Total PV fleet capacity (before attack): {total_pv_before:.3f} MW")
-
-    frac_compromised = compromised_pct / 100.0
-    change_frac = change_pct_of_affected / 100.0      # e.g. -1.0
-    compromised_multiplier = 1.0 + change_frac        # e.g. 0.0
-
-    # Fraction of fleet unaffected + affected scaled
-    global_multiplier = (1 - frac_compromised) + frac_compromised * compromised_multiplier
-
-    total_pv_after = total_pv_before * global_multiplier
-    print(f"Effective fleet multiplier: {global_multiplier:.3f}")
-    print(f"PV fleet capacity after attack (if fully sunny): {total_pv_after:.3f} MW")
-
-    return global_multiplier
\ No newline at end of file
+    catalog = default_catalog() if catalog is None else catalog
+    i = catalog.index_of(scenario_name)[0]
+    global_multiplier = float(catalog.fleet_multipliers()[i])
+
+    if logger.isEnabledFor(logging.DEBUG):
+        total_pv_before = net.sgen["p_mw"].sum()
+        logger.debug(
+            "attack applied scenario=%s compromised_pct=%g change_pct=%g ramp_s=%g "
+            "fleet_mw=%.3f multiplier=%.3f fleet_mw_after=%.3f",
+            scenario_name, catalog.compromised_pct[i], catalog.change_pct_of_affected[i],
+            catalog.ramp_seconds[i], total_pv_before, global_multiplier, total_pv_before * global_multiplier,
+        )
+    return global_multiplier
+
+def ramp_fleet_multiplier(timestamps, attack_time, multiplier: float, ramp_seconds: float) -> np.ndarray:
+    """
+    Fleet multiplier over time for an attack that starts at `attack_time`:
+    1.0 before onset, then a linear ramp reaching `multiplier` after
+    `ramp_seconds` (a step change if ramp_seconds <= 0).
+    """
+    ts = pd.DatetimeIndex(timestamps)
+    elapsed = np.asarray((ts - pd.Timestamp(attack_time)).total_seconds(), dtype=float)
+    if ramp_seconds > 0:
+        frac = np.clip(elapsed / ramp_seconds, 0.0, 1.0)
+    else:
+        frac = (elapsed >= 0).astype(float)
+    return 1.0 + (multiplier - 1.0) * frac
@@ -1,6 +1,32 @@
+"""
+Attack schedules: every attack produces its full (T × n_sgen) PV multiplier
+array up front, so runners apply it as one array operation (see
+prepare_injections) and many variants can be stacked with batch_schedules.
+
+Attacks compose by multiplication: `a * b` (or Campaign(a, b, ...)) is an
+overlapping campaign, and attacks with an `end` recover afterwards, so
+sequences are products of time-windowed attacks.
+"""
+
 from abc import ABC, abstractmethod
+
+import numpy as np
 import pandas as pd
 
+from src.attacks.catalog import ScenarioCatalog, default_catalog
+
+
+def _elapsed_s(timestamps, t0) -> np.ndarray:
+    ts = pd.DatetimeIndex(timestamps)
+    return np.asarray((ts - pd.Timestamp(t0)).total_seconds(), dtype=float)
+
+
+def _ramp(elapsed, ramp_seconds) -> np.ndarray:
+    """0 before 0 s, linear to 1 over ramp_seconds (a step if <= 0)."""
+    if ramp_seconds > 0:
+        return np.clip(elapsed / ramp_seconds, 0.0, 1.0)
+    return (elapsed >= 0).astype(float)
+
 
 class CyberAttack(ABC):
     """
@@ -8,8 +34,99 @@ class CyberAttack(ABC):
     """
 
     @abstractmethod
-    def apply(self, net, current_time: pd.Timestamp) -> float:
+    def schedule(self, timestamps, rated_mw) -> np.ndarray:
         """
-        Applies attack logic and returns fleet multiplier.
+        PV multiplier per timestep and sgen, (T × n_sgen), for sgens with
+        ratings `rated_mw`.
         """
-        pass
\ No newline at end of file
+
+    def apply(self, current_time: pd.Timestamp, rated_mw) -> float:
+        """
+        Fleet multiplier at a single time, weighted by the sgen ratings
+        `rated_mw` (not net.sgen p_mw, which the runners overwrite with each
+        step's output). Kept for per-step callers; prefer schedule().
+        """
+        rated = np.asarray(rated_mw, dtype=float)
+        row = self.schedule([current_time], rated)[0]
+        return float(np.average(row, weights=rated)) if rated.sum() > 0 else float(row.mean())
+
+    def __mul__(self, other: "CyberAttack") -> "Campaign":
+        return Campaign(self, other)
+
+
+class Campaign(CyberAttack):
+    """Overlapping attacks: the per-unit multipliers multiply."""
+
+    def __init__(self, *attacks: CyberAttack):
+        self.attacks = []
+        for attack in attacks:
+            self.attacks.extend(attack.attacks if isinstance(attack, Campaign) else [attack])
+
+    def schedule(self, timestamps, rated_mw) -> np.ndarray:
+        out = np.ones((len(pd.DatetimeIndex(timestamps)), len(rated_mw)))
+        for attack in self.attacks:
+            out *= attack.schedule(timestamps, rated_mw)
+        return out
+
+
+class StepAttack(CyberAttack):
+    """
+    Setpoint change of the `units` mask (default: every sgen) to
+    `multiplier`, ramped over ramp_seconds from `onset`; with `end` the
+    units ramp back to 1 over the same time from `end`.
+    """
+
+    def __init__(self, onset, multiplier, ramp_seconds: float = 0.0, units=None, end=None):
+        self.onset = pd.Timestamp(onset)
+        self.multiplier = multiplier
+        self.ramp_seconds = float(ramp_seconds)
+        self.units = None if units is None else np.asarray(units, dtype=bool)
+        self.end = None if end is None else pd.Timestamp(end)
+
+    @classmethod
+    def from_scenario(cls, scenario: str, onset, rated_mw, catalog: ScenarioCatalog = None,
+                      end=None) -> "StepAttack":
+        """The catalog scenario at `onset` with its ramp and target set."""
+        catalog = default_catalog() if catalog is None else catalog
+        i = catalog.index_of(scenario)[0]
+        row = catalog.subset([i])
+        return cls(onset, row.sgen_multipliers(rated_mw)[0], catalog.ramp_seconds[i], end=end)
+
+    def schedule(self, timestamps, rated_mw) -> np.ndarray:
+        frac = _ramp(_elapsed_s(timestamps, self.onset), self.ramp_seconds)
+        if self.end is not None:
+            frac = frac * (1.0 - _ramp(_elapsed_s(timestamps, self.end), self.ramp_seconds))
+        target = np.broadcast_to(np.asarray(self.multiplier, dtype=float), (len(rated_mw),))
+        if self.units is not None:
+            target = np.where(self.units, target, 1.0)
+        return 1.0 + frac[:, None] * (target - 1.0)[None, :]
+
+
+class OscillatingAttack(CyberAttack):
+    """
+    Setpoint oscillation of the `units` between 1 and 1 - depth with
+    period_s, from `onset` until `end` (if given):
+
+        m(t) = 1 - depth * (1 - cos(2π (t - onset) / period_s)) / 2
+    """
+
+    def __init__(self, onset, depth: float, period_s: float, units=None, end=None):
+        self.onset = pd.Timestamp(onset)
+        self.depth = float(depth)
+        self.period_s = float(period_s)
+        self.units = None if units is None else np.asarray(units, dtype=bool)
+        self.end = None if end is None else pd.Timestamp(end)
+
+    def schedule(self, timestamps, rated_mw) -> np.ndarray:
+        elapsed = _elapsed_s(timestamps, self.onset)
+        active = elapsed >= 0
+        if self.end is not None:
+            active &= _elapsed_s(timestamps, self.end) < 0
+        wave = np.where(active, self.depth * (1 - np.cos(2 * np.pi * elapsed / self.period_s)) / 2, 0.0)
+        units = np.ones(len(rated_mw), dtype=bool) if self.units is None else self.units
+        return 1.0 - wave[:, None] * units[None, :]
+
+
+def batch_schedules(attacks, timestamps, rated_mw) -> np.ndarray:
+    """(K × T × n_sgen) schedules for K attack variants."""
+    return np.stack([attack.schedule(timestamps, rated_mw) for attack in attacks])
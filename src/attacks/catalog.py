@@ -0,0 +1,192 @@
+"""
+Scenario catalog: attack definitions as typed, indexed arrays.
+
+The S1–S5 table is read once per process. Parametric families
+(compromised_pct × change_pct_of_affected × ramp_seconds × target) are
+generated as Cartesian products, so catalogs with thousands of entries are
+cheap. Multipliers for every scenario in a catalog are computed in one
+vectorized call:
+
+  - fleet_multipliers():     (n,)          uniform fleet multiplier
+  - compromised_share(rated): (n × n_sgen) compromised fraction of each unit
+  - sgen_multipliers(rated): (n × n_sgen)  per-unit multiplier for the target set
+  - schedules(ts, onset):    (n × T)       fleet multiplier over time with the ramp
+
+Targets: "fleet" spreads the derating uniformly over all units (the
+Sprint-3 model), "largest"/"smallest" compromise units in order of rating,
+derating the boundary unit partially so that exactly compromised_pct of
+rated capacity is affected.
+"""
+
+import itertools
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+ATTACK_CSV = PROJECT_ROOT / "data" / "france_sprint3" / "fr_attack_scenarios_S1_S5.csv"
+
+TARGETS = ("fleet", "largest", "smallest")
+
+
+@dataclass(frozen=True)
+class ScenarioCatalog:
+    scenario: np.ndarray                  # str names, unique
+    description: np.ndarray               # str
+    affected_power_gw: np.ndarray         # float
+    compromised_pct: np.ndarray           # float, % of the fleet
+    change_pct_of_affected: np.ndarray    # float, -100 = shutdown
+    ramp_seconds: np.ndarray              # float
+    target: np.ndarray                    # str, one of TARGETS
+
+    def __post_init__(self):
+        index = {name: i for i, name in enumerate(self.scenario)}
+        if len(index) != len(self.scenario):
+            raise ValueError("scenario names must be unique")
+        bad = set(self.target) - set(TARGETS)
+        if bad:
+            raise ValueError(f"unknown targets {sorted(bad)}; expected one of {TARGETS}")
+        object.__setattr__(self, "_index", index)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "ScenarioCatalog":
+        n = len(df)
+        return cls(
+            scenario=df["scenario"].astype(str).to_numpy(),
+            description=(df["description"].astype(str).to_numpy() if "description" in df
+                         else np.full(n, "", dtype=object)),
+            affected_power_gw=(df["affected_power_gw"].to_numpy(dtype=float) if "affected_power_gw" in df
+                               else np.full(n, np.nan)),
+            compromised_pct=df["compromised_pct"].to_numpy(dtype=float),
+            change_pct_of_affected=df["change_pct_of_affected"].to_numpy(dtype=float),
+            ramp_seconds=df["ramp_seconds"].to_numpy(dtype=float),
+            target=(df["target"].astype(str).to_numpy() if "target" in df
+                    else np.full(n, "fleet", dtype=object)),
+        )
+
+    @classmethod
+    def from_csv(cls, path=ATTACK_CSV) -> "ScenarioCatalog":
+        return cls.from_frame(pd.read_csv(path))
+
+    @classmethod
+    def family(cls, compromised_pct, change_pct_of_affected=(-100.0,), ramp_seconds=(60.0,),
+               target=("fleet",), prefix: str = "P") -> "ScenarioCatalog":
+        """Cartesian product of the parameter lists, named <prefix>00000, <prefix>00001, ..."""
+        grid = np.array(list(itertools.product(compromised_pct, change_pct_of_affected, ramp_seconds)),
+                        dtype=float).reshape(-1, 3)
+        grid = np.repeat(grid, len(target), axis=0)
+        targets = np.tile(np.asarray(target, dtype=object), len(grid) // max(len(target), 1))
+        n = len(grid)
+        return cls(
+            scenario=np.array([f"{prefix}{i:05d}" for i in range(n)], dtype=object),
+            description=np.array([f"{c:g}% {t} {d:+g}% over {r:g} s" for (c, d, r), t in zip(grid, targets)],
+                                 dtype=object),
+            affected_power_gw=np.full(n, np.nan),
+            compromised_pct=grid[:, 0],
+            change_pct_of_affected=grid[:, 1],
+            ramp_seconds=grid[:, 2],
+            target=targets,
+        )
+
+    def __len__(self) -> int:
+        return len(self.scenario)
+
+    def __contains__(self, name) -> bool:
+        return name in self._index
+
+    def index_of(self, names) -> np.ndarray:
+        try:
+            return np.array([self._index[n] for n in np.atleast_1d(names)], dtype=int)
+        except KeyError as exc:
+            raise ValueError(f"Scenario {exc.args[0]} not found") from None
+
+    def row(self, name: str) -> dict:
+        """One scenario as a dict (the get_scenario format)."""
+        i = self.index_of(name)[0]
+        return {
+            "scenario": self.scenario[i],
+            "description": self.description[i],
+            "affected_power_gw": float(self.affected_power_gw[i]),
+            "compromised_pct": float(self.compromised_pct[i]),
+            "change_pct_of_affected": float(self.change_pct_of_affected[i]),
+            "ramp_seconds": float(self.ramp_seconds[i]),
+            "target": self.target[i],
+        }
+
+    def subset(self, rows) -> "ScenarioCatalog":
+        rows = np.asarray(rows)
+        return ScenarioCatalog(*(getattr(self, f)[rows] for f in self.__dataclass_fields__))
+
+    def concat(self, other: "ScenarioCatalog") -> "ScenarioCatalog":
+        return ScenarioCatalog(*(np.concatenate([getattr(self, f), getattr(other, f)])
+                                 for f in self.__dataclass_fields__))
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({f: getattr(self, f) for f in self.__dataclass_fields__})
+
+    def fleet_multipliers(self) -> np.ndarray:
+        """
+        (n,) global PV fleet multiplier per scenario (apply_attack_to_pv).
+        Every target compromises exactly compromised_pct of rated capacity, so
+        this is also the capacity-weighted mean of sgen_multipliers().
+        """
+        frac = self.compromised_pct / 100.0
+        return (1 - frac) + frac * (1 + self.change_pct_of_affected / 100.0)
+
+    def compromised_share(self, rated_mw) -> np.ndarray:
+        """
+        (n × n_sgen) fraction of each unit's capacity that is compromised.
+        "fleet" rows spread compromised_pct uniformly; "largest"/"smallest"
+        rows take whole units in order of rating and the boundary unit for
+        the remainder, so the compromised MW is compromised_pct of the fleet.
+        """
+        rated = np.asarray(rated_mw, dtype=float)
+        pct = self.compromised_pct[:, None] / 100.0
+        share = np.repeat(pct, len(rated), axis=1)
+        for target, order in (("largest", np.argsort(-rated, kind="stable")),
+                              ("smallest", np.argsort(rated, kind="stable"))):
+            rows = self.target == target
+            if rows.any():
+                # Compromised MW left for each unit after the ones before it.
+                before = np.cumsum(rated[order]) - rated[order]
+                left = pct[rows] * rated.sum() - before[None, :]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    unit_share = np.clip(left / rated[order], 0.0, 1.0)
+                share[np.ix_(rows, order)] = np.nan_to_num(unit_share)
+        return share
+
+    def compromised_mask(self, rated_mw) -> np.ndarray:
+        """
+        (n × n_sgen) units fully compromised by "largest"/"smallest" targets.
+        A partially covered boundary unit is not marked (it is derated by
+        its share in sgen_multipliers). All False for "fleet" rows.
+        """
+        share = self.compromised_share(rated_mw)
+        return (self.target != "fleet")[:, None] & np.isclose(share, 1.0)
+
+    def sgen_multipliers(self, rated_mw) -> np.ndarray:
+        """(n × n_sgen) steady-state multiplier per unit and scenario."""
+        change = self.change_pct_of_affected[:, None] / 100.0
+        return 1.0 + self.compromised_share(rated_mw) * change
+
+    def schedules(self, timestamps, attack_time, ramp: bool = True) -> np.ndarray:
+        """
+        (n × T) fleet multiplier over `timestamps` for an onset at
+        attack_time: 1.0 before, then a linear ramp over ramp_seconds
+        (a step with ramp=False) to fleet_multipliers().
+        """
+        ts = pd.DatetimeIndex(timestamps)
+        elapsed = np.asarray((ts - pd.Timestamp(attack_time)).total_seconds(), dtype=float)[None, :]
+        ramp_s = self.ramp_seconds[:, None] if ramp else np.zeros((len(self), 1))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frac = np.where(ramp_s > 0, np.clip(elapsed / ramp_s, 0.0, 1.0), (elapsed >= 0).astype(float))
+        return 1.0 + (self.fleet_multipliers()[:, None] - 1.0) * frac
+
+
+@lru_cache(maxsize=None)
+def default_catalog() -> ScenarioCatalog:
+    """The S1–S5 catalog, read from ATTACK_CSV once per process."""
+    return ScenarioCatalog.from_csv(ATTACK_CSV)
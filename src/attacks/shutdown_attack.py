@@ -1,8 +1,35 @@
 # src/attacks/shutdown_attack.py
 
+from dataclasses import dataclass
+
 import numpy as np
 import pandas as pd
 
+from src.metrics.voltage_metrics import compute_voltage_metrics_batch
+
+
+@dataclass
+class ShutdownRealizations:
+    time_index: pd.DatetimeIndex
+    attack_step: np.ndarray     # (R,) position of the attack time in time_index
+    load: np.ndarray            # (R × T)
+    pv: np.ndarray              # (R × T), after the shutdown
+    voltage: np.ndarray         # (R × T), voltage proxy
+
+    def __len__(self) -> int:
+        return len(self.attack_step)
+
+    def metrics(self, v_min: float, v_max: float) -> pd.DataFrame:
+        """compute_voltage_metrics for every realization (one row each)."""
+        df = pd.DataFrame(compute_voltage_metrics_batch(self.voltage, v_min, v_max))
+        df.insert(0, "attack_time", self.time_index[self.attack_step])
+        return df
+
+    def frame(self, r: int) -> pd.DataFrame:
+        """Realization r in the format of ScenarioShutdownAttack.run."""
+        return pd.DataFrame({"load": self.load[r], "pv": self.pv[r], "voltage": self.voltage[r]},
+                            index=self.time_index)
+
 
 class ScenarioShutdownAttack:
     def __init__(self, multiplier: float, ramp_minutes: int):
@@ -48,4 +75,24 @@ class ScenarioShutdownAttack:
             index=time_index,
         )
 
-        return df
\ No newline at end of file
+        return df
+
+    def run_batch(self, config, n_realizations: int, seed=None) -> ShutdownRealizations:
+        """
+        `n_realizations` independent draws of run() as (R × T) arrays: a
+        random attack step and load/PV noise per realization. Uses its own
+        Generator (seeded from `seed`, default config.seed), so the global
+        numpy RNG is neither used nor changed.
+        """
+        rng = np.random.default_rng(config.seed if seed is None else seed)
+        time_index = pd.date_range(start=config.start_time, end=config.end_time, freq=config.freq)
+        R, T = n_realizations, len(time_index)
+
+        attack_step = rng.integers(0, T, size=R)
+        load = 1.0 + rng.normal(0, config.load_noise_std, size=(R, T))
+        pv = config.pv_penetration * (0.8 + rng.normal(0, config.pv_noise_std, size=(R, T)))
+        attacked = np.arange(T)[None, :] >= attack_step[:, None]
+        pv = np.where(attacked, pv * self.multiplier, pv)
+
+        voltage = 1.0 + 0.05 * (pv - load)
+        return ShutdownRealizations(time_index, attack_step, load, pv, voltage)
@@ -0,0 +1,179 @@
+"""
+Cascading line trips after a power-flow snapshot.
+
+After each solve every line above the protection threshold trips; the
+islands are updated incrementally with a union-find (only components that
+lost a line are re-linked), the still-energized island around the ext_grid
+is re-solved and the loop repeats until no line is above the threshold.
+Buses cut off from the ext_grid are de-energized (PV has no grid-forming
+capability and disconnects).
+
+Solvers are cached per surviving topology (least recently used first out,
+at most max_cached_solvers), so repeated cascades inside a Monte Carlo loop
+reuse their factorizations without memory growing with the number of runs.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from src.powerflow.zbus import ZBusSolver
+
+
+class IslandTracker:
+    """
+    Union-find over in-service lines with incremental line removal. The
+    component label of every bus is kept up to date, so a removal only
+    re-links (and relabels) the buses of the components that lost a line.
+    """
+
+    def __init__(self, model, line_in_service):
+        self.f, self.t = model.f, model.t
+        self.on = np.array(line_in_service, dtype=bool)
+        self.parent = np.arange(model.n_bus)
+        for b in np.flatnonzero(self.on):
+            self._union(self.f[b], self.t[b])
+        self.label = np.array([self.find(x) for x in range(model.n_bus)])
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def _union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[rb] = ra
+
+    def labels(self) -> np.ndarray:
+        return self.label.copy()
+
+    def remove(self, lines) -> None:
+        """Take `lines` out and re-link only the components they belonged to."""
+        lines = np.atleast_1d(lines)
+        affected = np.isin(self.label, self.label[self.f[lines]])
+        members = np.flatnonzero(affected)
+        self.on[lines] = False
+        self.parent[members] = members
+        for b in np.flatnonzero(self.on & affected[self.f]):
+            self._union(self.f[b], self.t[b])
+        self.label[members] = [self.find(x) for x in members]
+
+    def connected_to(self, bus: int) -> np.ndarray:
+        return self.label == self.label[bus]
+
+
+@dataclass
+class CascadeResult:
+    events: list = field(default_factory=list)   # (stage, line, loading_percent)
+    line_in_service: np.ndarray = None
+    deenergized_buses: int = 0
+    converged: bool = True
+    V: np.ndarray = None
+
+    @property
+    def n_trips(self) -> int:
+        return len(self.events)
+
+
+class CascadeSimulator:
+    def __init__(self, model, trip_loading: float = 120.0, max_stages: int = 20,
+                 max_cached_solvers: int = 32):
+        self.model = model
+        self.trip_loading = trip_loading
+        self.max_stages = max_stages
+        self.max_cached_solvers = max_cached_solvers
+        self._solvers = OrderedDict()
+
+    def _solver(self, on, energized) -> ZBusSolver:
+        """Solver for topology `on`, from a least-recently-used cache of max_cached_solvers factorizations."""
+        key = on.tobytes()
+        if key in self._solvers:
+            self._solvers.move_to_end(key)
+        else:
+            self._solvers[key] = ZBusSolver(self.model, on, energized=energized)
+            if len(self._solvers) > self.max_cached_solvers:
+                self._solvers.popitem(last=False)
+        return self._solvers[key]
+
+    def run(self, S, V=None) -> CascadeResult:
+        """
+        Cascade for one injection case S (n_bus,) in p.u. `V` is the intact
+        solution if the caller already has it.
+        """
+        m = self.model
+        on = m.line_in_service.copy()
+        if V is None:
+            V, _ = self._solver(on, None).solve(S)
+            V = V[0]
+        islands = None
+        result = CascadeResult()
+
+        for stage in range(1, self.max_stages + 1):
+            loading = m.line_loading(V, on)
+            trip = np.flatnonzero(loading > self.trip_loading)
+            if not len(trip):
+                break
+            result.events.extend((stage, int(b), float(loading[b])) for b in trip)
+            on[trip] = False
+
+            if islands is None:
+                islands = IslandTracker(m, m.line_in_service)
+            islands.remove(trip)
+            energized = islands.connected_to(m.slack)
+            V_new, conv = self._solver(on, energized).solve(S, V0=V)
+            V = V_new[0]
+            if not conv[0]:
+                result.converged = False
+                break
+
+        result.line_in_service = on
+        result.deenergized_buses = int(np.isnan(V).sum())
+        result.V = V
+        return result
+
+    def run_batch(self, S, V=None):
+        """
+        Cascades for a batch (B × n_bus), with intact solutions V if
+        available. Only cases with an initial trip are simulated. Returns
+        (n_trips (B,), events DataFrame with a `case` column).
+        """
+        m = self.model
+        S = np.atleast_2d(S)
+        if V is None:
+            V, _ = self._solver(m.line_in_service, None).solve(S)
+        loading = m.line_loading(V, m.line_in_service)
+        n_trips = np.zeros(len(S), dtype=int)
+        rows = []
+        for k in np.flatnonzero((loading > self.trip_loading).any(axis=1)):
+            res = self.run(S[k], V[k])
+            n_trips[k] = res.n_trips
+            rows.extend((k, *event) for event in res.events)
+        events = pd.DataFrame(rows, columns=["case", "stage", "line", "loading_percent"])
+        return n_trips, events
+
+
+class SeriesScreen:
+    """
+    Cascade screen for a solved time series (run_injection_series `cascade`
+    argument): every step whose maximum loading is above the trip threshold
+    runs the cascade from its injections, and (step, stage, line,
+    loading_percent) tuples are appended to `events`.
+    """
+
+    def __init__(self, simulator: CascadeSimulator):
+        self.simulator = simulator
+        self.events = []
+
+    def __call__(self, S, max_loading, V=None) -> None:
+        """S (T × n_bus) injections, max_loading (T,); V the intact solutions if available."""
+        rows = np.flatnonzero(np.asarray(max_loading) > self.simulator.trip_loading)
+        if not len(rows):
+            return
+        _, events = self.simulator.run_batch(S[rows], None if V is None else V[rows])
+        steps = rows[events["case"].to_numpy(dtype=int)]
+        self.events.extend(zip(steps, events["stage"], events["line"], events["loading_percent"]))
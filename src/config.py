@@ -6,6 +6,10 @@ from dataclasses import dataclass
 @dataclass
 class SimulationConfig:
 
+    # Grid: 1 = the France feeder, N > 1 = the N× synthetic grid
+    # (src/grid_topology/synthetic_grid.py)
+    grid_scale: int = 1
+
     # Time
     start_time: str = "2026-02-04 00:00"
     end_time: str = "2026-02-04 23:45"
@@ -14,18 +18,63 @@ class SimulationConfig:
     # Monte Carlo
     n_runs: int = 50
     seed: int = 42
+    mc_engine: str = "pandapower"   # or "zbus" (batched fast path); controlled runs always use "zbus"
+    mc_workers: int = 1
+    mc_block_size: int = 1000        # samples per SeedSequence stream
+    mc_cheap_runs: int = 20000       # linearized-model samples for the multi-fidelity estimator
 
-    # PV parameters
+    # PV parameters (pv_penetration: PV output relative to load in the
+    # ScenarioShutdownAttack voltage proxy)
+    pv_penetration: float = 1.0
     pv_noise_std: float = 0.05
     load_noise_std: float = 0.03
 
     # Attack
     attack_time: str = "2026-02-04 12:00"
     attack_multiplier: float = 0.0   # 0 = full inverter shutdown
+    detection_delay_s: float = 30.0  # IDS detection delay after attack onset
+
+    # Multi-rate time series (fine steps around the attack ramp/detection)
+    fine_step_s: float = 1.0
+    fine_window_pre_s: float = 60.0
+    fine_window_post_s: float = 300.0
+
+    # Power flow engine for the time-series runners: "nr" (pp.runpp) or
+    # "bfs" (batched backward/forward sweep, radial feeders, NR fallback)
+    pf_engine: str = "nr"
+
+    # Inverter controls (ride-through trips, Volt-VAR for control_mode sgens;
+    # force_volt_var applies Volt-VAR to every sgen)
+    inverter_control: bool = False
+    force_volt_var: bool = False
+
+    # Reactive-power redispatch of the uncompromised sgens to hold
+    # [v_min_limit, v_max_limit] (src/reactive_mitigation.py); replaces
+    # inverter_control when both are set
+    q_mitigation: bool = False
+
+    # Inverter/network co-simulation (src/cosimulation.py): inverter states
+    # advance every cosim_dt_s; the network is re-solved only once an sgen's
+    # P or Q has moved more than cosim_resolve_tol_mw since the last solve
+    cosim_dt_s: float = 0.01
+    cosim_duration_s: float = 90.0
+    cosim_attack_start_s: float = 2.0
+    cosim_resolve_tol_mw: float = 5e-3
+
+    # Snapshot reduction (src/snapshot_reduction.py): steps are clustered
+    # into reduction_clusters representatives; steps whose representative is
+    # within these margins of a limit are solved exactly
+    reduction_clusters: int = 24
+    reduction_margin_pu: float = 0.01
+    reduction_margin_loading: float = 10.0
 
     # Voltage limits
     v_min_limit: float = 0.95
     v_max_limit: float = 1.05
 
     # Line overload limit
-    max_line_loading: float = 100.0
\ No newline at end of file
+    max_line_loading: float = 100.0
+
+    # Cascading trips: protection threshold (% loading) and stage limit
+    cascade_trip_loading: float = 120.0
+    cascade_max_stages: int = 20
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""
+Speedup of feeder decomposition against monolithic solves.
+
+Builds multi-feeder networks by attaching N copies of the France feeder to
+one substation bus, then times a day of 15-minute cases with:
+  - monolithic pp.runpp (per case),
+  - monolithic batched Z-bus,
+  - FeederDecomposition, serial and with worker processes.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pandapower as pp
+
+from src.grid_topology.load_france_grid import load_france_grid
+from src.load_data.load_profile_fr import load_fr_load_profile, pv_shape
+from src.powerflow.decomposition import FeederDecomposition
+from src.powerflow.network import NetworkModel
+from src.powerflow.zbus import ZBusSolver
+
+
+def multi_feeder_net(net, n_feeders: int, upstream_line: bool = False):
+    """
+    `n_feeders` copies of `net` sharing its ext_grid bus. With
+    upstream_line=True the copies hang off an MV busbar connected to the
+    ext_grid through one line (a non-stiff hub).
+    """
+    big = pp.create_empty_network(sn_mva=net.sn_mva, f_hz=net.f_hz)
+    eg_bus = net.ext_grid["bus"].iloc[0]
+    vn = net.bus.at[eg_bus, "vn_kv"]
+    slack = pp.create_bus(big, vn_kv=vn, name="SUBSTATION")
+    pp.create_ext_grid(big, slack, vm_pu=net.ext_grid["vm_pu"].iloc[0])
+
+    hub = slack
+    if upstream_line:
+        hub = pp.create_bus(big, vn_kv=vn, name="MV_BUSBAR")
+        pp.create_line_from_parameters(big, slack, hub, length_km=1.0, r_ohm_per_km=0.05,
+                                       x_ohm_per_km=0.2, c_nf_per_km=0.0, max_i_ka=5.0, name="UPSTREAM")
+
+    others = net.bus.index[net.bus.index != eg_bus]
+    line, load, sgen = net.line, net.load, net.sgen
+    for k in range(n_feeders):
+        new = pp.create_buses(big, len(others), vn_kv=net.bus.loc[others, "vn_kv"].values,
+                              name=[f"F{k}_{n}" for n in net.bus.loc[others, "name"]])
+        mapping = dict(zip(others, new))
+        mapping[eg_bus] = hub
+        pp.create_lines_from_parameters(
+            big, line["from_bus"].map(mapping).values, line["to_bus"].map(mapping).values,
+            length_km=line["length_km"].values, r_ohm_per_km=line["r_ohm_per_km"].values,
+            x_ohm_per_km=line["x_ohm_per_km"].values, c_nf_per_km=line["c_nf_per_km"].values,
+            max_i_ka=line["max_i_ka"].values, name=[f"F{k}_{n}" for n in line["name"]],
+        )
+        pp.create_loads(big, load["bus"].map(mapping).values, p_mw=load["p_mw"].values,
+                        q_mvar=load["q_mvar"].values, name=[f"F{k}_{n}" for n in load["name"]])
+        pp.create_sgens(big, sgen["bus"].map(mapping).values, p_mw=sgen["p_mw"].values,
+                        q_mvar=sgen["q_mvar"].values, name=[f"F{k}_{n}" for n in sgen["name"]])
+    return big
+
+
+def benchmark_decomposition(net, profile: pd.DataFrame, n_workers: int = 4, nr_cases: int = 3) -> dict:
+    """Timings (s) for the day in `profile` on `net`, and the max deviation from monolithic Z-bus."""
+    model = NetworkModel.from_net(net)
+    timestamps = pd.DatetimeIndex(profile["timestamp"])
+    load_p = profile["load_multiplier"].to_numpy()[:, None] * net.load["p_mw"].to_numpy()[None, :]
+    sgen_p = pv_shape(timestamps)[:, None] * net.sgen["p_mw"].to_numpy()[None, :]
+
+    pp.runpp(net)   # warm-up, keeps one-off setup costs out of the per-case timing
+    t0 = time.perf_counter()
+    for k in range(nr_cases):
+        net.load["p_mw"] = load_p[k]
+        net.sgen["p_mw"] = sgen_p[k]
+        pp.runpp(net)
+    nr = (time.perf_counter() - t0) / nr_cases * len(timestamps)
+
+    t0 = time.perf_counter()
+    V_mono, _ = ZBusSolver(model).solve(model.bus_injections(load_p, sgen_p))
+    zbus = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    dec = FeederDecomposition(model)
+    V_dec, _ = dec.solve(load_p, sgen_p)
+    serial = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with FeederDecomposition(model, n_workers=n_workers) as dec_par:
+        V_par, _ = dec_par.solve(load_p, sgen_p)
+        parallel = time.perf_counter() - t0
+        # Repeated solves reuse the pool and the workers' factorizations.
+        t0 = time.perf_counter()
+        dec_par.solve(load_p, sgen_p)
+        parallel_repeat = time.perf_counter() - t0
+
+    return {
+        "buses": model.n_bus,
+        "feeders": len(dec.feeders),
+        "boundary_iterations": dec.boundary_iterations,
+        "nr_monolithic_s": nr,
+        "zbus_monolithic_s": zbus,
+        "decomposed_serial_s": serial,
+        "decomposed_parallel_s": parallel,
+        "decomposed_parallel_repeat_s": parallel_repeat,
+        "speedup_vs_nr": nr / parallel,
+        "speedup_vs_zbus": zbus / parallel,
+        "max_abs_dv_pu": float(np.nanmax(np.abs(V_par - V_mono))),
+    }
+
+
+def main():
+    base = load_france_grid()
+    profile = load_fr_load_profile()
+
+    rows = []
+    for n_feeders in (10, 50):
+        for upstream_line in (False, True):
+            net = multi_feeder_net(base, n_feeders, upstream_line)
+            row = benchmark_decomposition(net, profile)
+            row["hub"] = "upstream line" if upstream_line else "stiff"
+            rows.append(row)
+
+    df = pd.DataFrame(rows)
+    print("\n=== FEEDER DECOMPOSITION BENCHMARK (96 cases) ===")
+    print(df.to_string(index=False))
+
+    out_path = "results/decomposition_benchmark.csv"
+    df.to_csv(out_path, index=False)
+    print(f"\nSaved benchmark to: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+False-data-injection detection with batched WLS state estimation.
+
+Telemetry snapshots for the whole day (with measurement noise) are
+estimated in one batch. Each inverter in turn is tripped while its
+telemetry keeps replaying the pre-attack output; the chi-square and
+largest-normalized-residual tests should flag the manipulated reading.
+The clean day gives the false-alarm rate. The last table compares the
+time per snapshot with pandapower's WLS estimator.
+"""
+
+import copy
+import time
+
+import numpy as np
+import pandas as pd
+import pandapower as pp
+from pandapower.estimation import estimate
+
+from src.grid_topology.load_france_grid import load_france_grid
+from src.load_data.load_profile_fr import load_fr_load_profile
+from src.powerflow.network import NetworkModel
+from src.powerflow.state_estimation import StateEstimator
+from src.powerflow.zbus import ZBusSolver
+from src.timeseries import prepare_injections
+
+NOISE_REALIZATIONS = 20
+PP_SNAPSHOTS = 5
+
+
+def _pp_estimate(net, estimator, z):
+    """One snapshot through pandapower's estimator; returns (vm_pu, seconds)."""
+    ms, model = estimator.ms, estimator.model
+    net = copy.deepcopy(net)
+    sigma = ms.sigma
+    n_vm, n_inj, n_flow = len(ms.vm_buses), len(ms.inj_buses), len(ms.flow_lines)
+    z_vm, z_p, z_q, z_pf, z_qf = np.split(z, np.cumsum([n_vm, n_inj, n_inj, n_flow]))
+    s_vm, s_p, _, s_pf, _ = np.split(sigma, np.cumsum([n_vm, n_inj, n_inj, n_flow]))
+    for b, v, s in zip(ms.vm_buses, z_vm, s_vm):
+        pp.create_measurement(net, "v", "bus", v, s, model.bus_index[b])
+    # pandapower's bus measurements are in load convention.
+    for b, p, q, s in zip(ms.inj_buses, z_p, z_q, s_p):
+        pp.create_measurement(net, "p", "bus", -p * model.sn_mva, s * model.sn_mva, model.bus_index[b])
+        pp.create_measurement(net, "q", "bus", -q * model.sn_mva, s * model.sn_mva, model.bus_index[b])
+    for l, p, q, s in zip(ms.flow_lines, z_pf, z_qf, s_pf):
+        pp.create_measurement(net, "p", "line", p * model.sn_mva, s * model.sn_mva, net.line.index[l], side="from")
+        pp.create_measurement(net, "q", "line", q * model.sn_mva, s * model.sn_mva, net.line.index[l], side="from")
+    t0 = time.perf_counter()
+    estimate(net, init="flat")
+    return net.res_bus_est["vm_pu"].to_numpy(), time.perf_counter() - t0
+
+
+def main():
+    net = load_france_grid()
+    profile = load_fr_load_profile()
+    model = NetworkModel.from_net(net)
+    solver = ZBusSolver(model)
+    estimator = StateEstimator(model)
+    ms = estimator.ms
+    rng = np.random.default_rng(0)
+
+    plan = prepare_injections(profile, net.load["p_mw"], net.sgen["p_mw"])
+    load_p = np.tile(plan.load_p_mw, (NOISE_REALIZATIONS, 1))
+    sgen_p = np.tile(plan.sgen_p_mw, (NOISE_REALIZATIONS, 1))
+    V, _ = solver.solve(model.bus_injections(load_p, sgen_p))
+
+    def telemetry(V):
+        return estimator.measure(V) + rng.normal(size=(len(V), ms.size)) * ms.sigma
+
+    t0 = time.perf_counter()
+    clean = estimator.estimate(telemetry(V))
+    t_batch = (time.perf_counter() - t0) / len(V)
+    chi2_alarm = clean.objective > clean.chi2_threshold
+
+    inj_pos = {b: i for i, b in enumerate(ms.inj_buses)}
+    n_vm = len(ms.vm_buses)
+    rows = []
+    for j, bus in enumerate(model.sgen_bus):
+        producing = sgen_p[:, j] > 0.1 * net.sgen["p_mw"].iloc[j]
+        tripped = sgen_p[producing].copy()
+        tripped[:, j] = 0.0
+        V_att, _ = solver.solve(model.bus_injections(load_p[producing], tripped))
+        z = telemetry(V_att)
+        k = n_vm + inj_pos[bus]
+        z[:, k] += sgen_p[producing, j] / model.sn_mva     # replayed pre-attack output
+        res = estimator.estimate(z)
+        rows.append({
+            "sgen": net.sgen.index[j],
+            "rated_mw": net.sgen["p_mw"].iloc[j],
+            "snapshots": int(producing.sum()),
+            "chi2_detected": (res.objective > res.chi2_threshold).mean(),
+            "lnr_detected": res.bad_data.mean(),
+            "lnr_identified": (res.suspect == k).mean(),
+        })
+
+    df = pd.DataFrame(rows)
+    print("\n=== FDI DETECTION (tripped inverter replays its pre-attack output) ===")
+    print(df.to_string(index=False))
+    print(f"\nFalse alarms on clean telemetry ({len(V)} snapshots): "
+          f"chi-square {chi2_alarm.mean():.3f}, largest normalized residual {clean.bad_data.mean():.3f}")
+
+    z = telemetry(V[:PP_SNAPSHOTS])
+    ours = estimator.estimate(z)
+    _pp_estimate(net, estimator, z[0])   # warm-up
+    t_pp, dv = 0.0, 0.0
+    for k in range(PP_SNAPSHOTS):
+        vm_pp, dt = _pp_estimate(net, estimator, z[k])
+        t_pp += dt / PP_SNAPSHOTS
+        dv = max(dv, np.nanmax(np.abs(vm_pp - np.abs(ours.V[k]))))
+    timing = pd.DataFrame([{
+        "batched_ms_per_snapshot": t_batch * 1000,
+        "pandapower_ms_per_snapshot": t_pp * 1000,
+        "speedup": t_pp / t_batch,
+        "max_abs_dvm_pu": dv,
+        "iterations": clean.iterations,
+        "converged": bool(clean.converged.all()),
+    }])
+    print("\n=== ESTIMATOR TIMING ===")
+    print(timing.to_string(index=False))
+
+    out_path = "results/fdi_detection.csv"
+    df.to_csv(out_path, index=False)
+    print(f"\nSaved detection table to: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
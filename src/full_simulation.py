@@ -14,17 +14,27 @@ Produces resilience separation between:
 Author: MSc Cyber-Physical Energy Systems
 """
 
-import math
 import numpy as np
 import random
 import matplotlib.pyplot as plt
 from dataclasses import dataclass
 import pandas as pd
-import pandapower as pp
 
 from src.grid_topology.load_france_grid import load_france_grid
+from src.grid_topology.synthetic_grid import load_synthetic_grid
 from src.load_data.load_profile_fr import load_fr_load_profile
-from src.attacks.attack_fr import apply_attack_to_pv
+from src.cascade import CascadeSimulator, SeriesScreen
+from src.contingency_analysis import run_n1_contingencies
+from src.cosimulation import CoSimulation
+from src.inverter_control import InverterControl
+from src.monte_carlo import run_monte_carlo, run_multifidelity_monte_carlo
+from src.onset_sweep import SCENARIOS, run_onset_sweep
+from src.powerflow.network import NetworkModel
+from src.probabilistic_load_flow import point_estimate_load_flow
+from src.reactive_mitigation import ReactiveMitigation, targeted_attack
+from src.snapshot_reduction import run_reduced_series
+from src.timeseries import (attack_fleet_multiplier, prepare_injections, run_multirate_timeseries,
+                            run_timeseries, stream_timeseries)
 
 
 # ============================================================
@@ -219,83 +229,176 @@ class FullGridSimulation:
 
     def __init__(self, config):
         self.config = config
-        self.net = load_france_grid()
+        self.net = load_france_grid() if config.grid_scale == 1 else load_synthetic_grid(config.grid_scale)
         self.base_load = self.net.load["p_mw"].copy()
         self.base_pv = self.net.sgen["p_mw"].copy()
         self.profile = load_fr_load_profile()
 
-    @staticmethod
-    def _pv_shape_from_timestamp(ts: pd.Timestamp) -> float:
-        hour = ts.hour + ts.minute / 60.0
-        if hour <= 6 or hour >= 18:
-            return 0.0
-        x = (hour - 6) / 12.0 * math.pi
-        return max(0.0, min(1.0, math.sin(x)))
-
-    def _run_timeseries(self, scenario: str = "S3", with_attack: bool = True) -> pd.DataFrame:
-        attack_time = pd.to_datetime(self.config.attack_time)
-        attack_applied = False
-        fleet_multiplier = 1.0
-        results = []
-
-        for _, row in self.profile.iterrows():
-            ts = row["timestamp"]
-            mult = row["load_multiplier"]
-
-            self.net.load["p_mw"] = self.base_load * mult
-
-            pv_shape = self._pv_shape_from_timestamp(ts)
-            if with_attack and (not attack_applied) and (ts == attack_time):
-                fleet_multiplier = apply_attack_to_pv(self.net, scenario)
-                attack_applied = True
-
-            self.net.sgen["p_mw"] = self.base_pv * pv_shape * fleet_multiplier
-            pp.runpp(self.net)
-
-            results.append({
-                "timestamp": ts,
-                "min_vm_pu": self.net.res_bus["vm_pu"].min(),
-                "max_vm_pu": self.net.res_bus["vm_pu"].max(),
-                "max_line_loading": self.net.res_line["loading_percent"].max(),
-                "attack_applied": attack_applied and (ts == attack_time),
-            })
-
-        return pd.DataFrame(results)
-
-    def run_single_simulation(self, scenario: str = "S3"):
-        df = self._run_timeseries(scenario=scenario, with_attack=True)
-        cascades = 0
+    def _inverter_control(self):
+        """
+        ReactiveMitigation (config.q_mitigation) or InverterControl
+        (config.inverter_control) for this grid, else None. The mitigation
+        takes the units under attack per step from the injection plan.
+        """
+        if self.config.q_mitigation:
+            return ReactiveMitigation.from_net(self.net, self.config, rated_mw=self.base_pv)
+        if not self.config.inverter_control:
+            return None
+        return InverterControl.from_net(
+            self.net, volt_var=True if self.config.force_volt_var else None, rated_mw=self.base_pv,
+        )
+
+    def _attack(self, scenario: str, ramp: bool = False):
+        """
+        With config.q_mitigation the scenario hits only the units the
+        mitigation treats as compromised (targeted_attack), with the same
+        compromised MW; otherwise None (the runners' fleet-wide multiplier).
+        """
+        if not self.config.q_mitigation:
+            return None
+        return targeted_attack(scenario, self.config.attack_time, self.base_pv, ramp=ramp)
+
+    def _run_timeseries(self, scenario: str = "S3", with_attack: bool = True,
+                        store_dir=None, control=None, cascade=None) -> pd.DataFrame:
+        return run_timeseries(
+            self.net, self.profile, self.config.attack_time,
+            scenario=scenario, with_attack=with_attack,
+            base_load=self.base_load, base_pv=self.base_pv,
+            store_dir=store_dir, engine=self.config.pf_engine,
+            control=control, cascade=cascade, attack=self._attack(scenario),
+        )
+
+    def run_single_simulation(self, scenario: str = "S3", store_dir=None):
+        """
+        One attacked day at 15-minute resolution. With `store_dir`, every bus
+        voltage and line loading is also kept in a ResultStore.
+
+        Steps with a line above config.cascade_trip_loading run the cascading
+        trip loop (screened from the solved series, with any pf_engine);
+        `cascades` is the total number of tripped lines and the trip
+        sequence is kept in self.cascade_sequence. With
+        config.inverter_control or config.q_mitigation the cascades start
+        from the controlled voltages and setpoints.
+        """
+        simulator = CascadeSimulator(NetworkModel.from_net(self.net),
+                                     self.config.cascade_trip_loading, self.config.cascade_max_stages)
+        screen = SeriesScreen(simulator)
+        df = self._run_timeseries(scenario=scenario, with_attack=True, store_dir=store_dir,
+                                  control=self._inverter_control(), cascade=screen)
+
+        seq = pd.DataFrame(screen.events, columns=["step", "stage", "line", "loading_percent"])
+        seq.insert(0, "timestamp", df["timestamp"].to_numpy()[seq["step"].to_numpy(dtype=int)])
+        seq["line"] = self.net.line["name"].to_numpy()[seq["line"].to_numpy(dtype=int)]
+        self.cascade_sequence = seq.drop(columns="step")
+
+        df["cascade_events"] = np.bincount(seq["step"].to_numpy(dtype=int), minlength=len(df))
+        cascades = len(seq)
         return df, cascades
 
-    def run_monte_carlo(self):
-        rng = np.random.default_rng(self.config.seed)
-        records = []
-
-        for _ in range(self.config.n_runs):
-            # Add small random noise to load/PV for variability
-            noisy_load = self.base_load * (1 + rng.normal(0, self.config.load_noise_std, size=len(self.base_load)))
-            noisy_pv = self.base_pv * (1 + rng.normal(0, self.config.pv_noise_std, size=len(self.base_pv)))
-
-            self.net.load["p_mw"] = noisy_load
-            self.net.sgen["p_mw"] = noisy_pv
-
-            # Single power flow snapshot at attack time
-            pp.runpp(self.net)
-            vm = self.net.res_bus["vm_pu"]
-            loading = self.net.res_line["loading_percent"]
-
-            underv = (vm < self.config.v_min_limit).mean() * 100
-            overv = (vm > self.config.v_max_limit).mean() * 100
-            overline = (loading > self.config.max_line_loading).mean() * 100
-
-            records.append({
-                "undervoltage_%": underv,
-                "overvoltage_%": overv,
-                "line_overload_%": overline,
-                "cascade_events": 0,
-            })
-
-        return pd.DataFrame(records)
+    def run_multirate_simulation(self, scenario: str = "S3", with_attack: bool = True,
+                                 store_dir=None) -> pd.DataFrame:
+        """
+        Same day as run_single_simulation, but resolved at config.fine_step_s
+        around the attack ramp and detection window.
+        """
+        return run_multirate_timeseries(
+            self.net, self.profile, self.config,
+            scenario=scenario, with_attack=with_attack,
+            base_load=self.base_load, base_pv=self.base_pv,
+            store_dir=store_dir, engine=self.config.pf_engine,
+            control=self._inverter_control(), attack=self._attack(scenario, ramp=True),
+        )
+
+    def run_streaming_simulation(self, chunks, scenario: str = "S3", with_attack: bool = True,
+                                 out_csv=None, **kwargs) -> pd.DataFrame:
+        """
+        Long-horizon run over profile `chunks` (see stream_timeseries).
+        Returns the per-month voltage/loading summary.
+        """
+        kwargs.setdefault("engine", self.config.pf_engine)
+        return stream_timeseries(
+            self.net, chunks, self.config,
+            scenario=scenario, with_attack=with_attack, out_csv=out_csv,
+            base_load=self.base_load, base_pv=self.base_pv, **kwargs,
+        )
+
+    def run_reduced_simulation(self, scenario: str = "S3", with_attack: bool = True):
+        """
+        The run_single_simulation day solved through representative
+        snapshots (see src/snapshot_reduction.py). Returns (df, info).
+        """
+        fleet = None
+        if with_attack:
+            fleet = attack_fleet_multiplier(self.net, self.profile["timestamp"], self.config.attack_time, scenario)
+        plan = prepare_injections(self.profile, self.base_load, self.base_pv, fleet)
+        return run_reduced_series(self.net, plan, self.config, base_load=self.base_load,
+                                  base_pv=self.base_pv, engine=self.config.pf_engine)
+
+    def run_cosimulation(self, scenario: str = "S3", mitigate: bool = False, lockstep: bool = False):
+        """Inverter-fleet dynamics on this grid around config.attack_time (see src/cosimulation.py)."""
+        return CoSimulation(self.net, self.config, scenario=scenario, mitigate=mitigate,
+                            base_load=self.base_load, base_pv=self.base_pv).run(lockstep=lockstep)
+
+    def run_onset_sweep(self, scenarios=SCENARIOS, onsets=None):
+        """
+        Day metrics for every attack onset × scenario, reusing the baseline
+        prefix (see src/onset_sweep.py). Returns (df, info).
+        """
+        return run_onset_sweep(
+            self.net, self.profile, scenarios=scenarios, onsets=onsets,
+            base_load=self.base_load, base_pv=self.base_pv,
+        )
+
+    def run_contingency_analysis(self, scenarios=SCENARIOS, n_workers: int = 1) -> pd.DataFrame:
+        """N-1 line outages for every scenario and timestep (see src/contingency_analysis.py)."""
+        return run_n1_contingencies(
+            self.net, self.profile, self.config, scenarios=scenarios, n_workers=n_workers,
+            base_load=self.base_load, base_pv=self.base_pv,
+        )
+
+    def _mc_engine(self, engine, control) -> str:
+        """Monte Carlo engine: `engine`, else "zbus" with a control (the only engine with one), else config.mc_engine."""
+        if engine is not None:
+            return engine
+        return "zbus" if control is not None else self.config.mc_engine
+
+    def run_monte_carlo(self, n_runs=None, engine=None, n_workers=None) -> pd.DataFrame:
+        """
+        Noisy load/PV snapshots (see src/monte_carlo.py). Defaults come from
+        the config; results do not depend on n_workers and self.net is left
+        untouched. With config.inverter_control or config.q_mitigation the
+        default engine is "zbus", the only one with the control loops.
+        """
+        control = self._inverter_control()
+        return run_monte_carlo(
+            self.net, self.config, base_load=self.base_load, base_pv=self.base_pv,
+            n_runs=n_runs, engine=self._mc_engine(engine, control),
+            n_workers=self.config.mc_workers if n_workers is None else n_workers,
+            block_size=self.config.mc_block_size,
+            control=control,
+        )
+
+    def run_multifidelity_monte_carlo(self, n_runs=None, n_cheap=None, engine=None) -> pd.DataFrame:
+        """
+        Metric means from n_runs AC samples plus n_cheap linearized samples
+        (see run_multifidelity_monte_carlo in src/monte_carlo.py). The AC
+        samples follow config.inverter_control / q_mitigation like
+        run_monte_carlo.
+        """
+        control = self._inverter_control()
+        return run_multifidelity_monte_carlo(
+            self.net, self.config, base_load=self.base_load, base_pv=self.base_pv,
+            n_runs=n_runs, n_cheap=n_cheap, engine=self._mc_engine(engine, control),
+            block_size=self.config.mc_block_size, control=control,
+        )
+
+    def run_probabilistic_load_flow(self):
+        """
+        Moments and expected limit statistics for the run_monte_carlo noise
+        model from 2m+1 solves (see src/probabilistic_load_flow.py).
+        """
+        return point_estimate_load_flow(self.net, self.config, base_load=self.base_load,
+                                        base_pv=self.base_pv, control=self._inverter_control())
 
     def plot_professional_results(self, df: pd.DataFrame) -> None:
         plt.figure(figsize=(9, 4))
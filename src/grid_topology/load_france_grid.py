@@ -1,13 +1,49 @@
+import copy
+import hashlib
+import pickle
 from pathlib import Path
 
 import pandas as pd
 import pandapower as pp
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DATA_DIR = PROJECT_ROOT / "data" / "france_sprint3"
+CACHE_DIR = PROJECT_ROOT / ".cache" / "grid"
 
-def load_france_grid():
+GRID_CSVS = (
+    "fr_grid_buses.csv",
+    "fr_grid_lines.csv",
+    "fr_grid_loads.csv",
+    "fr_grid_pv_generators.csv",
+)
+
+# Bump when the construction logic below changes so stale pickles are ignored.
+CACHE_VERSION = "2"
+
+# In-process cache: content hash -> compiled pandapower net (never handed out directly).
+_COMPILED = {}
+
+
+def grid_content_hash(data_dir=None) -> str:
+    """
+    SHA-256 over the four grid CSVs (and CACHE_VERSION).
+    Any edit to the data changes the hash and invalidates the cached net.
+    """
+    base = Path(data_dir) if data_dir is not None else DATA_DIR
+    h = hashlib.sha256(CACHE_VERSION.encode())
+    for fname in GRID_CSVS:
+        h.update(fname.encode())
+        h.update((base / fname).read_bytes())
+    return h.hexdigest()
+
+
+def build_france_grid(data_dir=None):
+    """
+    Cold build: parse the CSVs and create every element table in one bulk call
+    per element type (no per-row pp.create_* calls).
+    """
     # Use absolute paths so the code works even if Render changes CWD.
-    base = PROJECT_ROOT / "data" / "france_sprint3"
+    base = Path(data_dir) if data_dir is not None else DATA_DIR
 
     # Load CSV files
     buses = pd.read_csv(base / "fr_grid_buses.csv")
@@ -19,23 +55,21 @@ def load_france_grid():
     net = pp.create_empty_network()
 
     # --- Add buses, keep a map from bus_id -> pandapower index ---
-    bus_id_to_pp = {}
-    for _, row in buses.iterrows():
-        pp_bus_idx = pp.create_bus(
-            net,
-            vn_kv=row["base_kv"],      # column is base_kv, not vn_kv
-            name=row["name"]
-        )
-        bus_id_to_pp[row["bus_id"]] = pp_bus_idx
+    bus_idx = pp.create_buses(
+        net,
+        nr_buses=len(buses),
+        vn_kv=buses["base_kv"].values,      # column is base_kv, not vn_kv
+        name=buses["name"].values,
+    )
+    bus_id_to_pp = pd.Series(bus_idx, index=buses["bus_id"].values)
 
     # --- Slack bus: choose the one with type == 'slack' ---
     slack_rows = buses[buses["type"] == "slack"]
     if not slack_rows.empty:
-        slack_bus_id = slack_rows.iloc[0]["bus_id"]
-        slack_pp_bus = bus_id_to_pp[slack_bus_id]
+        slack_pp_bus = int(bus_id_to_pp[slack_rows.iloc[0]["bus_id"]])
     else:
         # fallback: use first bus
-        slack_pp_bus = list(bus_id_to_pp.values())[0]
+        slack_pp_bus = int(bus_idx[0])
 
     pp.create_ext_grid(
         net,
@@ -45,42 +79,77 @@ def load_france_grid():
     )
 
     # --- Add lines ---
-    for _, row in lines.iterrows():
-        from_bus_pp = bus_id_to_pp[row["from_bus"]]
-        to_bus_pp = bus_id_to_pp[row["to_bus"]]
-
-        pp.create_line_from_parameters(
+    if not lines.empty:
+        pp.create_lines_from_parameters(
             net,
-            from_bus=from_bus_pp,
-            to_bus=to_bus_pp,
-            length_km=row["length_km"],
-            r_ohm_per_km=row["r_ohm_per_km"],
-            x_ohm_per_km=row["x_ohm_per_km"],
+            from_buses=bus_id_to_pp[lines["from_bus"].values].values,
+            to_buses=bus_id_to_pp[lines["to_bus"].values].values,
+            length_km=lines["length_km"].values,
+            r_ohm_per_km=lines["r_ohm_per_km"].values,
+            x_ohm_per_km=lines["x_ohm_per_km"].values,
             c_nf_per_km=0.0,          # not in CSV, set 0 for now
-            max_i_ka=row["max_i_ka"],
-            name=f"LINE_{int(row['line_id'])}"
+            max_i_ka=lines["max_i_ka"].values,
+            name=[f"LINE_{int(i)}" for i in lines["line_id"]],
         )
 
     # --- Add loads (static baseline load) ---
-    for _, row in loads.iterrows():
-        bus_pp = bus_id_to_pp[row["bus_id"]]
-        pp.create_load(
+    if not loads.empty:
+        pp.create_loads(
             net,
-            bus=bus_pp,
-            p_mw=row["p_mw_peak"],
-            q_mvar=row["q_mvar_peak"],
-            name=f"LOAD_{int(row['load_id'])}"
+            buses=bus_id_to_pp[loads["bus_id"].values].values,
+            p_mw=loads["p_mw_peak"].values,
+            q_mvar=loads["q_mvar_peak"].values,
+            name=[f"LOAD_{int(i)}" for i in loads["load_id"]],
         )
 
     # --- Add PV generators (Sgen) ---
-    for _, row in pv.iterrows():
-        bus_pp = bus_id_to_pp[row["bus_id"]]
-        pp.create_sgen(
+    if not pv.empty:
+        pp.create_sgens(
             net,
-            bus=bus_pp,
-            p_mw=row["p_mw_rated"],
-            q_mvar=row["q_mvar_cap"],
-            name=row["name"]
+            buses=bus_id_to_pp[pv["bus_id"].values].values,
+            p_mw=pv["p_mw_rated"].values,
+            q_mvar=pv["q_mvar_cap"].values,
+            name=pv["name"].values,
+            q_mvar_cap=pv["q_mvar_cap"].values,
+            control_mode=pv["control_mode"].values,
         )
 
-    return net
\ No newline at end of file
+    return net
+
+
+def load_france_grid(data_dir=None, use_cache: bool = True):
+    """
+    Return a fresh pandapower net for the grid in `data_dir`
+    (default: data/france_sprint3).
+
+    The compiled net is cached in memory and pickled under .cache/grid/,
+    keyed by the CSV content hash, so only the first call after a data change
+    pays for CSV parsing and element creation. Every call returns an
+    independent copy: callers are free to mutate loads/sgens.
+    """
+    if not use_cache:
+        return build_france_grid(data_dir)
+
+    key = grid_content_hash(data_dir)
+    net = _COMPILED.get(key)
+
+    if net is None:
+        cache_file = CACHE_DIR / f"{key}.p"
+        try:
+            with open(cache_file, "rb") as fh:
+                net = pickle.load(fh)
+        except Exception:
+            # Missing, truncated or written by an incompatible pandapower: rebuild.
+            net = build_france_grid(data_dir)
+            try:
+                CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                tmp = cache_file.with_suffix(".tmp")
+                with open(tmp, "wb") as fh:
+                    pickle.dump(net, fh, protocol=pickle.HIGHEST_PROTOCOL)
+                tmp.replace(cache_file)
+            except OSError:
+                # Read-only deploy (e.g. Render): the in-memory cache still applies.
+                pass
+        _COMPILED[key] = net
+
+    return copy.deepcopy(net)
@@ -0,0 +1,203 @@
+"""
+Synthetic large grids for scaling benchmarks.
+
+Replicates the France feeder `scale` times around its slack bus. Every copy
+gets perturbed line lengths/impedances and load/PV sizes. Neighbouring
+copies are interconnected with tie lines between buses in their far halves.
+The result is written in the same CSV schema as data/france_sprint3, so
+load_france_grid(data_dir) reads it directly.
+"""
+
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pandapower as pp
+
+from src.grid_topology.load_france_grid import DATA_DIR, GRID_CSVS, PROJECT_ROOT, load_france_grid
+from src.powerflow.network import NetworkModel
+from src.powerflow.zbus import ZBusSolver
+
+SYNTHETIC_DIR = PROJECT_ROOT / ".cache" / "synthetic_grids"
+
+# Bump when the generation logic changes so stale generated grids are ignored.
+GENERATOR_VERSION = "1"
+
+SCALES = (10, 100, 1000)
+
+# Lognormal sigmas of the multiplicative perturbations.
+LENGTH_SIGMA = 0.15
+IMPEDANCE_SIGMA = 0.05
+LOAD_SIGMA = 0.2
+PV_SIGMA = 0.3
+
+
+def _perturb(rng, values, sigma):
+    return np.asarray(values, dtype=float) * rng.lognormal(-sigma ** 2 / 2, sigma, size=len(values))
+
+
+def generate_synthetic_grid(scale: int, out_dir, seed: int = 0, data_dir=None,
+                            ties_per_feeder: int = 1) -> Path:
+    """
+    Write a `scale`× copy of the grid in `data_dir` (default: the France
+    feeder) to `out_dir` and return it. Same seed -> same grid.
+    """
+    base = Path(data_dir) if data_dir is not None else DATA_DIR
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    buses = pd.read_csv(base / "fr_grid_buses.csv")
+    lines = pd.read_csv(base / "fr_grid_lines.csv")
+    loads = pd.read_csv(base / "fr_grid_loads.csv")
+    pv = pd.read_csv(base / "fr_grid_pv_generators.csv")
+
+    slack_id = buses.loc[buses["type"] == "slack", "bus_id"].iloc[0]
+    others = buses[buses["bus_id"] != slack_id]
+    n_other = len(others)
+    # Tie-line candidates: the far half of each feeder (by bus id).
+    far = others["bus_id"].to_numpy()[n_other // 2:]
+
+    def bus_map(k):
+        """bus_id in the base grid -> bus_id in copy k (the slack is shared)."""
+        ids = dict(zip(others["bus_id"], 2 + k * n_other + np.arange(n_other)))
+        ids[slack_id] = 1
+        return pd.Series(ids)
+
+    bus_frames = [pd.DataFrame({"bus_id": [1], "name": ["Bus 1"],
+                                "base_kv": [buses.loc[buses["bus_id"] == slack_id, "base_kv"].iloc[0]],
+                                "type": ["slack"]})]
+    line_frames, load_frames, pv_frames, tie_rows = [], [], [], []
+    maps = [bus_map(k) for k in range(scale)]
+
+    for k, ids in enumerate(maps):
+        new_ids = ids[others["bus_id"]].to_numpy()
+        bus_frames.append(pd.DataFrame({"bus_id": new_ids, "name": [f"Bus {i}" for i in new_ids],
+                                        "base_kv": others["base_kv"].to_numpy(),
+                                        "type": others["type"].to_numpy()}))
+
+        r_scale = _perturb(rng, np.ones(len(lines)), IMPEDANCE_SIGMA)
+        line_frames.append(pd.DataFrame({
+            "from_bus": ids[lines["from_bus"]].to_numpy(),
+            "to_bus": ids[lines["to_bus"]].to_numpy(),
+            "length_km": _perturb(rng, lines["length_km"], LENGTH_SIGMA),
+            "r_ohm_per_km": lines["r_ohm_per_km"].to_numpy() * r_scale,
+            "x_ohm_per_km": lines["x_ohm_per_km"].to_numpy() * r_scale,
+            "max_i_ka": lines["max_i_ka"].to_numpy(),
+        }))
+
+        load_scale = _perturb(rng, np.ones(len(loads)), LOAD_SIGMA)
+        load_frames.append(pd.DataFrame({
+            "bus_id": ids[loads["bus_id"]].to_numpy(),
+            "p_mw_peak": loads["p_mw_peak"].to_numpy() * load_scale,
+            "q_mvar_peak": loads["q_mvar_peak"].to_numpy() * load_scale,
+        }))
+
+        pv_scale = _perturb(rng, np.ones(len(pv)), PV_SIGMA)
+        pv_frames.append(pd.DataFrame({
+            "name": [f"{n}_F{k}" for n in pv["name"]],
+            "bus_id": ids[pv["bus_id"]].to_numpy(),
+            "p_mw_rated": pv["p_mw_rated"].to_numpy() * pv_scale,
+            "q_mvar_cap": pv["q_mvar_cap"].to_numpy() * pv_scale,
+            "control_mode": pv["control_mode"].to_numpy(),
+        }))
+
+        if scale > 1 and (k + 1 < scale or scale > 2):
+            nxt = maps[(k + 1) % scale]
+            for a, b in zip(rng.choice(far, ties_per_feeder), rng.choice(far, ties_per_feeder)):
+                tie_rows.append((ids[a], nxt[b]))
+
+    tie_type = lines.iloc[-1]   # same cable type as the base grid's loop-closing lines
+    if tie_rows:
+        tie_rows = np.array(tie_rows)
+        line_frames.append(pd.DataFrame({
+            "from_bus": tie_rows[:, 0], "to_bus": tie_rows[:, 1],
+            "length_km": _perturb(rng, np.full(len(tie_rows), tie_type["length_km"]), LENGTH_SIGMA),
+            "r_ohm_per_km": tie_type["r_ohm_per_km"], "x_ohm_per_km": tie_type["x_ohm_per_km"],
+            "max_i_ka": tie_type["max_i_ka"],
+        }))
+
+    out_lines = pd.concat(line_frames, ignore_index=True)
+    out_lines.insert(0, "line_id", np.arange(1, len(out_lines) + 1))
+    out_loads = pd.concat(load_frames, ignore_index=True)
+    out_loads.insert(0, "load_id", np.arange(1, len(out_loads) + 1))
+    out_buses = pd.concat(bus_frames, ignore_index=True)
+    out_pv = pd.concat(pv_frames, ignore_index=True)
+
+    tables = (out_buses, out_lines, out_loads, out_pv)
+    for fname, df in zip(GRID_CSVS, tables):
+        df.to_csv(out / fname, index=False)
+
+    with open(out / "fr_grid_metadata.json", "w") as fh:
+        json.dump({
+            "dataset_name": f"Synthetic_x{scale}",
+            "note": f"{scale} perturbed copies of {base.name} sharing one slack bus. NOT real data.",
+            "scale": scale,
+            "seed": seed,
+            "generator_version": GENERATOR_VERSION,
+            "buses": len(out_buses),
+            "lines": len(out_lines),
+            "tie_lines": len(tie_rows),
+            "feeder_peak_load_mw": float(out_loads["p_mw_peak"].sum()),
+            "feeder_pv_rated_mw": float(out_pv["p_mw_rated"].sum()),
+        }, fh, indent=2)
+    return out
+
+
+def synthetic_grid_dir(scale: int, seed: int = 0) -> Path:
+    """Directory of the generated grid for (scale, seed), generated on first use."""
+    out = SYNTHETIC_DIR / f"x{scale}_seed{seed}_v{GENERATOR_VERSION}"
+    if not all((out / fname).exists() for fname in GRID_CSVS):
+        generate_synthetic_grid(scale, out, seed)
+    return out
+
+
+def load_synthetic_grid(scale: int, seed: int = 0, **kwargs):
+    """pandapower net of the `scale`× synthetic grid (goes through load_france_grid's cache)."""
+    return load_france_grid(synthetic_grid_dir(scale, seed), **kwargs)
+
+
+def main():
+    rows = []
+    for scale in (1,) + SCALES:
+        t0 = time.perf_counter()
+        net = load_france_grid() if scale == 1 else load_synthetic_grid(scale)
+        t_load = time.perf_counter() - t0
+
+        model = NetworkModel.from_net(net)
+        t0 = time.perf_counter()
+        V, converged = ZBusSolver(model).solve(model.bus_injections(net.load["p_mw"], net.sgen["p_mw"]))
+        t_zbus = time.perf_counter() - t0
+
+        if scale == 1:
+            pp.runpp(net)   # warm-up
+        t0 = time.perf_counter()
+        pp.runpp(net)
+        t_nr = time.perf_counter() - t0
+
+        rows.append({
+            "scale": scale,
+            "buses": len(net.bus),
+            "lines": len(net.line),
+            "pv": len(net.sgen),
+            "load_s": t_load,
+            "runpp_s": t_nr,
+            "zbus_s": t_zbus,
+            "min_vm_pu": float(np.nanmin(np.abs(V))),
+            "max_abs_dv_pu": float(np.nanmax(np.abs(np.abs(V[0]) - net.res_bus["vm_pu"].to_numpy()))),
+            "converged": bool(converged.all()),
+        })
+
+    df = pd.DataFrame(rows)
+    print("\n=== SYNTHETIC GRID SCALING (peak snapshot) ===")
+    print(df.to_string(index=False))
+
+    out_path = "results/synthetic_grid_scaling.csv"
+    df.to_csv(out_path, index=False)
+    print(f"\nSaved scaling table to: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
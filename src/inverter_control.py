@@ -0,0 +1,200 @@
+"""
+Vectorized inverter control loops: Volt-VAR and voltage ride-through trips.
+
+All sgens (and a whole batch of cases) are handled as arrays. Each control
+iteration is one warm-started Z-bus solve followed by
+
+  - ride-through: inverters whose terminal voltage leaves the continuous
+    band of their class trip (P = Q = 0) and stay out for the snapshot;
+  - Volt-VAR: Q of the Volt-VAR sgens is set from the curve at their
+    terminal voltage, the others keep their fixed q_mvar.
+
+The Q fixed point is accelerated with Anderson mixing (damped Picard for
+anderson=0). In a time series, tripped inverters re-enter service once
+their terminal voltage is back inside the enter-service band.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.grid_topology.load_france_grid import DATA_DIR
+from src.powerflow.network import NetworkModel
+from src.powerflow.zbus import ZBusSolver
+
+INVERTER_PARAMS_CSV = DATA_DIR / "fr_inverter_parameters.csv"
+
+# Continuous operating band (p.u.) per ride-through class in
+# fr_inverter_parameters.csv; outside it the inverter trips within a step.
+RIDE_THROUGH_LIMITS = {"A": (0.88, 1.10), "B": (0.80, 1.12), "C": (0.70, 1.15)}
+
+# Terminal voltage band required before a tripped inverter re-enters service.
+ENTER_SERVICE = (0.917, 1.05)
+
+VOLT_VAR_MODES = ("VOLT_VAR", "VOLTVAR", "QV")
+
+
+@dataclass
+class VoltVarCurve:
+    v_pu: tuple = (0.92, 0.98, 1.02, 1.08)
+    q_frac: tuple = (1.0, 0.0, 0.0, -1.0)   # share of q_mvar_cap, injection positive
+
+    def __call__(self, vm: np.ndarray) -> np.ndarray:
+        return np.interp(vm, self.v_pu, self.q_frac)
+
+
+@dataclass
+class ControlResult:
+    V: np.ndarray           # (B, n_bus)
+    q_mvar: np.ndarray      # (B, n_sgen)
+    active: np.ndarray      # (B, n_sgen)
+    iterations: int
+    converged: np.ndarray   # (B,)
+
+
+def _inverter_class_rows(rated_kw, params: pd.DataFrame = None) -> pd.DataFrame:
+    """Row of fr_inverter_parameters.csv per sgen: the smallest inverter class rated at least as high."""
+    params = pd.read_csv(INVERTER_PARAMS_CSV) if params is None else params
+    params = params.sort_values("rated_kw").reset_index(drop=True)
+    idx = np.searchsorted(params["rated_kw"].to_numpy(), np.asarray(rated_kw, dtype=float))
+    return params.iloc[np.minimum(idx, len(params) - 1)]
+
+
+def inverter_ride_through_classes(rated_kw, params: pd.DataFrame = None) -> np.ndarray:
+    """Ride-through class per sgen (see _inverter_class_rows)."""
+    return _inverter_class_rows(rated_kw, params)["ride_through"].to_numpy()
+
+
+def inverter_max_ramp(rated_kw, params: pd.DataFrame = None) -> np.ndarray:
+    """Maximum ramp rate per sgen as a share of its rating per second."""
+    return _inverter_class_rows(rated_kw, params)["max_ramp_pct_per_s"].to_numpy(dtype=float) / 100.0
+
+
+class InverterControl:
+    def __init__(self, model: NetworkModel, q_cap_mvar, volt_var, v_low, v_high,
+                 curve: VoltVarCurve = None, ride_through: bool = True,
+                 anderson: int = 3, mixing: float = 1.0, tol: float = 1e-6, max_iter: int = 50):
+        self.model = model
+        self.q_cap = np.asarray(q_cap_mvar, dtype=float)
+        self.volt_var = np.asarray(volt_var, dtype=bool)
+        self.v_low = np.asarray(v_low, dtype=float)
+        self.v_high = np.asarray(v_high, dtype=float)
+        self.curve = VoltVarCurve() if curve is None else curve
+        self.ride_through = ride_through
+        self.anderson = anderson
+        self.mixing = mixing
+        self.tol = tol
+        self.max_iter = max_iter
+        self._solver = None
+
+    @classmethod
+    def from_net(cls, net, volt_var=None, rated_mw=None, **kwargs) -> "InverterControl":
+        """
+        Controls for the sgens of `net`. Volt-VAR applies to sgens whose
+        control_mode is a Volt-VAR mode unless `volt_var` (bool or per-sgen
+        mask) overrides it. Ride-through classes follow `rated_mw`
+        (default: the net's current p_mw).
+        """
+        sgen = net.sgen
+        q_cap = sgen["q_mvar_cap"] if "q_mvar_cap" in sgen else sgen["q_mvar"].abs()
+        if volt_var is None:
+            modes = sgen["control_mode"] if "control_mode" in sgen else pd.Series("PQ", index=sgen.index)
+            volt_var = modes.astype(str).str.upper().isin(VOLT_VAR_MODES).to_numpy()
+        rated_mw = sgen["p_mw"].to_numpy() if rated_mw is None else np.asarray(rated_mw, dtype=float)
+        classes = inverter_ride_through_classes(rated_mw * 1000.0)
+        limits = np.array([RIDE_THROUGH_LIMITS[c] for c in classes]).reshape(-1, 2)
+        return cls(NetworkModel.from_net(net), q_cap.to_numpy(dtype=float),
+                   np.broadcast_to(volt_var, len(sgen)), limits[:, 0], limits[:, 1], **kwargs)
+
+    @property
+    def solver(self) -> ZBusSolver:
+        if self._solver is None:
+            self._solver = ZBusSolver(self.model)
+        return self._solver
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_solver"] = None      # the factorization is rebuilt in worker processes
+        return state
+
+    def q_target(self, vm_sgen) -> np.ndarray:
+        """Q (MVAr) each sgen would set at terminal voltages vm_sgen (B × n_sgen)."""
+        return np.where(self.volt_var, self.curve(vm_sgen) * self.q_cap, self.model.sgen_q_mvar)
+
+    def solve(self, load_p_mw, sgen_p_mw, active=None, q0=None, V0=None) -> ControlResult:
+        """
+        Controlled snapshot(s): inputs are (B × n_load) / (B × n_sgen).
+        `active` marks inverters in service at the start (default: all).
+        """
+        m = self.model
+        load_p = np.atleast_2d(load_p_mw)
+        sgen_p = np.atleast_2d(sgen_p_mw)
+        B = max(len(load_p), len(sgen_p))
+        active = np.ones((B, len(m.sgen_bus)), dtype=bool) if active is None else np.array(active, dtype=bool)
+        q = np.broadcast_to(self.q_target(1.0) if q0 is None else q0, active.shape).astype(float)
+        V = V0
+        dX, dF = [], []
+        x_prev = f_prev = None
+        converged = np.zeros(B, dtype=bool)
+
+        for it in range(1, self.max_iter + 1):
+            S = m.bus_injections(load_p, sgen_p * active, sgen_q_mvar=q * active)
+            V, _ = self.solver.solve(S, V0=V)
+            vm = np.abs(V[:, m.sgen_bus])
+
+            if self.ride_through:
+                trip = active & ((vm < self.v_low) | (vm > self.v_high))
+                if trip.any():
+                    active = active & ~trip
+                    dX, dF, x_prev = [], [], None
+                    continue
+
+            f = self.q_target(vm) - q
+            converged = np.abs(f).max(axis=1) < self.tol
+            if converged.all():
+                break
+
+            if x_prev is not None and self.anderson:
+                dX.append(q - x_prev)
+                dF.append(f - f_prev)
+                dX, dF = dX[-self.anderson:], dF[-self.anderson:]
+            x_prev, f_prev = q, f
+            q = q + self.mixing * f
+            if dF:
+                q = q - self._anderson_step(np.stack(dX, axis=2), np.stack(dF, axis=2), f)
+
+        return ControlResult(V=V, q_mvar=q * active, active=active, iterations=it, converged=converged)
+
+    def _anderson_step(self, dX, dF, f):
+        """Batched least squares gamma = argmin |f - dF gamma|, returns (dX + mixing dF) gamma."""
+        A = np.einsum("bnk,bnl->bkl", dF, dF) + 1e-12 * np.eye(dF.shape[2])
+        gamma = np.linalg.solve(A, np.einsum("bnk,bn->bk", dF, f)[..., None])[..., 0]
+        return np.einsum("bnk,bk->bn", dX + self.mixing * dF, gamma)
+
+    def run_series(self, load_p_mw, sgen_p_mw, compromised=None) -> ControlResult:
+        """
+        Step through a (T × ...) schedule, warm-starting V and Q from the
+        previous step. Trips latch until the enter-service band is met.
+        `compromised` (the units under attack, see ReactiveMitigation) does
+        not change the local controls: every inverter keeps its own curve.
+        """
+        m = self.model
+        T = len(load_p_mw)
+        V = np.empty((T, m.n_bus), dtype=complex)
+        q = np.empty((T, len(m.sgen_bus)))
+        active_out = np.empty((T, len(m.sgen_bus)), dtype=bool)
+        converged = np.empty(T, dtype=bool)
+        iterations = 0
+
+        active, q_k, V_k = None, None, None
+        for k in range(T):
+            if V_k is not None:
+                vm = np.abs(V_k[:, m.sgen_bus])
+                active = active | ((vm >= ENTER_SERVICE[0]) & (vm <= ENTER_SERVICE[1]))
+            res = self.solve(load_p_mw[k], sgen_p_mw[k], active=active, q0=q_k, V0=V_k)
+            active, q_k, V_k = res.active, res.q_mvar, res.V
+            V[k], q[k], active_out[k], converged[k] = V_k[0], q_k[0], active[0], res.converged[0]
+            iterations += res.iterations
+
+        return ControlResult(V=V, q_mvar=q, active=active_out, iterations=iterations, converged=converged)
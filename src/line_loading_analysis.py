@@ -1,23 +1,10 @@
-import math
 import numpy as np
 import pandas as pd
-import pandapower as pp
 
 from src.grid_topology.load_france_grid import load_france_grid
 from src.load_data.load_profile_fr import load_fr_load_profile
-from src.attacks.attack_fr import apply_attack_to_pv
-
-
-def pv_shape_from_timestamp(ts: pd.Timestamp) -> float:
-    """
-    Same PV sunrise→sunset shape as in main.py.
-    """
-    hour = ts.hour + ts.minute / 60.0
-    if hour <= 6 or hour >= 18:
-        return 0.0
-    x = (hour - 6) / 12.0 * math.pi  # 0 at 6:00, pi at 18:00
-    val = math.sin(x)
-    return max(0.0, min(1.0, val))
+from src.result_store import ResultStore
+from src.timeseries import run_timeseries
 
 
 def compute_max_line_loading(with_attack: bool,
@@ -31,53 +18,50 @@ def compute_max_line_loading(with_attack: bool,
     If with_attack is True  -> apply S3 at 12:00.
     """
     net = load_france_grid()
-    base_load = net.load["p_mw"].copy()
-    base_pv = net.sgen["p_mw"].copy()
-
     profile = load_fr_load_profile()
     attack_time = pd.to_datetime(attack_time_str)
+    timestamps = profile["timestamp"]
 
     # For each line, track maximum loading over all time steps
     max_loading = np.zeros(len(net.line))
-    loading_at_attack = None
+    loading_at_attack = []
 
-    fleet_multiplier = 1.0
-    attack_applied = False
+    def track(k, net):
+        loading = net.res_line["loading_percent"].to_numpy()
+        np.maximum(max_loading, loading, out=max_loading)
+        if timestamps.iloc[k] == attack_time:
+            loading_at_attack.append(loading.copy())
 
-    for _, row in profile.iterrows():
-        ts = row["timestamp"]
-        mult = row["load_multiplier"]
+    if with_attack:
+        print(f"Triggering attack {scenario} at {attack_time}")
+    run_timeseries(net, profile, attack_time, scenario=scenario,
+                   with_attack=with_attack, callback=track)
 
-        # Scale loads
-        net.load["p_mw"] = base_load * mult
-
-        # PV shape
-        pv_shape = pv_shape_from_timestamp(ts)
-
-        # Optional attack at 12:00
-        if with_attack and (not attack_applied) and (ts == attack_time):
-            print(f"Triggering attack {scenario} at {ts}")
-            fleet_multiplier = apply_attack_to_pv(net, scenario)
-            attack_applied = True
-
-        # Apply PV profile + (maybe) attack derating
-        net.sgen["p_mw"] = base_pv * pv_shape * fleet_multiplier
+    df = pd.DataFrame({
+        "line_name": net.line["name"],
+        "max_loading_percent": max_loading,
+    })
+    if loading_at_attack:
+        df["loading_at_attack_percent"] = loading_at_attack[0]
 
-        # Power flow
-        pp.runpp(net)
+    return df
 
-        loading = net.res_line["loading_percent"].values
-        max_loading = np.maximum(max_loading, loading)
 
-        if ts == attack_time:
-            loading_at_attack = loading.copy()
+def line_loading_from_store(store_dir, attack_time_str: str = "2026-02-04 12:00:00") -> pd.DataFrame:
+    """
+    Same table as compute_max_line_loading, read from a ResultStore written
+    by a previous run instead of re-solving the day.
+    """
+    store = ResultStore.open(store_dir)
+    extremes = store.column_extremes("loading_percent")
 
     df = pd.DataFrame({
-        "line_name": net.line["name"],
-        "max_loading_percent": max_loading,
+        "line_name": store.line_names,
+        "max_loading_percent": extremes["max"].to_numpy(),
     })
-    if loading_at_attack is not None:
-        df["loading_at_attack_percent"] = loading_at_attack
+    attack_time = pd.to_datetime(attack_time_str)
+    if (store.timestamps == attack_time).any():
+        df["loading_at_attack_percent"] = store.at(attack_time)[1].astype(float)
 
     return df
 
@@ -1,10 +1,14 @@
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 PROFILE_CSV = PROJECT_ROOT / "data" / "france_sprint3" / "fr_load_profile_15min.csv"
 
+# Mainland France centroid, used by the seasonal PV shape.
+LATITUDE_DEG = 46.5
+
 def load_fr_load_profile():
     """
     Returns a DataFrame with:
@@ -14,4 +18,93 @@ def load_fr_load_profile():
     df = pd.read_csv(PROFILE_CSV)
     # Make sure timestamps are real datetimes (optional but useful)
     df["timestamp"] = pd.to_datetime(df["timestamp"])
-    return df
\ No newline at end of file
+    return df
+
+
+def iter_load_profile(path=PROFILE_CSV, chunk_steps: int = 2880):
+    """
+    Yield a (possibly multi-month) profile CSV with the same columns as
+    fr_load_profile_15min.csv in chunks of `chunk_steps` rows, so memory does
+    not grow with the horizon.
+    """
+    for chunk in pd.read_csv(path, chunksize=chunk_steps):
+        chunk["timestamp"] = pd.to_datetime(chunk["timestamp"])
+        yield chunk.reset_index(drop=True)
+
+
+def iter_tiled_profile(start, end, freq: str = "15min", chunk_steps: int = 2880,
+                       day_profile: pd.DataFrame = None, seasonal_load_amplitude: float = 0.0):
+    """
+    Synthetic long horizon: repeat the daily load curve from `day_profile`
+    (default: the Sprint-3 day) over [start, end] at `freq`, yielded in chunks.
+
+    seasonal_load_amplitude scales the curve by
+    1 + A * cos(2π (day_of_year - 15) / 365.25), i.e. +A in mid-January
+    and -A in mid-July.
+    """
+    day = load_fr_load_profile() if day_profile is None else day_profile
+    day_ts = pd.DatetimeIndex(day["timestamp"])
+    day_s = np.asarray((day_ts - day_ts.normalize()).total_seconds(), dtype=float)
+    day_mult = day["load_multiplier"].to_numpy(dtype=float)
+
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    step = pd.Timedelta(freq)
+    chunk_start = start
+    while chunk_start <= end:
+        n = min(chunk_steps, int((end - chunk_start) // step) + 1)
+        ts = pd.date_range(chunk_start, periods=n, freq=step)
+        tod_s = np.asarray((ts - ts.normalize()).total_seconds(), dtype=float)
+        mult = np.interp(tod_s, day_s, day_mult, period=86400.0)
+        if seasonal_load_amplitude:
+            doy = np.asarray(ts.dayofyear, dtype=float)
+            mult = mult * (1.0 + seasonal_load_amplitude * np.cos(2 * np.pi * (doy - 15) / 365.25))
+        yield pd.DataFrame({"timestamp": ts, "load_multiplier": mult})
+        chunk_start = ts[-1] + step
+
+
+def pv_shape_from_timestamp(ts: pd.Timestamp) -> float:
+    """Scalar PV shape for a single timestamp (see pv_shape)."""
+    return float(pv_shape([ts])[0])
+
+
+def pv_shape(timestamps, seasonal: bool = False) -> np.ndarray:
+    """
+    Vectorized PV sunrise→sunset shape (0 before 6:00 and after 18:00,
+    half-sine in between). Seconds are included, so it also works on
+    sub-minute time grids.
+
+    seasonal=True replaces the fixed 6:00–18:00 window with the day length
+    at LATITUDE_DEG and scales the peak by the noon sun elevation
+    (1.0 at the summer solstice, ~0.37 at the winter solstice).
+    """
+    ts = pd.DatetimeIndex(timestamps)
+    hour = ts.hour + ts.minute / 60.0 + ts.second / 3600.0
+    hour = np.asarray(hour, dtype=float)
+
+    if not seasonal:
+        shape = np.sin((hour - 6) / 12.0 * np.pi)  # 0 at 6:00, pi at 18:00
+        return np.where((hour <= 6) | (hour >= 18), 0.0, np.clip(shape, 0.0, 1.0))
+
+    lat = np.radians(LATITUDE_DEG)
+    doy = np.asarray(ts.dayofyear, dtype=float)
+    decl = np.radians(23.44) * np.sin(2 * np.pi * (284 + doy) / 365.0)
+    day_len = 2.0 * np.degrees(np.arccos(np.clip(-np.tan(lat) * np.tan(decl), -1.0, 1.0))) / 15.0
+    sunrise = 12.0 - day_len / 2.0
+    peak = np.cos(lat - decl) / np.cos(lat - np.radians(23.44))
+
+    x = (hour - sunrise) / day_len
+    shape = peak * np.sin(x * np.pi)
+    return np.where((x <= 0) | (x >= 1), 0.0, np.clip(shape, 0.0, 1.0))
+
+
+def interpolate_profile(profile: pd.DataFrame, timestamps) -> pd.DataFrame:
+    """
+    Linearly interpolate `load_multiplier` onto arbitrary timestamps
+    (e.g. a 1-second grid around the attack). Timestamps outside the profile
+    are held at the first/last value.
+    """
+    ts = pd.DatetimeIndex(timestamps)
+    x = ts.values.astype("datetime64[ns]").astype(np.int64)
+    xp = profile["timestamp"].values.astype("datetime64[ns]").astype(np.int64)
+    mult = np.interp(x, xp, profile["load_multiplier"].to_numpy(dtype=float))
+    return pd.DataFrame({"timestamp": ts, "load_multiplier": mult})
@@ -1,5 +1,8 @@
 # src/metrics.py
 
+import numpy as np
+
+
 def compute_voltage_metrics(df, v_min, v_max):
     undervoltage = (df["voltage"] < v_min).sum()
     overvoltage = (df["voltage"] > v_max).sum()
@@ -9,4 +12,13 @@ def compute_voltage_metrics(df, v_min, v_max):
     return {
         "undervoltage_pct": 100 * undervoltage / total,
         "overvoltage_pct": 100 * overvoltage / total,
-    }
\ No newline at end of file
+    }
+
+
+def compute_voltage_metrics_batch(voltage, v_min, v_max):
+    """compute_voltage_metrics for many realizations: `voltage` is (R × T), values are (R,) arrays."""
+    voltage = np.atleast_2d(voltage)
+    return {
+        "undervoltage_pct": 100 * (voltage < v_min).mean(axis=1),
+        "overvoltage_pct": 100 * (voltage > v_max).mean(axis=1),
+    }
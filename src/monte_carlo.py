@@ -0,0 +1,249 @@
+"""
+Monte Carlo over noisy load/PV injections at a single snapshot.
+
+Samples are drawn in fixed-size blocks, each with its own SeedSequence
+child stream, so the results only depend on (seed, block_size) and are
+identical for any number of workers. Each block is solved either with
+pandapower on the worker's own copy of the net, or as one batched
+Z-bus solve on the compiled network model (the fast path for 10^4-10^5
+samples).
+
+Every sample whose snapshot has a line above config.cascade_trip_loading is
+followed through the cascading-trip loop (src/cascade.py); the number of
+tripped lines is reported as `cascade_events`. With an InverterControl the
+zbus engine solves each block through its batched Volt-VAR / ride-through
+loop.
+
+run_multifidelity_monte_carlo combines a few AC samples with many samples
+of a linearized model (control variate, see LinearizedFlow).
+"""
+
+import copy
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pandapower as pp
+
+from src.cascade import CascadeSimulator
+from src.powerflow.network import NetworkModel
+from src.powerflow.sensitivity import Sensitivities
+from src.powerflow.zbus import ZBusSolver
+
+ENGINES = ("pandapower", "zbus")
+
+
+def sample_block(seed_seq, n, base_load, base_pv, load_noise_std, pv_noise_std):
+    """(n × n_load, n × n_sgen) noisy active powers for one block."""
+    rng = np.random.default_rng(seed_seq)
+    base_load = np.asarray(base_load, dtype=float)
+    base_pv = np.asarray(base_pv, dtype=float)
+    load = base_load * (1 + rng.normal(0, load_noise_std, size=(n, len(base_load))))
+    pv = base_pv * (1 + rng.normal(0, pv_noise_std, size=(n, len(base_pv))))
+    return load, pv
+
+
+def _limit_metrics(vm, loading, config):
+    """Percent of buses/lines outside limits, per sample (rows)."""
+    return {
+        "undervoltage_%": (vm < config.v_min_limit).mean(axis=1) * 100,
+        "overvoltage_%": (vm > config.v_max_limit).mean(axis=1) * 100,
+        "line_overload_%": (loading > config.max_line_loading).mean(axis=1) * 100,
+    }
+
+
+def _solve_pandapower(net, load, pv):
+    """Returns (vm, loading, None): complex voltages are not kept."""
+    vm = np.empty((len(load), len(net.bus)))
+    loading = np.empty((len(load), len(net.line)))
+    for k in range(len(load)):
+        net.load["p_mw"] = load[k]
+        net.sgen["p_mw"] = pv[k]
+        pp.runpp(net)
+        vm[k] = net.res_bus["vm_pu"].to_numpy()
+        loading[k] = net.res_line["loading_percent"].to_numpy()
+    return vm, loading, None
+
+
+def _solve_zbus(model, load, pv, control=None):
+    """Returns (vm, loading, V, S) with S the solved (controlled) injections."""
+    if control is None:
+        S = model.bus_injections(load, pv)
+        V, _ = ZBusSolver(model).solve(S)
+    else:
+        res = control.solve(load, pv)
+        S = model.bus_injections(load, pv * res.active, sgen_q_mvar=res.q_mvar)
+        V = res.V
+    return np.abs(V), model.line_loading(V), V, S
+
+
+def _cascade_events(model, S, V, loading, config):
+    """Tripped lines per sample; the cascade loop only runs for overloaded samples."""
+    over = np.flatnonzero((loading > config.cascade_trip_loading).any(axis=1))
+    n_trips = np.zeros(len(S), dtype=int)
+    if len(over):
+        simulator = CascadeSimulator(model, config.cascade_trip_loading, config.cascade_max_stages)
+        n_trips[over], _ = simulator.run_batch(S[over], None if V is None else V[over])
+    return n_trips
+
+
+def _mc_block(task):
+    """Worker: sample and solve one block. `target` is a net or a NetworkModel."""
+    engine, target, seed_seq, n, base_load, base_pv, config, control = task
+    load, pv = sample_block(seed_seq, n, base_load, base_pv,
+                            config.load_noise_std, config.pv_noise_std)
+    if engine == "pandapower":
+        vm, loading, V = _solve_pandapower(target, load, pv)
+        model = NetworkModel.from_net(target)
+        S = model.bus_injections(load, pv)
+    else:
+        vm, loading, V, S = _solve_zbus(target, load, pv, control)
+        model = target
+    metrics = _limit_metrics(vm, loading, config)
+    metrics["cascade_events"] = _cascade_events(model, S, V, loading, config)
+    return metrics
+
+
+def run_monte_carlo(net, config, base_load=None, base_pv=None, n_runs=None,
+                    engine: str = "pandapower", n_workers: int = 1,
+                    block_size: int = 1000, control=None) -> pd.DataFrame:
+    """
+    `n_runs` (default config.n_runs) noisy snapshots around base_load /
+    base_pv. `net` is never modified: the pandapower engine works on copies.
+    `control` (an InverterControl) needs the zbus engine.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}")
+    if control is not None and engine != "zbus":
+        raise ValueError("inverter control is only available with the zbus engine")
+    n_runs = config.n_runs if n_runs is None else n_runs
+    base_load = net.load["p_mw"].to_numpy(copy=True) if base_load is None else np.asarray(base_load)
+    base_pv = net.sgen["p_mw"].to_numpy(copy=True) if base_pv is None else np.asarray(base_pv)
+
+    sizes = [min(block_size, n_runs - s) for s in range(0, n_runs, block_size)]
+    streams = np.random.SeedSequence(config.seed).spawn(len(sizes))
+
+    if engine == "pandapower":
+        target = net
+    else:
+        target = NetworkModel.from_net(net)
+
+    if n_workers > 1:
+        tasks = [(engine, target, ss, n, base_load, base_pv, config, control)
+                 for ss, n in zip(streams, sizes)]
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(_mc_block, tasks))
+    else:
+        if engine == "pandapower":
+            target = copy.deepcopy(net)
+        results = [_mc_block((engine, target, ss, n, base_load, base_pv, config, control))
+                   for ss, n in zip(streams, sizes)]
+
+    return pd.DataFrame({key: np.concatenate([r[key] for r in results]) for key in results[0]})
+
+
+class LinearizedFlow:
+    """
+    Cheap surrogate: complex bus voltages linear in the load/sgen active
+    powers around the base snapshot (one AC solve + one sensitivity
+    factorization); |V| and loadings are evaluated exactly from the
+    linearized voltages.
+    """
+
+    def __init__(self, model: NetworkModel, base_load, base_pv):
+        self.model = model
+        self.x0 = np.concatenate([base_load, base_pv])
+        solver = ZBusSolver(model)
+        S0 = model.bus_injections(base_load, base_pv)[0]
+        V0, _ = solver.solve(S0)
+        self.V0 = V0[0]
+        dS = np.hstack([
+            -(model._incidence(model.load_bus) @ np.diag(model.load_scale)),
+            model._incidence(model.sgen_bus) @ np.diag(model.sgen_scale),
+        ]) / model.sn_mva
+        self.J = Sensitivities(solver, self.V0, S0).dV_injection(dS)    # n_bus × (n_load + n_sgen)
+
+    def solve(self, load, pv):
+        """(vm, loading) for (B × n_load) / (B × n_sgen) active powers."""
+        V = self.V0 + (np.hstack([load, pv]) - self.x0) @ self.J.T
+        V[:, np.isnan(self.V0)] = np.nan
+        return np.abs(V), self.model.line_loading(V)
+
+
+def _mf_outputs(vm, loading, config):
+    out = _limit_metrics(vm, loading, config)
+    out["min_vm_pu"] = np.nanmin(vm, axis=1)
+    out["max_loading_percent"] = loading.max(axis=1)
+    return out
+
+
+def run_multifidelity_monte_carlo(net, config, base_load=None, base_pv=None, n_runs=None,
+                                  n_cheap=None, engine: str = "pandapower",
+                                  block_size: int = 1000, control=None) -> pd.DataFrame:
+    """
+    Multi-fidelity estimate of the mean of each MC metric (plus the minimum
+    voltage and maximum loading).
+
+    n_cheap samples (default config.mc_cheap_runs) are drawn as in
+    run_monte_carlo and evaluated with LinearizedFlow; the first `n_runs`
+    (default config.n_runs) of them are also solved with the AC `engine`.
+    Per metric, with AC outputs Y and surrogate outputs Z:
+
+        mean(Y_n) + alpha * (mean(Z_N) - mean(Z_n)),   alpha = cov(Y, Z) / var(Z)
+
+    Its variance is var(Y)/n * (1 - (1 - n/N) rho^2). effective_ac_samples
+    is the number of plain AC samples with the same variance. Cascades are
+    not followed.
+
+    `control` (zbus engine only) is applied to the AC samples; the surrogate
+    stays uncontrolled, so the estimate is still unbiased but the variance
+    reduction is smaller where the control acts.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}")
+    if control is not None and engine != "zbus":
+        raise ValueError("inverter control is only available with the zbus engine")
+    n = config.n_runs if n_runs is None else n_runs
+    N = config.mc_cheap_runs if n_cheap is None else n_cheap
+    if N < n:
+        raise ValueError("n_cheap must be at least n_runs")
+    base_load = net.load["p_mw"].to_numpy(copy=True) if base_load is None else np.asarray(base_load)
+    base_pv = net.sgen["p_mw"].to_numpy(copy=True) if base_pv is None else np.asarray(base_pv)
+
+    sizes = [min(block_size, N - s) for s in range(0, N, block_size)]
+    streams = np.random.SeedSequence(config.seed).spawn(len(sizes))
+    blocks = [sample_block(ss, k, base_load, base_pv, config.load_noise_std, config.pv_noise_std)
+              for ss, k in zip(streams, sizes)]
+    load = np.concatenate([b[0] for b in blocks])
+    pv = np.concatenate([b[1] for b in blocks])
+
+    model = NetworkModel.from_net(net)
+    cheap = _mf_outputs(*LinearizedFlow(model, base_load, base_pv).solve(load, pv), config)
+    if engine == "pandapower":
+        vm, loading, _ = _solve_pandapower(copy.deepcopy(net), load[:n], pv[:n])
+    else:
+        vm, loading, _, _ = _solve_zbus(model, load[:n], pv[:n], control)
+    ac = _mf_outputs(vm, loading, config)
+
+    rows = []
+    for key, y in ac.items():
+        z = cheap[key]
+        z_n = z[:n]
+        var_y, var_z = y.var(ddof=1), z_n.var(ddof=1)
+        cov = np.cov(y, z_n)[0, 1]
+        alpha = cov / var_z if var_z > 0 else 0.0
+        rho2 = cov ** 2 / (var_y * var_z) if var_y > 0 and var_z > 0 else 0.0
+        estimate = y.mean() + alpha * (z.mean() - z_n.mean())
+        variance = var_y / n * (1 - (1 - n / N) * rho2)
+        rows.append({
+            "metric": key,
+            "estimate": estimate,
+            "std_error": np.sqrt(variance),
+            "ac_only_estimate": y.mean(),
+            "ac_only_std_error": np.sqrt(var_y / n),
+            "correlation": np.sqrt(rho2),
+            "ac_samples": n,
+            "cheap_samples": N,
+            "effective_ac_samples": var_y / variance if variance > 0 else float(n),
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,121 @@
+"""
+Backward/forward sweep power flow for radial feeders.
+
+The tree is ordered once from the slack bus and stored as a sparse
+branch-to-bus path matrix T (T[b, k] = 1 if line b lies on the path from
+the slack to bus k). Each iteration is then two sparse products over a
+whole batch of cases:
+
+    backward:  J = T I                 (line currents from bus currents)
+    forward:   V = V_s - Tᵀ diag(z) J   (voltage drops along each path)
+
+Line charging is lumped as a bus shunt at both ends. Meshed topologies are
+rejected with ValueError so callers can fall back to Newton-Raphson.
+"""
+
+from collections import deque
+
+import numpy as np
+import scipy.sparse as sp
+
+DEFAULT_TOL = 1e-10
+DEFAULT_MAX_ITER = 100
+
+
+def is_radial(model, line_in_service=None) -> bool:
+    """True if the energized part of the network is a tree."""
+    on = model.line_in_service if line_in_service is None else np.asarray(line_in_service, dtype=bool)
+    energized = model.energized(on)
+    return int((on & energized[model.f]).sum()) == int(energized.sum()) - 1
+
+
+class BFSSolver:
+    def __init__(self, model, line_in_service=None, tol: float = DEFAULT_TOL,
+                 max_iter: int = DEFAULT_MAX_ITER):
+        self.model = model
+        self.tol = tol
+        self.max_iter = max_iter
+        self.line_in_service = (model.line_in_service.copy() if line_in_service is None
+                                else np.asarray(line_in_service, dtype=bool))
+        if not is_radial(model, self.line_in_service):
+            raise ValueError("BFSSolver needs a radial network; the energized topology is meshed")
+
+        self.energized = model.energized(self.line_in_service)
+        self.order, self.parent_line = self._tree_order()
+        self.pq = np.array(self.order[1:], dtype=int)
+
+        self.T = self._path_matrix()
+        self.forward = (self.T.T @ sp.diags(1.0 / model.y_series)).tocsr()
+
+        on = np.flatnonzero(self.line_in_service & self.energized[model.f])
+        ysh = np.zeros(model.n_bus, dtype=complex)
+        np.add.at(ysh, model.f[on], model.y_shunt[on] / 2)
+        np.add.at(ysh, model.t[on], model.y_shunt[on] / 2)
+        self.y_bus_shunt = ysh
+
+    def _tree_order(self):
+        """Breadth-first bus order from the slack and the line feeding each bus (-1 for none)."""
+        m = self.model
+        neighbours = [[] for _ in range(m.n_bus)]
+        for b in np.flatnonzero(self.line_in_service):
+            neighbours[m.f[b]].append((m.t[b], b))
+            neighbours[m.t[b]].append((m.f[b], b))
+
+        parent_line = np.full(m.n_bus, -1)
+        seen = np.zeros(m.n_bus, dtype=bool)
+        seen[m.slack] = True
+        order, queue = [], deque([m.slack])
+        while queue:
+            k = queue.popleft()
+            order.append(k)
+            for j, b in neighbours[k]:
+                if not seen[j]:
+                    seen[j] = True
+                    parent_line[j] = b
+                    queue.append(j)
+        return order, parent_line
+
+    def _path_matrix(self) -> sp.csr_matrix:
+        """(n_line × n_bus) path matrix, built parent-first along the tree order."""
+        m = self.model
+        paths = {m.slack: []}
+        rows, cols = [], []
+        for k in self.order[1:]:
+            b = self.parent_line[k]
+            parent = m.f[b] if m.t[b] == k else m.t[b]
+            paths[k] = paths[parent] + [b]
+            rows.extend(paths[k])
+            cols.extend([k] * len(paths[k]))
+        return sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(m.n_line, m.n_bus))
+
+    def solve(self, S, V0=None):
+        """
+        Same interface as ZBusSolver.solve: S is (B × n_bus) complex
+        injections in p.u.; returns (V, converged) with V (B × n_bus),
+        NaN on de-energized buses.
+        """
+        m = self.model
+        S = np.atleast_2d(S)
+        B = len(S)
+        pq = self.pq
+
+        V = np.full((m.n_bus, B), m.v_slack, dtype=complex)
+        if V0 is not None:
+            V[pq] = np.asarray(V0, dtype=complex).reshape(B, -1)[:, pq].T
+        S_pq = S[:, pq].T
+        ysh = self.y_bus_shunt[pq, None]
+
+        I = np.zeros((m.n_bus, B), dtype=complex)
+        err = np.full(B, np.inf)
+        for self.last_iterations in range(1, self.max_iter + 1):
+            I[pq] = ysh * V[pq] - np.conj(S_pq / V[pq])
+            V_new = m.v_slack - self.forward @ (self.T @ I)
+            err = np.abs(V_new[pq] - V[pq]).max(axis=0)
+            V[pq] = V_new[pq]
+            if err.max() < self.tol:
+                break
+
+        out = np.full((B, m.n_bus), np.nan, dtype=complex)
+        out[:, m.slack] = m.v_slack
+        out[:, pq] = V[pq].T
+        return out, err < self.tol
@@ -0,0 +1,202 @@
+"""
+Feeder decomposition for multi-feeder networks.
+
+Removing the common (hub) bus splits a network into the feeders hanging off
+it. Each feeder is solved as its own sub-model with the hub as slack, in
+parallel worker processes, and the bus voltages are merged back.
+
+If the hub is the ext_grid bus (a stiff substation bus) the feeders are
+exactly independent and one pass is exact. If the hub sits behind an
+upstream network, feeders and upstream are coupled through the hub
+voltage: feeders are solved for the current hub voltage, the power they
+draw is injected at the hub of the upstream model, and the new hub voltage
+is fed back until it stops changing.
+
+Every feeder (and the upstream model) is factorized once. With n_workers > 1
+one process pool is kept for the life of the decomposition; each worker
+factorizes a feeder the first time it solves it and reuses the solver after
+that. Call close() (or use the object as a context manager) to stop the
+pool.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+from src.powerflow.zbus import ZBusSolver
+
+
+@dataclass
+class Feeder:
+    model: object        # NetworkModel restricted to the feeder, hub as slack
+    buses: np.ndarray    # bus positions in the full model (hub included)
+    lines: np.ndarray
+    loads: np.ndarray
+    sgens: np.ndarray
+
+
+def _components_without(model, hub: int) -> np.ndarray:
+    """Component label per bus once `hub` is removed (hub gets its own label)."""
+    on = model.line_in_service & (model.f != hub) & (model.t != hub)
+    adj = sp.coo_matrix((np.ones(on.sum()), (model.f[on], model.t[on])), shape=(model.n_bus, model.n_bus))
+    return connected_components(adj, directed=False)[1]
+
+
+def _hub_neighbours(model, hub: int) -> np.ndarray:
+    on = model.line_in_service
+    return np.unique(np.concatenate([model.t[on & (model.f == hub)], model.f[on & (model.t == hub)]]))
+
+
+def find_hub(model) -> int:
+    """The slack bus or one of its neighbours, whichever has the most feeders behind it."""
+    best, best_count = model.slack, 0
+    for bus in np.concatenate([[model.slack], _hub_neighbours(model, model.slack)]):
+        labels = _components_without(model, bus)
+        feeders = set(labels[_hub_neighbours(model, bus)])
+        if bus != model.slack:
+            feeders.discard(labels[model.slack])
+        if len(feeders) > best_count:
+            best, best_count = int(bus), len(feeders)
+    return best
+
+
+def _part(model, buses, slack) -> Feeder:
+    sub, lines, loads, sgens = model.restrict(buses, slack)
+    return Feeder(sub, np.asarray(buses), lines, loads, sgens)
+
+
+def split_feeders(model, hub: int = None):
+    """Returns (upstream, feeders); upstream is None when the hub is the slack."""
+    hub = model.slack if hub is None else hub
+    labels = _components_without(model, hub)
+    feeder_labels = sorted(set(labels[_hub_neighbours(model, hub)]))
+
+    upstream = None
+    if hub != model.slack:
+        feeder_labels.remove(labels[model.slack])
+        up_buses = np.concatenate([np.flatnonzero(labels == labels[model.slack]), [hub]])
+        upstream = _part(model, np.sort(up_buses), model.slack)
+
+    feeders = [_part(model, np.concatenate([[hub], np.flatnonzero(labels == lab)]), hub)
+               for lab in feeder_labels]
+    return upstream, feeders
+
+
+# Per-process feeder models and their solvers, set up by the pool initializer.
+_WORKER = {}
+
+
+def _init_worker(models) -> None:
+    _WORKER["models"] = models
+    _WORKER["solvers"] = {}
+
+
+def _solve_feeders(task):
+    """Worker: solve feeders [(index, load_p, sgen_p), ...] for hub voltages v_hub (B,)."""
+    group, v_hub = task
+    solvers = _WORKER["solvers"]
+    out = []
+    for i, load_p, sgen_p in group:
+        if i not in solvers:
+            solvers[i] = ZBusSolver(_WORKER["models"][i])
+        S = solvers[i].model.bus_injections(load_p, sgen_p)
+        out.append(solvers[i].solve(S, v_slack=v_hub))
+    return out
+
+
+class FeederDecomposition:
+    def __init__(self, model, hub: int = None, n_workers: int = 1, tol: float = 1e-10,
+                 max_boundary_iter: int = 50):
+        self.model = model
+        self.hub = find_hub(model) if hub is None else hub
+        self.upstream, self.feeders = split_feeders(model, self.hub)
+        self.n_workers = n_workers
+        self.tol = tol
+        self.max_boundary_iter = max_boundary_iter
+        # Hub row of each feeder's admittance matrix: hub current = row @ V_feeder.
+        self._hub_rows = [fd.model.ybus().tocsr()[fd.model.slack] for fd in self.feeders]
+        self.boundary_iterations = 0
+
+        self._solvers = None if n_workers > 1 else [ZBusSolver(fd.model) for fd in self.feeders]
+        self._up_solver = None if self.upstream is None else ZBusSolver(self.upstream.model)
+        self._pool = None
+
+    def __enter__(self) -> "FeederDecomposition":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the worker pool (if one was started)."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        return state
+
+    def _solve_all(self, load_p, sgen_p, v_hub):
+        tasks = [(i, load_p[:, fd.loads], sgen_p[:, fd.sgens]) for i, fd in enumerate(self.feeders)]
+        if self._solvers is not None:
+            return [solver.solve(solver.model.bus_injections(load, sgen), v_slack=v_hub)
+                    for solver, (_, load, sgen) in zip(self._solvers, tasks)]
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.n_workers, initializer=_init_worker,
+                                             initargs=([fd.model for fd in self.feeders],))
+        groups = [tasks[i::self.n_workers] for i in range(self.n_workers)]
+        results = list(self._pool.map(_solve_feeders, [(g, v_hub) for g in groups]))
+        merged = [None] * len(tasks)
+        for i, res in enumerate(results):
+            merged[i::self.n_workers] = res
+        return merged
+
+    def solve(self, load_p_mw, sgen_p_mw):
+        """
+        Batch solve, same inputs as NetworkModel.bus_injections. Returns
+        (V (B × n_bus), converged (B,)).
+        """
+        m = self.model
+        load_p = np.atleast_2d(load_p_mw)
+        sgen_p = np.atleast_2d(sgen_p_mw)
+        B = max(len(load_p), len(sgen_p))
+        load_p = np.broadcast_to(load_p, (B, load_p.shape[1]))
+        sgen_p = np.broadcast_to(sgen_p, (B, sgen_p.shape[1]))
+
+        V = np.full((B, m.n_bus), np.nan, dtype=complex)
+        converged = np.ones(B, dtype=bool)
+        v_hub = np.full(B, m.v_slack, dtype=complex)
+        if self.upstream is not None:
+            up = self.upstream
+            up_hub = int(np.flatnonzero(up.buses == self.hub)[0])
+            S_up0 = up.model.bus_injections(load_p[:, up.loads], sgen_p[:, up.sgens])
+            V_up = None
+
+        for self.boundary_iterations in range(1, self.max_boundary_iter + 1):
+            results = self._solve_all(load_p, sgen_p, v_hub)
+            converged = np.ones(B, dtype=bool)
+            for fd, (Vf, conv) in zip(self.feeders, results):
+                V[:, fd.buses] = Vf
+                converged &= conv
+            if self.upstream is None:
+                break
+
+            drawn = sum(v_hub * np.conj(row @ Vf.T).ravel()
+                        for row, (Vf, _) in zip(self._hub_rows, results))
+            S_up = S_up0.copy()
+            S_up[:, up_hub] -= drawn
+            V_up, conv_up = self._up_solver.solve(S_up, V0=V_up)
+            V[:, up.buses] = V_up
+            converged &= conv_up
+
+            step = np.abs(V_up[:, up_hub] - v_hub).max()
+            v_hub = V_up[:, up_hub]
+            if step < self.tol:
+                break
+
+        return V, converged
@@ -0,0 +1,184 @@
+"""
+Compiled array view of a line-only pandapower net (buses, lines, loads,
+sgens, one ext_grid), in per-unit on net.sn_mva.
+
+The fast solvers in this package work on this model instead of the
+pandapower tables, so injections for many cases can be passed as plain
+(B × n_load) / (B × n_sgen) arrays.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+# Element tables the compiled model does not represent.
+UNSUPPORTED_TABLES = ("trafo", "trafo3w", "gen", "shunt", "impedance", "switch",
+                      "xward", "ward", "dcline", "storage", "motor")
+
+
+@dataclass
+class NetworkModel:
+    n_bus: int
+    slack: int                  # position of the ext_grid bus
+    v_slack: complex
+    bus_index: np.ndarray       # pandapower bus index per position
+    f: np.ndarray               # line from-bus positions
+    t: np.ndarray               # line to-bus positions
+    y_series: np.ndarray        # per-unit series admittance per line
+    y_shunt: np.ndarray         # per-unit total shunt admittance per line (half at each end)
+    i_base_ka: np.ndarray       # per line, at the from-bus voltage level
+    i_max_ka: np.ndarray        # max_i_ka * df * parallel
+    line_in_service: np.ndarray
+    load_bus: np.ndarray
+    load_q_mvar: np.ndarray
+    load_scale: np.ndarray      # scaling * in_service
+    sgen_bus: np.ndarray
+    sgen_q_mvar: np.ndarray
+    sgen_scale: np.ndarray
+    sn_mva: float
+
+    @property
+    def n_line(self) -> int:
+        return len(self.f)
+
+    @classmethod
+    def from_net(cls, net) -> "NetworkModel":
+        for table in UNSUPPORTED_TABLES:
+            if table in net and len(net[table]):
+                raise NotImplementedError(f"NetworkModel supports line-only nets; found '{table}'")
+        if len(net.ext_grid) != 1:
+            raise ValueError("NetworkModel needs exactly one ext_grid")
+
+        bus_index = net.bus.index.to_numpy()
+        pos = {b: i for i, b in enumerate(bus_index)}
+        sn = float(net.sn_mva)
+
+        line = net.line
+        f = line["from_bus"].map(pos).to_numpy()
+        t = line["to_bus"].map(pos).to_numpy()
+        vn = net.bus["vn_kv"].to_numpy()[f]
+        z_base = vn ** 2 / sn
+        par = line["parallel"].to_numpy(dtype=float)
+        length = line["length_km"].to_numpy()
+
+        z = (line["r_ohm_per_km"].to_numpy() + 1j * line["x_ohm_per_km"].to_numpy()) * length / par
+        b = 2 * np.pi * float(net.f_hz) * line["c_nf_per_km"].to_numpy() * 1e-9 * length * par
+        g = line["g_us_per_km"].to_numpy() * 1e-6 * length * par if "g_us_per_km" in line else 0.0
+
+        eg = net.ext_grid.iloc[0]
+        v_slack = eg["vm_pu"] * np.exp(1j * np.radians(eg.get("va_degree", 0.0)))
+
+        return cls(
+            n_bus=len(bus_index),
+            slack=pos[eg["bus"]],
+            v_slack=complex(v_slack),
+            bus_index=bus_index,
+            f=f,
+            t=t,
+            y_series=z_base / z,
+            y_shunt=(g + 1j * b) * z_base,
+            i_base_ka=sn / (np.sqrt(3) * vn),
+            i_max_ka=line["max_i_ka"].to_numpy() * line["df"].to_numpy() * par,
+            line_in_service=line["in_service"].to_numpy(dtype=bool),
+            load_bus=net.load["bus"].map(pos).to_numpy(),
+            load_q_mvar=net.load["q_mvar"].to_numpy(dtype=float),
+            load_scale=(net.load["scaling"] * net.load["in_service"]).to_numpy(dtype=float),
+            sgen_bus=net.sgen["bus"].map(pos).to_numpy(),
+            sgen_q_mvar=net.sgen["q_mvar"].to_numpy(dtype=float),
+            sgen_scale=(net.sgen["scaling"] * net.sgen["in_service"]).to_numpy(dtype=float),
+            sn_mva=sn,
+        )
+
+    def restrict(self, buses, slack: int, v_slack=None):
+        """
+        Sub-model on bus positions `buses` (lines with both ends inside),
+        with `slack` (one of `buses`) as its slack bus. Returns
+        (submodel, line_idx, load_idx, sgen_idx): the indices of its lines,
+        loads and sgens in the full model.
+        """
+        buses = np.asarray(buses)
+        pos = np.full(self.n_bus, -1)
+        pos[buses] = np.arange(len(buses))
+        lines = np.flatnonzero((pos[self.f] >= 0) & (pos[self.t] >= 0))
+        load_idx = np.flatnonzero(pos[self.load_bus] >= 0)
+        sgen_idx = np.flatnonzero(pos[self.sgen_bus] >= 0)
+
+        sub = NetworkModel(
+            n_bus=len(buses),
+            slack=int(pos[slack]),
+            v_slack=self.v_slack if v_slack is None else complex(v_slack),
+            bus_index=self.bus_index[buses],
+            f=pos[self.f[lines]],
+            t=pos[self.t[lines]],
+            y_series=self.y_series[lines],
+            y_shunt=self.y_shunt[lines],
+            i_base_ka=self.i_base_ka[lines],
+            i_max_ka=self.i_max_ka[lines],
+            line_in_service=self.line_in_service[lines],
+            load_bus=pos[self.load_bus[load_idx]],
+            load_q_mvar=self.load_q_mvar[load_idx],
+            load_scale=self.load_scale[load_idx],
+            sgen_bus=pos[self.sgen_bus[sgen_idx]],
+            sgen_q_mvar=self.sgen_q_mvar[sgen_idx],
+            sgen_scale=self.sgen_scale[sgen_idx],
+            sn_mva=self.sn_mva,
+        )
+        return sub, lines, load_idx, sgen_idx
+
+    def ybus(self, line_in_service=None) -> sp.csc_matrix:
+        """Bus admittance matrix (n_bus × n_bus) for the given line status."""
+        on = self.line_in_service if line_in_service is None else np.asarray(line_in_service, dtype=bool)
+        f, t = self.f[on], self.t[on]
+        ys, ysh = self.y_series[on], self.y_shunt[on] / 2
+        rows = np.concatenate([f, t, f, t])
+        cols = np.concatenate([f, t, t, f])
+        vals = np.concatenate([ys + ysh, ys + ysh, -ys, -ys])
+        return sp.csc_matrix((vals, (rows, cols)), shape=(self.n_bus, self.n_bus))
+
+    def energized(self, line_in_service=None) -> np.ndarray:
+        """Boolean mask of buses connected to the slack through in-service lines."""
+        on = self.line_in_service if line_in_service is None else np.asarray(line_in_service, dtype=bool)
+        adj = sp.coo_matrix((np.ones(on.sum()), (self.f[on], self.t[on])), shape=(self.n_bus, self.n_bus))
+        _, labels = connected_components(adj, directed=False)
+        return labels == labels[self.slack]
+
+    def bus_injections(self, load_p_mw, sgen_p_mw, load_q_mvar=None, sgen_q_mvar=None) -> np.ndarray:
+        """
+        Net complex injection per bus in p.u. (generation positive), for a
+        batch of cases: inputs are (B × n_load) / (B × n_sgen), output (B × n_bus).
+        Reactive powers default to the values in the net.
+        """
+        load_p = np.atleast_2d(load_p_mw) * self.load_scale
+        sgen_p = np.atleast_2d(sgen_p_mw) * self.sgen_scale
+        B = max(len(load_p), len(sgen_p))
+        load_q = self.load_q_mvar if load_q_mvar is None else load_q_mvar
+        sgen_q = self.sgen_q_mvar if sgen_q_mvar is None else sgen_q_mvar
+        load_q = np.broadcast_to(load_q, (B, len(self.load_bus))) * self.load_scale
+        sgen_q = np.broadcast_to(sgen_q, (B, len(self.sgen_bus))) * self.sgen_scale
+
+        s_load = np.broadcast_to(load_p, load_q.shape) + 1j * load_q
+        s_sgen = np.broadcast_to(sgen_p, sgen_q.shape) + 1j * sgen_q
+        S = self._incidence(self.load_bus) @ (-s_load.T) + self._incidence(self.sgen_bus) @ s_sgen.T
+        return np.asarray(S).T / self.sn_mva
+
+    def _incidence(self, element_bus) -> sp.csr_matrix:
+        """Sparse (n_bus × n_elements) map from element injections to bus injections."""
+        n = len(element_bus)
+        return sp.csr_matrix((np.ones(n), (element_bus, np.arange(n))), shape=(self.n_bus, n))
+
+    def line_loading(self, V: np.ndarray, line_in_service=None) -> np.ndarray:
+        """
+        Line loading (%) like pandapower's res_line.loading_percent for
+        voltages V (... × n_bus). Out-of-service lines report 0.
+        """
+        vf, vt = V[..., self.f], V[..., self.t]
+        i_series = self.y_series * (vf - vt)
+        i_f = np.abs(i_series + self.y_shunt / 2 * vf)
+        i_t = np.abs(-i_series + self.y_shunt / 2 * vt)
+        i_ka = np.maximum(i_f, i_t) * self.i_base_ka
+        loading = np.nan_to_num(i_ka / self.i_max_ka * 100.0)
+        if line_in_service is not None:
+            loading = np.where(np.asarray(line_in_service, dtype=bool), loading, 0.0)
+        return loading
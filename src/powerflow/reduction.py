@@ -0,0 +1,115 @@
+"""
+Kron/Ward network reduction onto a set of retained buses.
+
+With k the retained buses (always including the slack) and e the
+eliminated ones, Kron elimination of Y gives
+
+    Y_red = Y_kk - Y_ke Y_ee⁻¹ Y_ek,     I_eq = T I_e,   T = -Y_ke Y_ee⁻¹
+
+Eliminated injections are modeled Ward-style as constant currents
+I_e = conj(S_e / V_ref,e) at a reference operating point. They are
+redistributed onto the retained buses through T. Retained injections stay
+constant-power and are solved with the same fixed-point iteration as
+ZBusSolver, on the dense (small) reduced system.
+
+The only approximation is the constant-current one. Linearizing it gives
+the per-case bound used by error_bound():
+
+    |δV_k| <= |Y_red,nn⁻¹ T| · (|S_e| · max|1/V_e - 1/V_ref,e|)
+"""
+
+import numpy as np
+from scipy.sparse.linalg import splu
+
+from src.powerflow.zbus import DEFAULT_MAX_ITER, DEFAULT_TOL
+
+
+class WardReduction:
+    def __init__(self, model, keep, V_ref=None, tol: float = DEFAULT_TOL,
+                 max_iter: int = DEFAULT_MAX_ITER):
+        """
+        `keep` are bus positions to retain (the slack is always added);
+        V_ref (n_bus,) is the operating point of the constant-current
+        equivalents (default: flat at the slack voltage).
+        """
+        self.model = model
+        self.tol = tol
+        self.max_iter = max_iter
+        keep = np.union1d(np.asarray(keep, dtype=int), [model.slack])
+        self.keep = keep
+        self.elim = np.setdiff1d(np.arange(model.n_bus), keep)
+        self.V_ref = (np.full(model.n_bus, model.v_slack, dtype=complex) if V_ref is None
+                      else np.asarray(V_ref, dtype=complex))
+
+        Y = model.ybus().tocsc()
+        Y_kk = Y[keep][:, keep].toarray()
+        Y_ke = Y[keep][:, self.elim]
+        Y_ek = Y[self.elim][:, keep].toarray()
+        self._Y_ek = Y_ek
+        self.lu_ee = splu(Y[self.elim][:, self.elim].tocsc())
+        self.Y_red = Y_kk - Y_ke @ self.lu_ee.solve(Y_ek)
+        # T = -Y_ke Y_ee⁻¹, from Tᵀ = -Y_ee⁻ᵀ Y_keᵀ.
+        self.T = -self.lu_ee.solve(Y_ke.T.toarray(), trans="T").T
+
+        self._s = int(np.flatnonzero(keep == model.slack)[0])
+        self._n = np.flatnonzero(keep != model.slack)
+        self.Z_nn = np.linalg.inv(self.Y_red[np.ix_(self._n, self._n)])
+        self.y_ns = self.Y_red[self._n, self._s]
+
+    @property
+    def size(self) -> int:
+        return len(self.keep)
+
+    def equivalent_currents(self, S) -> np.ndarray:
+        """Eliminated injections as currents on the retained buses, (B × n_keep)."""
+        S = np.atleast_2d(S)
+        return np.conj(S[:, self.elim] / self.V_ref[self.elim]) @ self.T.T
+
+    def solve(self, S, V0=None):
+        """
+        Retained-bus voltages (B × n_keep, in the order of self.keep) for full
+        injections S (B × n_bus, p.u.). Returns (V_k, converged).
+        """
+        S = np.atleast_2d(S)
+        B = len(S)
+        v_s = self.model.v_slack
+        rhs0 = (self.equivalent_currents(S)[:, self._n] - self.y_ns * v_s).T
+        S_n = S[:, self.keep[self._n]].T
+        V_n = (np.full((len(self._n), B), v_s, dtype=complex) if V0 is None
+               else np.asarray(V0, dtype=complex)[:, self._n].T.copy())
+
+        err = np.full(B, np.inf)
+        for _ in range(self.max_iter):
+            V_new = self.Z_nn @ (np.conj(S_n / V_n) + rhs0)
+            err = np.abs(V_new - V_n).max(axis=0)
+            V_n = V_new
+            if err.max() < self.tol:
+                break
+
+        V = np.empty((B, self.size), dtype=complex)
+        V[:, self._s] = v_s
+        V[:, self._n] = V_n.T
+        return V, err < self.tol
+
+    def expand(self, V_k, S) -> np.ndarray:
+        """Full (B × n_bus) voltages: eliminated buses recovered from the equivalent currents."""
+        S = np.atleast_2d(S)
+        I_e = np.conj(S[:, self.elim] / self.V_ref[self.elim])
+        V = np.empty((len(V_k), self.model.n_bus), dtype=complex)
+        V[:, self.keep] = V_k
+        V[:, self.elim] = self.lu_ee.solve((I_e - V_k @ self._Y_ek.T).T).T
+        return V
+
+    def error_bound(self, S, dv_max: float) -> np.ndarray:
+        """
+        First-order bound on |V_k error| (B × n_keep) when the eliminated
+        voltages stay within dv_max (p.u.) of V_ref.
+        """
+        S = np.atleast_2d(S)
+        v_ref = np.abs(self.V_ref[self.elim])
+        # |1/V - 1/V_ref| <= dv / (|V_ref| (|V_ref| - dv))
+        di = np.abs(S[:, self.elim]) * dv_max / (v_ref * (v_ref - dv_max))
+        M = np.abs(self.Z_nn @ self.T[self._n])
+        out = np.zeros((len(S), self.size))
+        out[:, self._n] = di @ M.T
+        return out
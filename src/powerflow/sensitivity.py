@@ -0,0 +1,74 @@
+"""
+Linearized power-flow sensitivities around a solved operating point.
+
+Differentiating  Y_nn V_n + Y_ns V_s = conj(S_n / V_n)  gives
+
+    Y dV + D conj(dV) = conj(dS) / conj(V),   D = diag(conj(S) / conj(V)²)
+
+which is solved as a sparse 2n × 2n real system (factorized once per
+operating point) for any number of injection directions. From dV we get
+voltage-magnitude and line-loading sensitivities.
+"""
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+
+class Sensitivities:
+    def __init__(self, solver, V, S):
+        """
+        `solver` is a ZBusSolver, V (n_bus,) its solution for injections S
+        (n_bus,) in p.u.
+        """
+        self.solver = solver
+        self.model = solver.model
+        self.V = np.asarray(V)
+        pq = solver.pq
+
+        Y = self.model.ybus(solver.line_in_service).tocsc()[pq][:, pq]
+        Vn = self.V[pq]
+        D = sp.diags(np.conj(np.asarray(S)[pq]) / np.conj(Vn) ** 2)
+        Yr, Yi = Y.real, Y.imag
+        Dr, Di = D.real, D.imag
+        A = sp.bmat([[Yr + Dr, -Yi + Di], [Yi + Di, Yr - Dr]], format="csc")
+        self.lu = splu(A)
+
+    def dV(self, buses, reactive: bool = False) -> np.ndarray:
+        """
+        Complex dV (n_bus × k) per p.u. of active (or reactive) injection at
+        each bus in `buses`. Columns for the slack or de-energized buses are 0.
+        """
+        buses = np.asarray(buses)
+        dS = np.zeros((self.model.n_bus, len(buses)), dtype=complex)
+        dS[buses, np.arange(len(buses))] = 1j if reactive else 1.0
+        return self.dV_injection(dS)
+
+    def dV_injection(self, dS) -> np.ndarray:
+        """Complex dV (n_bus × k) for injection directions dS (n_bus × k, p.u.)."""
+        pq = self.solver.pq
+        n = len(pq)
+        dS = np.asarray(dS, dtype=complex).reshape(self.model.n_bus, -1)
+        rhs = np.conj(dS[pq]) / np.conj(self.V[pq])[:, None]
+
+        xy = self.lu.solve(np.vstack([rhs.real, rhs.imag]))
+        out = np.zeros((self.model.n_bus, dS.shape[1]), dtype=complex)
+        out[pq] = xy[:n] + 1j * xy[n:]
+        return out
+
+    def dVm(self, buses, reactive: bool = False) -> np.ndarray:
+        """d|V| (n_bus × k) per p.u. injection at each bus in `buses`."""
+        dV = self.dV(buses, reactive)
+        V = self.V[:, None]
+        return np.nan_to_num((np.conj(V) * dV).real / np.abs(V))
+
+    def dLoading(self, buses, reactive: bool = False) -> np.ndarray:
+        """d loading_percent (n_line × k) per p.u. injection at each bus."""
+        m = self.model
+        dV = self.dV(buses, reactive)
+        V = self.V
+        I = m.y_series * (V[m.f] - V[m.t]) + m.y_shunt / 2 * V[m.f]
+        dI = m.y_series[:, None] * (dV[m.f] - dV[m.t]) + (m.y_shunt / 2)[:, None] * dV[m.f]
+        scale = (m.i_base_ka / m.i_max_ka * 100.0)[:, None]
+        absI = np.abs(I)[:, None]
+        return np.nan_to_num(scale * (np.conj(I)[:, None] * dI).real / np.where(absI > 0, absI, np.inf))
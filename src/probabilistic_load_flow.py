@@ -0,0 +1,193 @@
+"""
+Probabilistic load flow: Hong's 2m+1 point-estimate method.
+
+Same input model as the Monte Carlo study (src/monte_carlo.py): every load
+and sgen active power is base * (1 + N(0, std)), independently. For m
+uncertain inputs the 2m+1 scheme evaluates the power flow at the mean and
+at mean ± sqrt(3)·std of one input at a time (weights 1/6 each). The
+per-input cumulants are summed into the first four moments of every bus
+voltage and line loading: 2m+1 solves, done as one batched Z-bus solve.
+
+Limit probabilities and quantiles come from the moments through a
+Gram-Charlier type A series and the Cornish-Fisher expansion. The expected
+undervoltage/overvoltage/overload percentages are directly comparable with
+the means of the run_monte_carlo columns.
+"""
+
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from src.config import SimulationConfig
+from src.grid_topology.load_france_grid import load_france_grid
+from src.monte_carlo import run_monte_carlo, sample_block
+from src.powerflow.network import NetworkModel
+from src.powerflow.zbus import ZBusSolver
+
+# Hong's 2m+1 locations for a standard normal input (skewness 0, kurtosis 3).
+PEM_XI = np.sqrt(3.0)
+PEM_WEIGHT = 1.0 / 6.0
+
+QUANTILES = (0.05, 0.95)
+
+
+@dataclass
+class ProbabilisticResult:
+    bus: pd.DataFrame       # per bus: mean, std, skew, kurt, quantiles, P(below/above limit)
+    line: pd.DataFrame      # per line: the same for loading_percent
+    metrics: dict           # expected undervoltage_% / overvoltage_% / line_overload_%
+    n_solves: int
+
+
+def gram_charlier_cdf(x, mean, std, skew, kurt):
+    """P(Y <= x) from the first four moments (kurt is the full kurtosis, 3 for a normal)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (x - mean) / std
+        F = norm.cdf(z) - norm.pdf(z) * (skew / 6 * (z ** 2 - 1) + (kurt - 3) / 24 * (z ** 3 - 3 * z))
+    # Deterministic outputs are a step at the mean.
+    F = np.where(std > 0, F, (x >= mean).astype(float))
+    return np.clip(F, 0.0, 1.0)
+
+
+def cornish_fisher_quantile(q, mean, std, skew, kurt):
+    z = norm.ppf(q)
+    w = (z + (z ** 2 - 1) * skew / 6 + (z ** 3 - 3 * z) * (kurt - 3) / 24
+         - (2 * z ** 3 - 5 * z) * skew ** 2 / 36)
+    return mean + std * w
+
+
+def _moments(Y):
+    """
+    Mean, std, skewness and kurtosis per column of the point-estimate
+    outputs Y (rows: mean point, then +xi / -xi per input).
+
+    Each input's three points give the moments of its own contribution
+    Y(x_k) - Y(mean); the contributions are treated as independent, so their
+    cumulants add. (Summing raw moments over the points, as in plain
+    Hong's method, drops the cross terms of the third and fourth moments.)
+    Working with differences from Y(mean) also avoids cancellation at |V| ≈ 1 p.u.
+    """
+    center, plus, minus = Y[0], Y[1::2] - Y[0], Y[2::2] - Y[0]
+    m1, m2, m3, m4 = ((plus ** k + minus ** k) * PEM_WEIGHT for k in (1, 2, 3, 4))
+    var = m2 - m1 ** 2
+    k3 = m3 - 3 * m1 * m2 + 2 * m1 ** 3
+    k4 = m4 - 4 * m1 * m3 + 6 * m1 ** 2 * m2 - 3 * m1 ** 4 - 3 * var ** 2
+    var, k3, k4 = (np.maximum(var.sum(axis=0), 0.0), k3.sum(axis=0), k4.sum(axis=0))
+    std = np.sqrt(var)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        skew = np.where(var > 0, k3 / std ** 3, 0.0)
+        kurt = np.where(var > 0, 3 + k4 / var ** 2, 3.0)
+    return center + m1.sum(axis=0), std, skew, kurt
+
+
+def _summary(index, mean, std, skew, kurt):
+    df = pd.DataFrame({"mean": mean, "std": std, "skew": skew, "kurt": kurt}, index=index)
+    for q in QUANTILES:
+        df[f"q{int(q * 100):02d}"] = cornish_fisher_quantile(q, mean, std, skew, kurt)
+    return df
+
+
+def point_estimate_load_flow(net, config: SimulationConfig, base_load=None, base_pv=None,
+                             control=None) -> ProbabilisticResult:
+    """
+    Moments and limit statistics of bus voltages / line loadings under the
+    run_monte_carlo noise model, from one batch of 2m+1 Z-bus solves.
+    `control` is an InverterControl (or ReactiveMitigation) for the batch.
+    """
+    model = NetworkModel.from_net(net)
+    base_load = net.load["p_mw"].to_numpy(dtype=float) if base_load is None else np.asarray(base_load, dtype=float)
+    base_pv = net.sgen["p_mw"].to_numpy(dtype=float) if base_pv is None else np.asarray(base_pv, dtype=float)
+
+    # Uncertain inputs: (base, std) of every load and sgen with a non-zero spread.
+    base = np.concatenate([base_load, base_pv])
+    std = np.concatenate([base_load * config.load_noise_std, base_pv * config.pv_noise_std])
+    uncertain = np.flatnonzero(std != 0)
+    m = len(uncertain)
+
+    # Points: the mean, then +xi and -xi for each uncertain input in turn.
+    X = np.tile(base, (2 * m + 1, 1))
+    rows = np.arange(m)
+    X[1 + 2 * rows, uncertain] += PEM_XI * std[uncertain]
+    X[2 + 2 * rows, uncertain] -= PEM_XI * std[uncertain]
+
+    load, pv = X[:, :len(base_load)], X[:, len(base_load):]
+    if control is None:
+        V, _ = ZBusSolver(model).solve(model.bus_injections(load, pv))
+    else:
+        V = control.solve(load, pv).V
+    vm, loading = np.abs(V), model.line_loading(V)
+
+    bus = _summary(net.bus.index, *_moments(vm))
+    line = _summary(net.line.index, *_moments(loading))
+    bus["p_under"] = gram_charlier_cdf(config.v_min_limit, bus["mean"], bus["std"], bus["skew"], bus["kurt"])
+    bus["p_over"] = 1 - gram_charlier_cdf(config.v_max_limit, bus["mean"], bus["std"], bus["skew"], bus["kurt"])
+    line["p_overload"] = 1 - gram_charlier_cdf(config.max_line_loading, line["mean"], line["std"],
+                                               line["skew"], line["kurt"])
+
+    # Expected share of buses/lines outside limits = mean per-element probability
+    # (out-of-service elements are NaN and excluded, as in the MC percentages they count as inside).
+    metrics = {
+        "undervoltage_%": bus["p_under"].fillna(0).mean() * 100,
+        "overvoltage_%": bus["p_over"].fillna(0).mean() * 100,
+        "line_overload_%": line["p_overload"].fillna(0).mean() * 100,
+    }
+    return ProbabilisticResult(bus=bus, line=line, metrics=metrics, n_solves=2 * m + 1)
+
+
+def main():
+    net = load_france_grid()
+    # Limits tightened around the feeder's operating range and noise widened,
+    # so the exceedance statistics are not all zero.
+    config = SimulationConfig(v_min_limit=0.993, max_line_loading=21.0,
+                              load_noise_std=0.15, pv_noise_std=0.25)
+    n_mc = 20000
+    model = NetworkModel.from_net(net)
+
+    t0 = time.perf_counter()
+    plf = point_estimate_load_flow(net, config)
+    t_pem = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    mc = run_monte_carlo(net, config, n_runs=n_mc, engine="zbus", block_size=n_mc)
+    t_mc = time.perf_counter() - t0
+
+    metrics = pd.DataFrame([{
+        "metric": metric,
+        "pem": plf.metrics[metric],
+        "monte_carlo": mc[metric].mean(),
+        "mc_std_error": mc[metric].std() / np.sqrt(n_mc),
+    } for metric in plf.metrics])
+
+    # Per-element statistics from the same samples (one block, same stream).
+    load, pv = sample_block(np.random.SeedSequence(config.seed).spawn(1)[0], n_mc,
+                            net.load["p_mw"], net.sgen["p_mw"], config.load_noise_std, config.pv_noise_std)
+    V, _ = ZBusSolver(model).solve(model.bus_injections(load, pv))
+    rows = []
+    for name, ref, est in (("vm_pu", np.abs(V), plf.bus), ("loading_percent", model.line_loading(V), plf.line)):
+        ref_std = np.nanstd(ref, axis=0)
+        rows.append({"output": name, "statistic": "mean",
+                     "max_abs_error": np.nanmax(np.abs(est["mean"] - np.nanmean(ref, axis=0)))})
+        rows.append({"output": name, "statistic": "std (relative)",
+                     "max_abs_error": np.nanmax(np.abs(est["std"] - ref_std)[ref_std > 0] / ref_std[ref_std > 0])})
+        for q in QUANTILES:
+            col = f"q{int(q * 100):02d}"
+            rows.append({"output": name, "statistic": col,
+                         "max_abs_error": np.nanmax(np.abs(est[col] - np.nanquantile(ref, q, axis=0)))})
+    accuracy = pd.DataFrame(rows)
+
+    print(f"\n=== PROBABILISTIC LOAD FLOW vs MONTE CARLO ({n_mc} samples) ===")
+    print(metrics.to_string(index=False))
+    print()
+    print(accuracy.to_string(index=False))
+    print(f"\nPoint estimate: {plf.n_solves} solves, {t_pem:.3f} s; Monte Carlo: {n_mc} solves, {t_mc:.3f} s")
+
+    out_path = "results/probabilistic_load_flow.csv"
+    pd.concat([metrics, accuracy], ignore_index=True).to_csv(out_path, index=False)
+    print(f"\nSaved comparison to: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
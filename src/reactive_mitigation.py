@@ -0,0 +1,237 @@
+"""
+Reactive-power mitigation with the surviving (uncompromised) inverters.
+
+After an S1–S5 event the q_mvar setpoints of the sgens that are not
+compromised are redispatched within ±q_mvar_cap to hold every bus voltage
+inside [v_min, v_max]. The compromised units are the largest ones, the
+last one derated only partially, so that they carry the scenario's
+compromised_pct of rated capacity (compromised_sgens); targeted_attack
+applies the scenario to exactly those units, and in a time series they are
+excluded from Q support only from the step their setpoint is attacked.
+Per case:
+
+  1. one Z-bus solve at the current setpoints (batched over all cases);
+  2. if some voltage is outside the band (tightened by `margin`), a small
+     QP on the linearized voltage sensitivities d|V|/dQ:
+
+        min  Σ_outside (|V_i| + X_i Δq - limit_i)² + q_weight ‖Δq‖²
+        s.t. -q_cap ≤ q0 + Δq ≤ q_cap
+
+     solved as bounded least squares with an active set over the buses that
+     end up outside the band;
+  3. one AC solve with the new setpoints (batched) to verify.
+
+Cases already inside the band keep their setpoints, so a day or a Monte
+Carlo batch only pays for the QP where it is needed. The class has the
+solve / run_series interface of InverterControl and plugs into the same
+time-series and Monte Carlo paths.
+"""
+
+import time
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import lsq_linear
+
+from src.attacks.base_attack import StepAttack
+from src.attacks.catalog import default_catalog
+from src.config import SimulationConfig
+from src.grid_topology.load_france_grid import load_france_grid
+from src.inverter_control import ControlResult
+from src.load_data.load_profile_fr import load_fr_load_profile
+from src.powerflow.network import NetworkModel
+from src.powerflow.sensitivity import Sensitivities
+from src.powerflow.zbus import ZBusSolver
+from src.timeseries import prepare_injections
+
+# main() starts from unity power factor (the bundled sgens already inject
+# q_mvar_cap) and holds this operating band, tighter than the config limits
+# the stiff France feeder never leaves.
+DEMO_BAND = (0.99, 1.01)
+
+
+def _largest_target(scenario: str):
+    """The catalog row for `scenario`, retargeted at the largest units."""
+    catalog = default_catalog()
+    return replace(catalog.subset(catalog.index_of(scenario)), target=np.array(["largest"], dtype=object))
+
+
+def compromised_sgens(rated_mw, scenario: str = None) -> np.ndarray:
+    """
+    Mask of the sgens `scenario` touches: the largest units, the last one
+    partially, holding the scenario's compromised_pct of rated capacity.
+    """
+    rated_mw = np.asarray(rated_mw, dtype=float)
+    if scenario is None:
+        return np.zeros(len(rated_mw), dtype=bool)
+    return _largest_target(scenario).compromised_share(rated_mw)[0] > 0
+
+
+def targeted_attack(scenario: str, attack_time, rated_mw, ramp: bool = False) -> StepAttack:
+    """
+    `scenario` applied to the compromised_sgens units only, from attack_time
+    (a step, or the scenario's ramp_seconds ramp with ramp=True). The
+    attacked MW is compromised_pct of the fleet, as for the fleet-wide runs.
+    """
+    row = _largest_target(scenario)
+    return StepAttack(attack_time, row.sgen_multipliers(rated_mw)[0],
+                      ramp_seconds=row.ramp_seconds[0] if ramp else 0.0)
+
+
+class ReactiveMitigation:
+    def __init__(self, model: NetworkModel, q_cap_mvar, v_min: float, v_max: float,
+                 compromised=None, margin: float = 0.002, q_weight: float = 1e-6,
+                 max_active_set_iter: int = 10):
+        self.model = model
+        self.q_cap = np.asarray(q_cap_mvar, dtype=float)
+        self.v_min = v_min
+        self.v_max = v_max
+        self.available = (np.ones(len(self.q_cap), dtype=bool) if compromised is None
+                          else ~np.asarray(compromised, dtype=bool))
+        self.margin = margin
+        self.q_weight = q_weight
+        self.max_active_set_iter = max_active_set_iter
+        self.qp_solves = 0
+        self._solver = None
+
+    @classmethod
+    def from_net(cls, net, config: SimulationConfig, scenario: str = None, rated_mw=None,
+                 **kwargs) -> "ReactiveMitigation":
+        """Mitigation for the sgens of `net` with config's voltage limits; `scenario` picks the compromised units."""
+        sgen = net.sgen
+        q_cap = sgen["q_mvar_cap"] if "q_mvar_cap" in sgen else sgen["q_mvar"].abs()
+        rated_mw = sgen["p_mw"].to_numpy() if rated_mw is None else np.asarray(rated_mw, dtype=float)
+        kwargs.setdefault("compromised", compromised_sgens(rated_mw, scenario))
+        return cls(NetworkModel.from_net(net), q_cap.to_numpy(dtype=float),
+                   config.v_min_limit, config.v_max_limit, **kwargs)
+
+    @property
+    def solver(self) -> ZBusSolver:
+        if self._solver is None:
+            self._solver = ZBusSolver(self.model)
+        return self._solver
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_solver"] = None      # the factorization is rebuilt in worker processes
+        return state
+
+    def _dispatch(self, V, S, q0, available) -> np.ndarray:
+        """QP for one case: new q (n_sgen,) of the `available` units from setpoints q0 and solved voltages V."""
+        m = self.model
+        lo, hi = self.v_min + self.margin, self.v_max - self.margin
+        buses = np.flatnonzero(self.solver.energized)
+        vm = np.abs(V[buses])
+        if ((vm >= lo) & (vm <= hi)).all() or not available.any():
+            return q0
+
+        avail = np.flatnonzero(available)
+        X = Sensitivities(self.solver, V, S).dVm(m.sgen_bus[avail], reactive=True)[buses] / m.sn_mva
+        bounds = (-self.q_cap[avail] - q0[avail], self.q_cap[avail] - q0[avail])
+        reg = np.sqrt(self.q_weight) * np.eye(len(avail))
+
+        # Buses join the active set (tracking the band edge they crossed) once
+        # the predicted voltage leaves the band; stop when no new bus joins.
+        dq = np.zeros(len(avail))
+        target = np.full(len(buses), np.nan)
+        for _ in range(self.max_active_set_iter):
+            pred = vm + X @ dq
+            enter = np.isnan(target) & ((pred < lo) | (pred > hi))
+            if not enter.any():
+                break
+            target[enter] = np.where(pred[enter] < lo, lo, hi)
+            active = ~np.isnan(target)
+            A = np.vstack([X[active], reg])
+            b = np.concatenate([target[active] - vm[active], np.zeros(len(avail))])
+            dq = lsq_linear(A, b, bounds=bounds).x
+            self.qp_solves += 1
+
+        q = q0.copy()
+        q[avail] += dq
+        return q
+
+    def solve(self, load_p_mw, sgen_p_mw, active=None, q0=None, V0=None,
+              compromised=None) -> ControlResult:
+        """
+        Mitigated snapshot(s): inputs are (B × n_load) / (B × n_sgen).
+        `q0` are the setpoints before redispatch (default: the net's q_mvar).
+        `compromised` ((n_sgen,) or (B × n_sgen)) replaces the units fixed
+        at construction, e.g. with the per-step mask of an attack schedule.
+        """
+        m = self.model
+        load_p = np.atleast_2d(load_p_mw)
+        sgen_p = np.atleast_2d(sgen_p_mw)
+        B = max(len(load_p), len(sgen_p))
+        q = np.array(np.broadcast_to(m.sgen_q_mvar if q0 is None else q0, (B, len(m.sgen_bus))), dtype=float)
+        available = self.available if compromised is None else ~np.asarray(compromised, dtype=bool)
+        available = np.broadcast_to(available, q.shape)
+
+        S = m.bus_injections(load_p, sgen_p, sgen_q_mvar=q)
+        V, _ = self.solver.solve(S, V0=V0)
+        for k in range(B):
+            q[k] = self._dispatch(V[k], S[k], q[k], available[k])
+
+        V, converged = self.solver.solve(m.bus_injections(load_p, sgen_p, sgen_q_mvar=q), V0=V)
+        return ControlResult(V=V, q_mvar=q, active=np.ones_like(q, dtype=bool),
+                             iterations=2, converged=converged)
+
+    def run_series(self, load_p_mw, sgen_p_mw, compromised=None) -> ControlResult:
+        """
+        A (T × ...) schedule: every step is an independent snapshot, solved
+        as one batch. `compromised` is the (T × n_sgen) mask of units under
+        attack per step (InjectionPlan.compromised).
+        """
+        return self.solve(load_p_mw, sgen_p_mw, compromised=compromised)
+
+
+def main():
+    config = SimulationConfig()
+    net = load_france_grid()
+    profile = load_fr_load_profile()
+    model = NetworkModel.from_net(net)
+
+    rated = net.sgen["p_mw"].to_numpy()
+    rows = []
+    for scenario in ("S1", "S3", "S5"):
+        attack = targeted_attack(scenario, config.attack_time, rated)
+        plan = prepare_injections(profile, net.load["p_mw"], rated, attack.schedule(profile["timestamp"], rated))
+        mitigation = ReactiveMitigation.from_net(net, config)
+        mitigation.v_min, mitigation.v_max = DEMO_BAND
+
+        q0 = np.zeros(len(net.sgen))
+        V_before, _ = mitigation.solver.solve(
+            model.bus_injections(plan.load_p_mw, plan.sgen_p_mw, sgen_q_mvar=q0))
+        t0 = time.perf_counter()
+        res = mitigation.solve(plan.load_p_mw, plan.sgen_p_mw, q0=q0, compromised=plan.compromised())
+        elapsed = time.perf_counter() - t0
+
+        vm_before, vm_after = np.abs(V_before), np.abs(res.V)
+
+        def outside(vm):
+            return ((vm < DEMO_BAND[0]) | (vm > DEMO_BAND[1])).sum()
+
+        rows.append({
+            "scenario": scenario,
+            "compromised_sgens": int(plan.compromised().any(axis=0).sum()),
+            "attacked_mw": float(rated @ (1.0 - attack.multiplier)),
+            "min_vm_before": np.nanmin(vm_before),
+            "min_vm_after": np.nanmin(vm_after),
+            "bus_steps_outside_before": int(outside(vm_before)),
+            "bus_steps_outside_after": int(outside(vm_after)),
+            "max_q_mvar": res.q_mvar.sum(axis=1).max(),
+            "qp_solves": mitigation.qp_solves,
+            "ms_per_step": elapsed / len(plan) * 1000,
+        })
+
+    df = pd.DataFrame(rows)
+    print(f"\n=== REACTIVE-POWER MITIGATION (band {DEMO_BAND[0]}-{DEMO_BAND[1]} p.u.) ===")
+    print(df.to_string(index=False))
+
+    out_path = "results/reactive_mitigation.csv"
+    df.to_csv(out_path, index=False)
+    print(f"\nSaved mitigation summary to: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
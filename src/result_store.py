@@ -0,0 +1,160 @@
+"""
+Full-resolution time-series results on disk.
+
+A store is a directory with:
+  - vm_pu.npy            (T × n_bus)  float32, memory-mapped
+  - loading_percent.npy  (T × n_line) float32, memory-mapped
+  - timestamps.npy       (T,) int64 nanoseconds
+  - meta.json            bus/line names, shapes, run metadata
+
+Runners fill it step by step (ResultStore.record is a run_injection_series
+callback); analyses open it read-only and slice rows/columns without
+loading the whole matrix or rerunning power flows.
+"""
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+VM_FILE = "vm_pu.npy"
+LOADING_FILE = "loading_percent.npy"
+TIMESTAMPS_FILE = "timestamps.npy"
+META_FILE = "meta.json"
+
+# Rows per block when reducing over time, keeps reads bounded for long horizons.
+CHUNK_ROWS = 4096
+
+
+class ResultStore:
+    def __init__(self, path, vm_pu, loading_percent, timestamps, meta):
+        self.path = Path(path)
+        self.vm_pu = vm_pu
+        self.loading_percent = loading_percent
+        self.timestamps = timestamps
+        self.meta = meta
+
+    @classmethod
+    def create(cls, path, net, timestamps, **meta):
+        """
+        Allocate a store for len(timestamps) steps of `net`. Extra keyword
+        arguments (scenario, attack_time, ...) are saved in meta.json.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        ts = pd.DatetimeIndex(timestamps)
+        n_steps, n_bus, n_line = len(ts), len(net.bus), len(net.line)
+
+        vm = np.lib.format.open_memmap(path / VM_FILE, mode="w+", dtype=np.float32, shape=(n_steps, n_bus))
+        loading = np.lib.format.open_memmap(path / LOADING_FILE, mode="w+", dtype=np.float32, shape=(n_steps, n_line))
+        vm[:] = np.nan
+        loading[:] = np.nan
+        np.save(path / TIMESTAMPS_FILE, ts.values.astype("datetime64[ns]").astype(np.int64))
+
+        info = {
+            "n_steps": n_steps,
+            "bus_names": [str(n) for n in net.bus["name"]],
+            "line_names": [str(n) for n in net.line["name"]],
+            "dtype": "float32",
+            "created_utc": datetime.now(timezone.utc).isoformat(),
+        }
+        info.update({k: str(v) if isinstance(v, pd.Timestamp) else v for k, v in meta.items()})
+        with open(path / META_FILE, "w") as fh:
+            json.dump(info, fh, indent=2)
+
+        return cls(path, vm, loading, ts, info)
+
+    @classmethod
+    def open(cls, path, mode: str = "r"):
+        """Open an existing store; arrays are memory-mapped, nothing is read yet."""
+        path = Path(path)
+        with open(path / META_FILE) as fh:
+            meta = json.load(fh)
+        vm = np.load(path / VM_FILE, mmap_mode=mode)
+        loading = np.load(path / LOADING_FILE, mmap_mode=mode)
+        ts = pd.DatetimeIndex(np.load(path / TIMESTAMPS_FILE).astype("datetime64[ns]"))
+        return cls(path, vm, loading, ts, meta)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def bus_names(self):
+        return self.meta["bus_names"]
+
+    @property
+    def line_names(self):
+        return self.meta["line_names"]
+
+    def record(self, k: int, net) -> None:
+        """Write step k from the solved net (run_injection_series callback)."""
+        self.vm_pu[k] = net.res_bus["vm_pu"].to_numpy()
+        self.loading_percent[k] = net.res_line["loading_percent"].to_numpy()
+
+    def record_rows(self, start: int, vm_pu, loading_percent) -> None:
+        """Write a block of steps solved as a batch (rows start .. start + len)."""
+        self.vm_pu[start:start + len(vm_pu)] = vm_pu
+        self.loading_percent[start:start + len(loading_percent)] = loading_percent
+
+    def flush(self) -> None:
+        self.vm_pu.flush()
+        self.loading_percent.flush()
+
+    def rows(self, start=None, end=None) -> slice:
+        """Row slice for a [start, end] timestamp range."""
+        i0 = 0 if start is None else int(self.timestamps.searchsorted(pd.Timestamp(start), side="left"))
+        i1 = len(self) if end is None else int(self.timestamps.searchsorted(pd.Timestamp(end), side="right"))
+        return slice(i0, i1)
+
+    def bus_series(self, name: str) -> pd.Series:
+        """Voltage of one bus over the whole horizon (reads one column)."""
+        j = self.bus_names.index(name)
+        return pd.Series(np.asarray(self.vm_pu[:, j]), index=self.timestamps, name=name)
+
+    def line_series(self, name: str) -> pd.Series:
+        """Loading of one line over the whole horizon (reads one column)."""
+        j = self.line_names.index(name)
+        return pd.Series(np.asarray(self.loading_percent[:, j]), index=self.timestamps, name=name)
+
+    def at(self, ts):
+        """(vm_pu, loading_percent) rows for the step at or right after `ts`."""
+        k = min(int(self.timestamps.searchsorted(pd.Timestamp(ts))), len(self) - 1)
+        return np.asarray(self.vm_pu[k]), np.asarray(self.loading_percent[k])
+
+    def column_extremes(self, which: str = "vm_pu", rows: slice = slice(None)) -> pd.DataFrame:
+        """
+        Per-bus (or per-line) min/max over `rows` and when they occur,
+        reduced block by block so memory stays at CHUNK_ROWS rows. Columns
+        with no value in `rows` (unwritten steps, de-energized buses) get
+        NaN extremes and NaT times.
+        """
+        arr = self.vm_pu if which == "vm_pu" else self.loading_percent
+        names = self.bus_names if which == "vm_pu" else self.line_names
+        i0, i1, _ = rows.indices(len(self))
+
+        n = arr.shape[1]
+        col_min = np.full(n, np.inf)
+        col_max = np.full(n, -np.inf)
+        arg_min = np.full(n, -1, dtype=np.int64)
+        arg_max = np.full(n, -1, dtype=np.int64)
+
+        for s in range(i0, i1, CHUNK_ROWS):
+            block = np.asarray(arr[s:min(s + CHUNK_ROWS, i1)], dtype=float)
+            missing = np.isnan(block)
+            low, high = np.where(missing, np.inf, block), np.where(missing, -np.inf, block)
+            bmin, bmax = low.min(axis=0), high.max(axis=0)
+            lo, hi = bmin < col_min, bmax > col_max
+            arg_min[lo] = s + low.argmin(axis=0)[lo]
+            arg_max[hi] = s + high.argmax(axis=0)[hi]
+            col_min = np.minimum(col_min, bmin)
+            col_max = np.maximum(col_max, bmax)
+
+        return pd.DataFrame({
+            "name": names,
+            "min": np.where(arg_min >= 0, col_min, np.nan),
+            "time_of_min": self.timestamps[np.maximum(arg_min, 0)].where(arg_min >= 0),
+            "max": np.where(arg_max >= 0, col_max, np.nan),
+            "time_of_max": self.timestamps[np.maximum(arg_max, 0)].where(arg_max >= 0),
+        })
@@ -0,0 +1,190 @@
+"""
+Representative-snapshot reduction of long time series.
+
+Most 15-minute operating points differ only slightly (every night looks the
+same). Each step of an InjectionPlan is reduced to two features, the feeder
+load and PV output relative to their peaks, and the steps are clustered
+(k-means on the scaled features, each cluster represented by its medoid:
+the member step nearest to the centroid). Only the medoids are solved.
+Every other step takes its medoid's envelope, except steps whose medoid
+lands within a margin of a voltage or loading limit: those are solved
+exactly. The result has one row per step, like run_injection_series.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pandapower as pp
+
+from src.config import SimulationConfig
+from src.grid_topology.load_france_grid import load_france_grid
+from src.load_data.load_profile_fr import iter_tiled_profile, load_fr_load_profile
+from src.powerflow.network import NetworkModel
+from src.powerflow.zbus import ZBusSolver
+from src.timeseries import InjectionPlan, attack_fleet_multiplier, prepare_injections, run_injection_series
+
+
+def operating_points(plan: InjectionPlan, base_load, base_pv) -> np.ndarray:
+    """(T × 2) features: total load / peak load, total PV / rated PV."""
+    load = plan.load_p_mw.sum(axis=1) / max(np.sum(base_load), 1e-12)
+    pv = plan.sgen_p_mw.sum(axis=1) / max(np.sum(base_pv), 1e-12)
+    return np.column_stack([load, pv])
+
+
+def cluster_snapshots(X, n_clusters: int, seed: int = 0, max_iter: int = 100):
+    """
+    k-means with k-means++ seeding on min-max scaled X (T × d). Returns
+    (labels (T,), medoids (k,) step indices); empty clusters are dropped.
+    Identical points always share a cluster.
+    """
+    X = np.asarray(X, dtype=float)
+    span = X.max(axis=0) - X.min(axis=0)
+    Z = (X - X.min(axis=0)) / np.where(span > 0, span, 1.0)
+    points, inverse, counts = np.unique(Z, axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+    k = min(n_clusters, len(points))
+
+    rng = np.random.default_rng(seed)
+    centers = [points[rng.choice(len(points), p=counts / counts.sum())]]
+    for _ in range(1, k):
+        d2 = ((points[:, None, :] - np.array(centers)[None]) ** 2).sum(axis=2).min(axis=1)
+        w = d2 * counts
+        centers.append(points[rng.choice(len(points), p=w / w.sum())] if w.sum() > 0 else points[0])
+    centers = np.array(centers)
+
+    for _ in range(max_iter):
+        labels = ((points[:, None, :] - centers[None]) ** 2).sum(axis=2).argmin(axis=1)
+        new = np.array([np.average(points[labels == c], axis=0, weights=counts[labels == c])
+                        if (labels == c).any() else centers[c] for c in range(k)])
+        if np.allclose(new, centers):
+            break
+        centers = new
+
+    used = np.unique(labels)
+    medoids = []
+    for c in used:
+        members = np.flatnonzero(labels == c)
+        medoids.append(members[((points[members] - centers[c]) ** 2).sum(axis=1).argmin()])
+    medoid_point = np.array(medoids)
+    # Back to steps: first step at each medoid point; relabel 0..len(used)-1.
+    first_step = np.full(len(points), -1)
+    first_step[inverse[::-1]] = np.arange(len(inverse))[::-1]
+    relabel = np.full(k, -1)
+    relabel[used] = np.arange(len(used))
+    return relabel[labels[inverse]], first_step[medoid_point]
+
+
+def _subplan(plan: InjectionPlan, rows) -> InjectionPlan:
+    return InjectionPlan(plan.timestamps[rows], plan.load_p_mw[rows], plan.sgen_p_mw[rows],
+                         plan.fleet_multiplier[rows])
+
+
+def run_reduced_series(net, plan: InjectionPlan, config: SimulationConfig, base_load=None,
+                       base_pv=None, n_clusters=None, engine: str = "nr"):
+    """
+    Envelope (timestamp, min/max vm, max loading) for every plan step from
+    the cluster medoids, with exact solves for steps whose medoid is within
+    config.reduction_margin_pu / reduction_margin_loading of a limit.
+
+    Returns (df, info): df adds `representative` (the step whose solve the
+    row comes from) and `exact`; info has the cluster sizes (the weight of
+    each medoid) and the solve counts.
+    """
+    base_load = net.load["p_mw"].to_numpy() if base_load is None else np.asarray(base_load)
+    base_pv = net.sgen["p_mw"].to_numpy() if base_pv is None else np.asarray(base_pv)
+    n_clusters = config.reduction_clusters if n_clusters is None else n_clusters
+
+    labels, medoids = cluster_snapshots(operating_points(plan, base_load, base_pv), n_clusters, seed=config.seed)
+    rep = run_injection_series(net, _subplan(plan, medoids), engine=engine)
+
+    cols = ["min_vm_pu", "max_vm_pu", "max_line_loading"]
+    df = pd.DataFrame({"timestamp": plan.timestamps})
+    df[cols] = rep[cols].to_numpy()[labels]
+    df["representative"] = medoids[labels]
+    df["exact"] = False
+    df.loc[medoids, "exact"] = True
+
+    near = ((df["min_vm_pu"] < config.v_min_limit + config.reduction_margin_pu)
+            | (df["max_vm_pu"] > config.v_max_limit - config.reduction_margin_pu)
+            | (df["max_line_loading"] > config.max_line_loading - config.reduction_margin_loading))
+    fallback = np.flatnonzero(near.to_numpy() & ~df["exact"].to_numpy())
+    if len(fallback):
+        exact = run_injection_series(net, _subplan(plan, fallback), engine=engine)
+        df.loc[fallback, cols] = exact[cols].to_numpy()
+        df.loc[fallback, "representative"] = fallback
+        df.loc[fallback, "exact"] = True
+
+    info = {
+        "cluster_sizes": np.bincount(labels, minlength=len(medoids)),
+        "n_representatives": len(medoids),
+        "n_fallback": len(fallback),
+        "n_solves": len(medoids) + len(fallback),
+        "n_steps": len(plan),
+    }
+    return df, info
+
+
+def _year_plan(net, config, scenario):
+    """A year of 15-minute steps with seasonal PV and load, attacked daily at config.attack_time."""
+    chunks = list(iter_tiled_profile("2026-01-01", "2026-12-31 23:45", seasonal_load_amplitude=0.15))
+    profile = pd.concat(chunks, ignore_index=True)
+    ts = pd.DatetimeIndex(profile["timestamp"])
+    attack_time = pd.Timestamp(config.attack_time)
+    attacked = (ts - ts.normalize()) >= attack_time - attack_time.normalize()
+    multiplier = attack_fleet_multiplier(net, [attack_time], attack_time, scenario)[0]
+    return prepare_injections(profile, net.load["p_mw"], net.sgen["p_mw"],
+                              np.where(attacked, multiplier, 1.0), seasonal_pv=True)
+
+
+def main():
+    net = load_france_grid()
+    model = NetworkModel.from_net(net)
+    # v_min tightened to the feeder's lowest voltages so the fallback is exercised.
+    config = SimulationConfig(v_min_limit=0.985, reduction_margin_pu=0.001)
+    profile = load_fr_load_profile()
+    day = prepare_injections(profile, net.load["p_mw"], net.sgen["p_mw"],
+                             attack_fleet_multiplier(net, profile["timestamp"], config.attack_time, "S5"))
+
+    pp.runpp(net)   # warm-up
+    rows = []
+    for name, plan, n_clusters in (("day_S5", day, 12), ("year_S5", _year_plan(net, config, "S5"), 60)):
+        t0 = time.perf_counter()
+        df, info = run_reduced_series(net, plan, config, n_clusters=n_clusters)
+        t_reduced = time.perf_counter() - t0
+
+        # Exact reference: batched Z-bus on every step; pp.runpp time per step from a sample.
+        V, _ = ZBusSolver(model).solve(model.bus_injections(plan.load_p_mw, plan.sgen_p_mw))
+        vm, loading = np.abs(V), model.line_loading(V)
+        sample = np.linspace(0, len(plan) - 1, 20).astype(int)
+        t0 = time.perf_counter()
+        run_injection_series(net, InjectionPlan(plan.timestamps[sample], plan.load_p_mw[sample],
+                                                plan.sgen_p_mw[sample], plan.fleet_multiplier[sample]))
+        t_exact = (time.perf_counter() - t0) / len(sample) * len(plan)
+
+        under = np.nanmin(vm, axis=1) < config.v_min_limit
+        rows.append({
+            "series": name,
+            "steps": info["n_steps"],
+            "representatives": info["n_representatives"],
+            "fallback_solves": info["n_fallback"],
+            "solve_reduction": info["n_steps"] / info["n_solves"],
+            "max_abs_err_min_vm": np.abs(df["min_vm_pu"] - np.nanmin(vm, axis=1)).max(),
+            "max_abs_err_loading": np.abs(df["max_line_loading"] - loading.max(axis=1)).max(),
+            "undervoltage_steps_exact": int(under.sum()),
+            "undervoltage_steps_reduced": int((df["min_vm_pu"] < config.v_min_limit).sum()),
+            "reduced_s": t_reduced,
+            "exact_runpp_s_est": t_exact,
+        })
+
+    out = pd.DataFrame(rows)
+    print(f"\n=== SNAPSHOT REDUCTION (band {config.v_min_limit}-{config.v_max_limit} p.u.) ===")
+    print(out.to_string(index=False))
+
+    out_path = "results/snapshot_reduction.csv"
+    out.to_csv(out_path, index=False)
+    print(f"\nSaved reduction summary to: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
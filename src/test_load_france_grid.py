@@ -0,0 +1,65 @@
+import shutil
+
+import numpy as np
+import pandapower as pp
+
+from src.grid_topology import load_france_grid as lfg
+from src.grid_topology.synthetic_grid import generate_synthetic_grid
+
+
+def test_cached_grid_matches_cold_build_and_is_independent(tmp_path, monkeypatch):
+    monkeypatch.setattr(lfg, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(lfg, "_COMPILED", {})
+
+    cold = lfg.build_france_grid()
+    first = lfg.load_france_grid()
+    second = lfg.load_france_grid()
+
+    assert len(list((tmp_path / "cache").glob("*.p"))) == 1
+    for table in ("bus", "line", "load", "sgen", "ext_grid"):
+        assert len(first[table]) == len(cold[table])
+    assert np.allclose(first.line["r_ohm_per_km"].values, cold.line["r_ohm_per_km"].values)
+
+    # Callers mutate loads/sgens in place; that must not leak into the cache.
+    first.load["p_mw"] *= 2.0
+    assert np.allclose(second.load["p_mw"].values, cold.load["p_mw"].values)
+    assert np.allclose(lfg.load_france_grid().load["p_mw"].values, cold.load["p_mw"].values)
+
+
+def test_cache_invalidated_by_csv_content(tmp_path, monkeypatch):
+    monkeypatch.setattr(lfg, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(lfg, "_COMPILED", {})
+
+    data_dir = tmp_path / "grid"
+    shutil.copytree(lfg.DATA_DIR, data_dir)
+    before = lfg.load_france_grid(data_dir)
+
+    loads_csv = data_dir / "fr_grid_loads.csv"
+    text = loads_csv.read_text().replace("0.201568", "0.301568")
+    loads_csv.write_text(text)
+    after = lfg.load_france_grid(data_dir)
+
+    assert before.load["p_mw"].iloc[0] == 0.201568
+    assert after.load["p_mw"].iloc[0] == 0.301568
+
+
+def test_synthetic_grid_uses_the_grid_csv_schema(tmp_path, monkeypatch):
+    monkeypatch.setattr(lfg, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(lfg, "_COMPILED", {})
+
+    base = lfg.load_france_grid()
+    out = generate_synthetic_grid(4, tmp_path / "x4", seed=1)
+    net = lfg.load_france_grid(out)
+
+    assert len(net.bus) == 1 + 4 * (len(base.bus) - 1)
+    assert len(net.line) == 4 * len(base.line) + 4       # ring of tie lines
+    assert len(net.sgen) == 4 * len(base.sgen)
+    assert len(net.ext_grid) == 1
+    assert np.isclose(net.load["p_mw"].sum(), 4 * base.load["p_mw"].sum(), rtol=0.2)
+
+    again = generate_synthetic_grid(4, tmp_path / "again", seed=1)
+    for fname in lfg.GRID_CSVS:
+        assert (out / fname).read_text() == (again / fname).read_text()
+
+    pp.runpp(net)
+    assert net.converged
@@ -0,0 +1,238 @@
+import numpy as np
+import pandapower as pp
+import pytest
+
+from src.attacks.attack_fr import get_scenario
+from src.config import SimulationConfig
+from src.decomposition_benchmark import multi_feeder_net
+from src.grid_topology.load_france_grid import load_france_grid
+from src.load_data.load_profile_fr import load_fr_load_profile
+from src.inverter_control import InverterControl, VoltVarCurve
+from src.powerflow.bfs import BFSSolver, is_radial
+from src.powerflow.decomposition import FeederDecomposition
+from src.powerflow.network import NetworkModel
+from src.powerflow.reduction import WardReduction
+from src.powerflow.sensitivity import Sensitivities
+from src.powerflow.state_estimation import StateEstimator
+from src.powerflow.zbus import ZBusSolver
+from src.reactive_mitigation import ReactiveMitigation, compromised_sgens, targeted_attack
+from src.timeseries import prepare_injections
+
+
+def _midday_net():
+    net = load_france_grid()
+    net.sgen["p_mw"] *= 0.7
+    return net
+
+
+def test_zbus_matches_pandapower_base_case():
+    net = _midday_net()
+    model = NetworkModel.from_net(net)
+    S = model.bus_injections(net.load["p_mw"].to_numpy(), net.sgen["p_mw"].to_numpy())
+
+    V, converged = ZBusSolver(model).solve(S)
+    pp.runpp(net)
+
+    assert converged.all()
+    assert np.allclose(np.abs(V[0]), net.res_bus["vm_pu"].to_numpy(), atol=1e-8)
+    assert np.allclose(model.line_loading(V[0]), net.res_line["loading_percent"].to_numpy(), atol=1e-6)
+
+
+def test_low_rank_line_outages_match_pandapower():
+    net = _midday_net()
+    model = NetworkModel.from_net(net)
+    solver = ZBusSolver(model)
+    S = model.bus_injections(net.load["p_mw"].to_numpy(), net.sgen["p_mw"].to_numpy())
+
+    lines = np.arange(model.n_line)
+    islanding = solver.islanding_outages(lines)
+    assert islanding.any() and not islanding.all()
+    meshed = lines[~islanding]
+
+    V, converged = solver.solve_outages(S, meshed)
+    assert converged.all()
+    for line in meshed[:: max(1, len(meshed) // 5)]:
+        k = int(np.flatnonzero(meshed == line)[0])
+        net.line.loc[line, "in_service"] = False
+        pp.runpp(net)
+        net.line.loc[line, "in_service"] = True
+        assert np.allclose(np.abs(V[0, k]), net.res_bus["vm_pu"].to_numpy(), atol=1e-8)
+
+
+def test_sensitivities_match_finite_difference():
+    net = _midday_net()
+    model = NetworkModel.from_net(net)
+    solver = ZBusSolver(model)
+    load_p, sgen_p = net.load["p_mw"].to_numpy(), net.sgen["p_mw"].to_numpy()
+    S = model.bus_injections(load_p, sgen_p)
+    V, _ = solver.solve(S)
+
+    dvm = Sensitivities(solver, V[0], S[0]).dVm(model.sgen_bus[:1])[:, 0]
+    step = 1e-3
+    sgen_p[0] += step
+    V2, _ = solver.solve(model.bus_injections(load_p, sgen_p))
+    fd = (np.abs(V2[0]) - np.abs(V[0])) / (step / model.sn_mva)
+    assert np.allclose(dvm, fd, atol=1e-4)
+
+
+def test_bfs_matches_pandapower_on_radial_feeder():
+    net = _midday_net()
+    model = NetworkModel.from_net(net)
+    with pytest.raises(ValueError):
+        BFSSolver(model)
+
+    net.line.loc[net.line.index[-5:], "in_service"] = False    # open the loop ties
+    model = NetworkModel.from_net(net)
+    assert is_radial(model)
+    S = model.bus_injections(net.load["p_mw"].to_numpy(), net.sgen["p_mw"].to_numpy())
+
+    V, converged = BFSSolver(model).solve(S)
+    pp.runpp(net)
+
+    assert converged.all()
+    assert np.allclose(np.abs(V[0]), net.res_bus["vm_pu"].to_numpy(), atol=1e-8)
+    assert np.allclose(model.line_loading(V[0], model.line_in_service),
+                       net.res_line["loading_percent"].to_numpy(), atol=1e-6)
+
+
+def test_inverter_control_fixed_point_and_trips():
+    net = load_france_grid()
+    net.sgen["q_mvar_cap"] *= 10
+    curve = VoltVarCurve((0.985, 0.995, 0.996, 1.005), (1.0, 0.0, 0.0, -1.0))
+    load = net.load["p_mw"].to_numpy() * np.linspace(0.3, 3.5, 50)[:, None]
+    pv = net.sgen["p_mw"].to_numpy() * np.linspace(3.0, 0.0, 50)[:, None]
+
+    control = InverterControl.from_net(net, volt_var=True, curve=curve, ride_through=False)
+    res = control.solve(load, pv)
+    vm = np.abs(res.V[:, control.model.sgen_bus])
+    assert res.converged.all()
+    assert np.allclose(res.q_mvar, curve(vm) * control.q_cap, atol=1e-5)
+
+    plain = InverterControl.from_net(net, volt_var=True, curve=curve, ride_through=False, anderson=0)
+    assert np.allclose(plain.solve(load, pv).q_mvar, res.q_mvar, atol=1e-5)
+
+    tripping = InverterControl.from_net(net, volt_var=False, ride_through=True)
+    tripping.v_low[:] = 0.98
+    res = tripping.solve(load[-1], pv[-1])
+    assert not res.active.all()
+    assert np.all(res.q_mvar[~res.active] == 0.0)
+
+
+def test_reactive_mitigation_restores_band_with_surviving_inverters():
+    net = load_france_grid()
+    net.sgen["q_mvar_cap"] *= 10
+    compromised = np.zeros(len(net.sgen), dtype=bool)
+    compromised[2] = True
+    mitigation = ReactiveMitigation.from_net(net, SimulationConfig(v_min_limit=0.99, v_max_limit=1.01),
+                                             compromised=compromised)
+    load = 0.6 * net.load["p_mw"].to_numpy()
+    pv = np.zeros(len(net.sgen))
+
+    before, _ = mitigation.solver.solve(mitigation.model.bus_injections(load, pv, sgen_q_mvar=pv))
+    res = mitigation.solve(load, pv, q0=pv)
+    assert np.nanmin(np.abs(before)) < 0.99
+    assert res.converged.all()
+    assert np.nanmin(np.abs(res.V)) >= 0.99
+    assert res.q_mvar[0, 2] == 0.0
+    assert np.all(np.abs(res.q_mvar) <= mitigation.q_cap + 1e-9)
+
+    # A day under targeted_attack: the attacked units are exactly the
+    # compromised ones, and they leave Q support only from the onset.
+    profile = load_fr_load_profile()
+    rated = net.sgen["p_mw"].to_numpy()
+    attack_time = SimulationConfig().attack_time
+    units = compromised_sgens(rated, "S5")
+    attack = targeted_attack("S5", attack_time, rated)
+    plan = prepare_injections(profile, net.load["p_mw"], rated, attack.schedule(profile["timestamp"], rated))
+    onset = int(np.flatnonzero(plan.timestamps == attack_time)[0])
+    mask = plan.compromised()
+    assert not mask[:onset].any() and (mask[onset:] == units).all()
+    intact = prepare_injections(profile, net.load["p_mw"], rated).sgen_p_mw
+    assert np.allclose(plan.sgen_p_mw[onset:, units], intact[onset:, units] * attack.multiplier[units])
+    assert np.array_equal(plan.sgen_p_mw[:, ~units], intact[:, ~units])
+
+    # The attacked MW is compromised_pct of the fleet, so scenarios differ.
+    for scenario in ("S1", "S5"):
+        pct = get_scenario(scenario)["compromised_pct"]
+        shed = rated @ (1.0 - targeted_attack(scenario, attack_time, rated).multiplier)
+        assert np.isclose(shed, pct / 100 * rated.sum())
+    assert not np.allclose(targeted_attack("S1", attack_time, rated).multiplier, attack.multiplier)
+
+    mitigation = ReactiveMitigation.from_net(net, SimulationConfig(v_min_limit=0.99, v_max_limit=1.01))
+    res = mitigation.solve(plan.load_p_mw, plan.sgen_p_mw, q0=np.zeros(len(rated)), compromised=mask)
+    assert np.abs(res.q_mvar[:onset, units]).max() > 0.0
+    assert np.all(res.q_mvar[onset:, units] == 0.0)
+
+
+def test_feeder_decomposition_matches_monolithic_solve():
+    base = load_france_grid()
+    for upstream_line in (False, True):
+        net = multi_feeder_net(base, 3, upstream_line=upstream_line)
+        model = NetworkModel.from_net(net)
+        load = net.load["p_mw"].to_numpy() * np.array([[0.5], [1.0]])
+        pv = net.sgen["p_mw"].to_numpy() * np.array([[1.0], [0.2]])
+
+        dec = FeederDecomposition(model)
+        V, converged = dec.solve(load, pv)
+        V_mono, _ = ZBusSolver(model).solve(model.bus_injections(load, pv))
+
+        assert len(dec.feeders) == 3 and converged.all()
+        assert (dec.upstream is not None) == upstream_line
+        assert np.allclose(V, V_mono, atol=1e-9)
+
+    # Worker processes keep their factorizations and the pool across solves.
+    with FeederDecomposition(model, n_workers=2) as dec:
+        V1, _ = dec.solve(load, pv)
+        pool = dec._pool
+        V2, _ = dec.solve(load[:1], pv[:1])
+        assert dec._pool is pool
+    assert dec._pool is None
+    assert np.allclose(V1, V_mono, atol=1e-9) and np.allclose(V2, V_mono[:1], atol=1e-9)
+
+
+def test_state_estimation_recovers_state_and_flags_manipulated_reading():
+    net = _midday_net()
+    model = NetworkModel.from_net(net)
+    load = net.load["p_mw"].to_numpy() * np.array([[0.4], [0.8], [1.0]])
+    pv = net.sgen["p_mw"].to_numpy() * np.array([[1.0], [0.5], [0.0]])
+    V, _ = ZBusSolver(model).solve(model.bus_injections(load, pv))
+
+    estimator = StateEstimator(model)
+    z = estimator.measure(V)
+    res = estimator.estimate(z)
+    assert res.converged.all()
+    assert np.allclose(res.V, V, atol=1e-8)
+    assert not res.bad_data.any()
+
+    # A gross error on one inverter's P telemetry is flagged and attributed to it.
+    k = len(estimator.ms.vm_buses) + int(np.flatnonzero(estimator.ms.inj_buses == model.sgen_bus[1])[0])
+    z[0, k] += 2.0
+    res = estimator.estimate(z)
+    assert res.suspect.tolist() == [k, -1, -1]
+    assert res.objective[0] > res.chi2_threshold
+    single = estimator.estimate(z[1:2])
+    assert np.allclose(single.V[0], res.V[1], atol=1e-10)
+
+
+def test_ward_reduction_is_exact_at_reference_and_within_bound_elsewhere():
+    net = _midday_net()
+    model = NetworkModel.from_net(net)
+    solver = ZBusSolver(model)
+    S_ref = model.bus_injections(net.load["p_mw"], net.sgen["p_mw"])
+    V_ref = solver.solve(S_ref)[0][0]
+    red = WardReduction(model, model.sgen_bus, V_ref=V_ref)
+    assert red.size == len(np.unique(model.sgen_bus)) + 1
+
+    V_k, converged = red.solve(S_ref)
+    assert converged.all()
+    assert np.allclose(V_k[0], V_ref[red.keep], atol=1e-9)
+    assert np.allclose(red.expand(V_k, S_ref)[0], V_ref, atol=1e-9)
+
+    S = model.bus_injections(net.load["p_mw"].to_numpy() * np.array([[0.5], [1.2]]),
+                             net.sgen["p_mw"].to_numpy() * np.array([[0.0], [1.4]]))
+    V, _ = solver.solve(S)
+    V_k, _ = red.solve(S)
+    err = np.abs(V_k - V[:, red.keep])
+    dv = np.abs(V - V_ref)[:, red.elim].max()
+    assert (err <= red.error_bound(S, dv) + 1e-12).all()
+    assert err.max() > 0
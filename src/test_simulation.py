@@ -1,7 +1,19 @@
 import pytest
 import numpy as np
 
-from src.full_simulation import run_simulation
+from src.attacker_search import AttackEvaluator, count_within_budget, search_worst_attack
+from src.attacks.shutdown_attack import ScenarioShutdownAttack
+from src.cascade import CascadeSimulator, IslandTracker
+from src.config import SimulationConfig
+from src.cosimulation import CoSimulation
+from src.full_simulation import FullGridSimulation, run_simulation
+from src.grid_topology.load_france_grid import load_france_grid
+from src.hosting_capacity import bisect_headroom, hosting_capacity
+from src.load_data.load_profile_fr import load_fr_load_profile, pv_shape
+from src.metrics.voltage_metrics import compute_voltage_metrics
+from src.monte_carlo import run_monte_carlo, run_multifidelity_monte_carlo
+from src.powerflow.network import NetworkModel
+from src.probabilistic_load_flow import point_estimate_load_flow
 
 
 @pytest.mark.parametrize(
@@ -34,4 +46,199 @@ def test_scenarios_run_without_error(scenario_name, attack_magnitude):
     )
 
     assert max_freq_dev >= 0, f"{scenario_name} max_freq_dev should be non-negative"
-    assert min_voltage > 0, f"{scenario_name} min_voltage should be positive"
\ No newline at end of file
+    assert min_voltage > 0, f"{scenario_name} min_voltage should be positive"
+
+
+def test_monte_carlo_independent_of_workers_and_engine():
+    net = load_france_grid()
+    before = net.load["p_mw"].copy()
+    config = SimulationConfig(n_runs=12, v_min_limit=0.99, max_line_loading=20.0)
+
+    serial = run_monte_carlo(net, config, engine="zbus", block_size=5)
+    parallel = run_monte_carlo(net, config, engine="zbus", block_size=5, n_workers=2)
+    reference = run_monte_carlo(net, config, engine="pandapower", block_size=5)
+
+    assert serial.equals(parallel)
+    assert serial["undervoltage_%"].gt(0).any()
+    assert np.allclose(serial.to_numpy(), reference.to_numpy())
+    assert net.load["p_mw"].equals(before)
+
+
+def test_cascade_islands_match_connectivity_search():
+    net = load_france_grid()
+    model = NetworkModel.from_net(net)
+    rng = np.random.default_rng(0)
+    islands = IslandTracker(model, model.line_in_service)
+    on = model.line_in_service.copy()
+    for lines in np.array_split(rng.permutation(model.n_line)[:20], 5):
+        on[lines] = False
+        islands.remove(lines)
+        assert np.array_equal(islands.connected_to(model.slack), model.energized(on))
+
+    S = model.bus_injections(net.load["p_mw"].to_numpy(), net.sgen["p_mw"].to_numpy())
+    result = CascadeSimulator(model, trip_loading=20.0).run(S[0])
+    assert result.n_trips > 0 and result.converged
+    assert (model.line_loading(result.V, result.line_in_service) <= 20.0).all()
+
+    # The factorization cache stays bounded and evicts the oldest topology.
+    simulator = CascadeSimulator(model, trip_loading=20.0, max_cached_solvers=2)
+    ref = simulator.run(S[0])
+    assert len(simulator._solvers) <= 2
+    assert ref.events == result.events
+
+
+def test_single_simulation_screens_cascades_with_every_engine(monkeypatch):
+    import src.timeseries as timeseries
+    sweeps = []
+    sweep = timeseries._sweep_series
+    monkeypatch.setattr(timeseries, "_sweep_series", lambda net, plan: sweeps.append(1) or sweep(net, plan))
+
+    results = {}
+    for engine in ("nr", "bfs"):
+        sim = FullGridSimulation(SimulationConfig(cascade_trip_loading=18.0, pf_engine=engine))
+        df, cascades = sim.run_single_simulation("S5")
+        results[engine] = sim.cascade_sequence
+        assert cascades > 0 and df["cascade_events"].sum() == cascades
+    assert sweeps, "pf_engine='bfs' must reach the batched sweep"
+    assert results["nr"][["timestamp", "line"]].equals(results["bfs"][["timestamp", "line"]])
+
+
+def test_hosting_capacity_matches_bisection():
+    config = SimulationConfig()
+    net = load_france_grid()
+    profile = load_fr_load_profile().iloc[44:52].reset_index(drop=True)
+
+    res = hosting_capacity(net, profile, config, block_steps=4)
+    parallel = hosting_capacity(net, profile, config, block_steps=4, n_workers=2)
+    assert np.allclose(res.headroom_mw.to_numpy(), parallel.headroom_mw.to_numpy(), equal_nan=True)
+
+    k, bus = 4, net.bus.index[32]
+    load_p = profile["load_multiplier"].iloc[k] * net.load["p_mw"].to_numpy()
+    sgen_p = net.sgen["p_mw"].to_numpy() * pv_shape(profile["timestamp"].iloc[[k]])[0]
+    ref, _ = bisect_headroom(net, bus, load_p, sgen_p, config)
+    assert res.headroom_mw.iloc[k, 32] == pytest.approx(ref, abs=2e-3)
+    assert res.attack["margin_fraction"].between(0, 1).all()
+
+
+def test_cosimulation_matches_lockstep_with_fewer_solves():
+    config = SimulationConfig(cosim_duration_s=8.0, cosim_attack_start_s=1.0, detection_delay_s=4.0)
+    net = load_france_grid()
+
+    attacked = CoSimulation(net, config, scenario="S5")
+    res = attacked.run()
+    ref = attacked.run(lockstep=True)
+    assert res.n_solves < ref.n_solves / 10
+    assert np.allclose(res.min_vm_pu, ref.min_vm_pu, atol=1e-8)
+    assert np.allclose(res.fleet_p_mw, ref.fleet_p_mw, atol=1e-8)
+    assert res.fleet_p_mw[0, -1] < res.fleet_p_mw[0, 0]
+
+    mitigated = CoSimulation(net, config, scenario="S5", mitigate=True).run()
+    assert mitigated.fleet_p_mw[0, -1] > res.fleet_p_mw[0, -1]
+
+    # The shed MW scales with the scenario's compromised_pct.
+    small = CoSimulation(net, config, scenario="S1").run()
+    assert np.allclose(small.fleet_p_mw[0, 0], res.fleet_p_mw[0, 0])
+    shed_s1 = small.fleet_p_mw[0, 0] - small.fleet_p_mw[0, -1]
+    shed_s5 = res.fleet_p_mw[0, 0] - res.fleet_p_mw[0, -1]
+    assert shed_s5 == pytest.approx(50 * shed_s1, rel=0.05)
+
+    # The grid runners leave the last step's p_mw in the net; the
+    # co-simulation must still start from the rated fleet.
+    sim = FullGridSimulation(config)
+    fresh = sim.run_cosimulation("S5")
+    sim.run_single_simulation("S5")
+    after = sim.run_cosimulation("S5")
+    assert fresh.fleet_p_mw[0, 0] > 0
+    assert np.allclose(after.fleet_p_mw, fresh.fleet_p_mw)
+
+
+def test_point_estimate_load_flow_matches_monte_carlo():
+    net = load_france_grid()
+    config = SimulationConfig(v_min_limit=0.993, max_line_loading=21.0,
+                              load_noise_std=0.15, pv_noise_std=0.25)
+    plf = point_estimate_load_flow(net, config)
+    mc = run_monte_carlo(net, config, n_runs=20000, engine="zbus")
+
+    assert plf.n_solves == 2 * (len(net.load) + len(net.sgen)) + 1
+    for metric, value in plf.metrics.items():
+        assert value == pytest.approx(mc[metric].mean(), abs=0.1)
+    assert plf.metrics["undervoltage_%"] > 1.0 and plf.metrics["line_overload_%"] > 1.0
+
+
+def test_multifidelity_monte_carlo_matches_full_monte_carlo():
+    net = load_france_grid()
+    config = SimulationConfig(v_min_limit=0.993, load_noise_std=0.15, pv_noise_std=0.25)
+    mf = run_multifidelity_monte_carlo(net, config, n_runs=100, n_cheap=5000, engine="zbus").set_index("metric")
+    full = run_monte_carlo(net, config, n_runs=5000, engine="zbus")
+
+    under = mf.loc["undervoltage_%"]
+    assert abs(under["estimate"] - full["undervoltage_%"].mean()) < 3 * under["std_error"]
+    assert under["std_error"] < under["ac_only_std_error"] / 3
+    assert (mf["effective_ac_samples"] >= mf["ac_samples"]).all()
+
+
+def test_shutdown_attack_batch_matches_per_realization_metrics():
+    config = SimulationConfig(start_time="2026-06-01 00:00", end_time="2026-06-01 23:45")
+    attack = ScenarioShutdownAttack(multiplier=0.0, ramp_minutes=0)
+    state = np.random.get_state()[1].copy()
+    batch = attack.run_batch(config, 500, seed=7)
+    assert np.array_equal(np.random.get_state()[1], state)
+
+    assert batch.voltage.shape == (500, 96)
+    # PV is shut down from each realization's attack step on, and only then.
+    t = np.arange(96)
+    assert np.all(batch.pv[t[None, :] >= batch.attack_step[:, None]] == 0.0)
+    assert np.all(batch.pv[t[None, :] < batch.attack_step[:, None]] > 0.0)
+
+    metrics = batch.metrics(0.97, 1.0)
+    for r in (0, 123, 499):
+        single = compute_voltage_metrics(batch.frame(r), 0.97, 1.0)
+        assert metrics.loc[r, "undervoltage_pct"] == pytest.approx(single["undervoltage_pct"])
+        assert metrics.loc[r, "overvoltage_pct"] == pytest.approx(single["overvoltage_pct"])
+    assert np.array_equal(attack.run_batch(config, 500, seed=7).voltage, batch.voltage)
+
+
+def test_attacker_search_reports_feasible_subsets_and_skips_unconverged():
+    net = load_france_grid()
+    rated = net.sgen["p_mw"].to_numpy()
+    budget = 0.5 * rated.sum()
+    codes = np.arange(2 ** len(rated))
+    masks = ((codes[:, None] >> np.arange(len(rated))) & 1).astype(bool)
+    feasible = int((masks @ rated <= budget + 1e-12).sum())
+
+    res = search_worst_attack(net, budget_mw=budget)
+    assert res.brute_force_evaluations == count_within_budget(rated, budget) == feasible < 2 ** len(rated)
+    assert res.objective <= res.brute_force_objective + 1e-12
+
+    with pytest.raises(ValueError, match="outside the profile"):
+        search_worst_attack(net, timestamp="2026-02-03 12:00")
+
+    evaluator = AttackEvaluator(net, net.load["p_mw"], rated)
+    evaluator.solver.max_iter = 1
+    assert np.all(evaluator.evaluate(masks[1:3]) == -np.inf)
+
+
+def test_controlled_runs_use_the_default_engine_and_screen_cascades():
+    config = SimulationConfig(inverter_control=True, force_volt_var=True, n_runs=3,
+                              cascade_trip_loading=18.0)
+    assert config.mc_engine == "pandapower"
+    sim = FullGridSimulation(config)
+    mc = sim.run_monte_carlo()
+    assert len(mc) == 3 and (mc["cascade_events"] > 0).all()
+
+    df, cascades = sim.run_single_simulation("S5")
+    assert "tripped_sgens" in df   # solved through the control loop
+    assert cascades > 0 and df["cascade_events"].sum() == cascades
+
+    # The multi-fidelity AC samples go through the same control loop.
+    kwargs = dict(n_runs=20, mc_cheap_runs=200, load_noise_std=0.15, pv_noise_std=0.25)
+    plain = FullGridSimulation(SimulationConfig(**kwargs)).run_multifidelity_monte_carlo(engine="zbus")
+    controlled = FullGridSimulation(SimulationConfig(inverter_control=True, force_volt_var=True, **kwargs))
+    controlled = controlled.run_multifidelity_monte_carlo()
+    min_vm = [df.set_index("metric").loc["min_vm_pu", "ac_only_estimate"] for df in (plain, controlled)]
+    assert abs(min_vm[0] - min_vm[1]) > 1e-5
+
+    sim = FullGridSimulation(SimulationConfig(q_mitigation=True, n_runs=3))
+    assert len(sim.run_monte_carlo()) == 3
+    df, _ = sim.run_single_simulation("S5")
+    assert "sgen_q_mvar" in df
@@ -0,0 +1,236 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from src.attacks.attack_fr import apply_attack_to_pv, get_scenario, ramp_fleet_multiplier
+from src.attacks.base_attack import OscillatingAttack, StepAttack
+from src.attacks.catalog import ScenarioCatalog, default_catalog
+from src.config import SimulationConfig
+from src.grid_topology.load_france_grid import load_france_grid
+from src.load_data.load_profile_fr import (
+    interpolate_profile,
+    iter_tiled_profile,
+    load_fr_load_profile,
+    pv_shape,
+    pv_shape_from_timestamp,
+)
+from src.onset_sweep import run_onset_sweep
+from src.result_store import ResultStore
+from src.snapshot_reduction import run_reduced_series
+from src.timeseries import (
+    attack_fleet_multiplier,
+    attack_windows,
+    multirate_index,
+    prepare_injections,
+    run_attack_variants,
+    run_injection_series,
+    run_timeseries,
+    stream_timeseries,
+)
+
+
+def test_multirate_index_refines_only_around_attack():
+    config = SimulationConfig()
+    profile = load_fr_load_profile()
+    index = multirate_index(profile["timestamp"], attack_windows(config, 60.0), config.fine_step_s)
+
+    # Every coarse step is kept, plus 1 s steps across the window.
+    assert set(profile["timestamp"]).issubset(set(index))
+    window = config.fine_window_pre_s + 60.0 + config.fine_window_post_s
+    assert len(index) < len(profile) + window + 2
+    steps = np.diff(index.values).astype("timedelta64[s]").astype(float)
+    assert steps.min() == config.fine_step_s
+    assert steps.max() == 900.0
+
+
+def test_ramp_and_interpolation_are_consistent_with_coarse_values():
+    profile = load_fr_load_profile()
+    attack_time = pd.Timestamp("2026-02-04 12:00")
+    ts = pd.date_range(attack_time - pd.Timedelta(seconds=10), periods=90, freq="1s")
+
+    fleet = ramp_fleet_multiplier(ts, attack_time, 0.0, 60.0)
+    assert fleet[0] == 1.0
+    assert fleet[10 + 30] == 0.5
+    assert fleet[-1] == 0.0
+
+    coarse = interpolate_profile(profile, profile["timestamp"])
+    assert np.allclose(coarse["load_multiplier"], profile["load_multiplier"])
+    assert pv_shape([attack_time])[0] == 1.0
+
+
+def test_prepare_injections_matches_per_step_formula():
+    profile = load_fr_load_profile()
+    base_load = np.array([1.0, 2.0, 3.0])
+    base_pv = np.array([0.5, 1.5])
+    fleet = np.where(profile["timestamp"] >= pd.Timestamp("2026-02-04 12:00"), 0.9, 1.0)
+
+    plan = prepare_injections(profile, base_load, base_pv, fleet)
+
+    assert plan.load_p_mw.shape == (len(profile), 3)
+    assert plan.sgen_p_mw.shape == (len(profile), 2)
+    for k in (0, 40, 48, 60):
+        ts = profile["timestamp"].iloc[k]
+        assert np.allclose(plan.load_p_mw[k], base_load * profile["load_multiplier"].iloc[k])
+        assert np.allclose(plan.sgen_p_mw[k], base_pv * pv_shape_from_timestamp(ts) * fleet[k])
+
+
+def test_result_store_round_trip_and_extremes(tmp_path):
+    net = SimpleNamespace(
+        bus=pd.DataFrame({"name": ["B1", "B2"]}),
+        line=pd.DataFrame({"name": ["L1"]}),
+    )
+    ts = pd.date_range("2026-02-04", periods=5, freq="15min")
+    store = ResultStore.create(tmp_path / "run", net, ts, scenario="S3")
+
+    for k in range(len(ts)):
+        net.res_bus = pd.DataFrame({"vm_pu": [1.0, 1.0 - 0.01 * k]})
+        net.res_line = pd.DataFrame({"loading_percent": [10.0 * k]})
+        store.record(k, net)
+    store.flush()
+
+    reopened = ResultStore.open(tmp_path / "run")
+    assert reopened.vm_pu.dtype == np.float32
+    assert reopened.meta["scenario"] == "S3"
+    assert np.isclose(reopened.bus_series("B2").iloc[-1], 0.96)
+
+    ext = reopened.column_extremes("vm_pu")
+    assert ext.loc[1, "time_of_min"] == ts[-1]
+    window = reopened.column_extremes("loading_percent", reopened.rows(ts[1], ts[2]))
+    assert np.isclose(window.loc[0, "max"], 20.0)
+
+    # A de-energized bus (all NaN) reports no extreme instead of failing.
+    reopened.vm_pu = np.array(reopened.vm_pu)
+    reopened.vm_pu[:, 1] = np.nan
+    ext = reopened.column_extremes("vm_pu")
+    assert np.isnan(ext.loc[1, "min"]) and pd.isna(ext.loc[1, "time_of_max"])
+    assert ext.loc[0, "time_of_min"] == ts[0]
+
+
+def test_streaming_chunks_reproduce_the_single_day_run(tmp_path):
+    config = SimulationConfig()
+    net = load_france_grid()
+    base_load = net.load["p_mw"].to_numpy(copy=True)
+    base_pv = net.sgen["p_mw"].to_numpy(copy=True)
+    profile = load_fr_load_profile()
+
+    day = run_timeseries(net, profile, config.attack_time, scenario="S5",
+                         base_load=base_load, base_pv=base_pv)
+    chunks = iter_tiled_profile("2026-02-04 00:00", "2026-02-04 23:45", chunk_steps=30)
+    out_csv = tmp_path / "stream.csv"
+    summary = stream_timeseries(net, chunks, config, scenario="S5", seasonal_pv=False,
+                                out_csv=out_csv, base_load=base_load, base_pv=base_pv)
+
+    assert len(summary) == 1 and summary.loc[0, "steps"] == 96
+    empty = stream_timeseries(net, [], config, base_load=base_load, base_pv=base_pv)
+    assert empty.empty and list(empty.columns) == list(summary.columns)
+    assert (empty.dtypes == summary.dtypes).all()
+    assert np.isclose(summary.loc[0, "min_vm_pu"], day["min_vm_pu"].min())
+    assert np.isclose(summary.loc[0, "max_line_loading"], day["max_line_loading"].max())
+    streamed = pd.read_csv(out_csv)
+    assert np.allclose(streamed["min_vm_pu"], day["min_vm_pu"])
+
+
+def test_onset_sweep_matches_direct_runs():
+    net = load_france_grid()
+    base_load = net.load["p_mw"].to_numpy(copy=True)
+    base_pv = net.sgen["p_mw"].to_numpy(copy=True)
+    profile = load_fr_load_profile()
+    onsets = pd.to_datetime(["2026-02-04 09:00", "2026-02-04 13:30"])
+
+    sweep, info = run_onset_sweep(net, profile, scenarios=["S5"], onsets=onsets,
+                                  base_load=base_load, base_pv=base_pv)
+    assert info["n_solves"] < 2 * len(profile)
+
+    for onset in onsets:
+        direct = run_timeseries(net, profile, onset, scenario="S5",
+                                base_load=base_load, base_pv=base_pv)
+        row = sweep[sweep["onset"] == onset].iloc[0]
+        assert np.isclose(row["min_vm_pu"], direct["min_vm_pu"].min())
+        assert np.isclose(row["max_line_loading"], direct["max_line_loading"].max())
+
+
+def test_reduced_series_solves_representatives_and_near_limit_steps_exactly():
+    net = load_france_grid()
+    profile = load_fr_load_profile()
+    fleet = attack_fleet_multiplier(net, profile["timestamp"], SimulationConfig().attack_time, "S5")
+    plan = prepare_injections(profile, net.load["p_mw"], net.sgen["p_mw"], fleet)
+    exact = run_injection_series(net, plan)
+
+    # Limit just below the day's lowest voltages: the low-voltage steps fall back to exact solves.
+    v_min = exact["min_vm_pu"].quantile(0.2)
+    config = SimulationConfig(v_min_limit=v_min, reduction_margin_pu=0.002)
+    df, info = run_reduced_series(net, plan, config, n_clusters=8)
+
+    assert info["n_solves"] < len(plan) and info["cluster_sizes"].sum() == len(plan)
+    rows = df["exact"].to_numpy()
+    assert np.allclose(df.loc[rows, "min_vm_pu"], exact.loc[rows, "min_vm_pu"])
+    assert ((df["min_vm_pu"] < v_min) == (exact["min_vm_pu"] < v_min)).all()
+    assert np.abs(df["min_vm_pu"] - exact["min_vm_pu"]).max() < 0.005
+
+
+def test_scenario_catalog_vectorizes_the_per_scenario_attack_logic():
+    net = load_france_grid()
+    catalog = default_catalog()
+    assert catalog is default_catalog()
+    assert get_scenario("S3")["compromised_pct"] == 1.0
+
+    expected = [apply_attack_to_pv(net, name) for name in catalog.scenario]
+    assert np.allclose(catalog.fleet_multipliers(), expected)
+
+    ts = pd.date_range("2026-02-04 11:58", "2026-02-04 12:03", freq="10s")
+    schedules = catalog.schedules(ts, "2026-02-04 12:00")
+    for i, name in enumerate(catalog.scenario):
+        row = get_scenario(name)
+        assert np.allclose(schedules[i], ramp_fleet_multiplier(ts, "2026-02-04 12:00", expected[i],
+                                                               row["ramp_seconds"]))
+
+    family = ScenarioCatalog.family(np.linspace(0, 100, 11), [-100, -50], [0, 60, 300],
+                                    ["fleet", "largest", "smallest"])
+    assert len(family) == 11 * 2 * 3 * 3
+    rated = net.sgen["p_mw"].to_numpy()
+    mult = family.sgen_multipliers(rated)
+    assert mult.shape == (len(family), len(rated))
+    # Unit targets switch whole units plus at most one partial boundary unit;
+    # every target affects exactly compromised_pct of the rated capacity.
+    unit = family.target != "fleet"
+    affected = 1 + family.change_pct_of_affected[:, None] / 100
+    partial = ~(np.isclose(mult, 1.0) | np.isclose(mult, affected))
+    assert (partial[unit].sum(axis=1) <= 1).all()
+    assert np.allclose(mult @ rated / rated.sum(), family.fleet_multipliers())
+    mask = family.compromised_mask(rated)
+    assert np.allclose(mult[mask], np.broadcast_to(affected, mult.shape)[mask])
+    assert not mask[~unit].any()
+    full = family.compromised_pct == 100
+    assert np.allclose(mult[full], affected[full])
+    assert np.allclose(family.subset(np.flatnonzero(~unit)).fleet_multipliers(), mult[~unit, 0])
+
+
+def test_attack_schedules_compose_and_batch():
+    net = load_france_grid()
+    rated = net.sgen["p_mw"].to_numpy()
+    profile = load_fr_load_profile()
+    ts = pd.DatetimeIndex(profile["timestamp"])
+
+    shutdown = StepAttack.from_scenario("S5", "2026-02-04 12:00", rated, end="2026-02-04 14:00")
+    units = np.arange(len(rated)) < 3
+    oscillation = OscillatingAttack("2026-02-04 13:00", depth=0.5, period_s=3600, units=units)
+    campaign = shutdown * oscillation
+
+    sched = campaign.schedule(ts, rated)
+    assert sched.shape == (len(ts), len(rated))
+    assert np.allclose(sched, shutdown.schedule(ts, rated) * oscillation.schedule(ts, rated))
+    assert np.allclose(sched[ts < "2026-02-04 12:00"], 1.0)
+    noon = ts.get_loc(pd.Timestamp("2026-02-04 12:30"))
+    assert np.isclose(campaign.apply(ts[noon], rated), apply_attack_to_pv(net, "S5"))
+    net.sgen["p_mw"] = 0.0   # a night step left behind by a runner does not change the weights
+    assert np.isclose(campaign.apply(ts[noon], rated), apply_attack_to_pv(net, "S5"))
+    # The oscillation only touches its units; the shutdown recovers after `end`.
+    assert np.allclose(oscillation.schedule(ts, rated)[:, ~units], 1.0)
+    assert np.allclose(shutdown.schedule(ts, rated)[ts >= "2026-02-04 14:01"], 1.0)
+
+    variants = run_attack_variants(net, profile, [shutdown, campaign])
+    direct = run_timeseries(net, profile, "2026-02-04 12:00", attack=campaign)
+    batched = variants[variants["variant"] == 1]
+    assert len(variants) == 2 * len(ts)
+    assert np.allclose(batched["min_vm_pu"], direct["min_vm_pu"], atol=1e-6)
@@ -0,0 +1,439 @@
+"""
+Time-series drivers for the pandapower grid model.
+
+Every runner is split in two stages:
+
+1. prepare_injections() turns the profile, the vectorized PV shape and the
+   attack schedule into dense (T × n_load) and (T × n_sgen) P matrices.
+2. run_injection_series() streams those rows into pp.runpp, warm-starting
+   each solve from the previous one. With engine="bfs" the whole plan is
+   solved as one batch by the backward/forward sweep solver instead, with
+   automatic fallback to pp.runpp on meshed grids and for unconverged steps.
+   With an InverterControl (src/inverter_control.py) the steps run through
+   its Volt-VAR / ride-through loop on the Z-bus solver instead.
+
+Passing `store_dir` to a runner additionally records the full (T × n_bus)
+voltage and (T × n_line) loading matrices in a memory-mapped ResultStore.
+
+run_attack_variants stacks the (T × n_sgen) schedules of many CyberAttack
+variants (src/attacks/base_attack.py) and solves them as one Z-bus batch.
+
+The multi-rate driver keeps the 15-minute grid for most of the day and
+refines to `config.fine_step_s` inside a window around the attack ramp and
+detection, so the ramp in `fr_attack_scenarios_S1_S5.csv` is actually resolved.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import pandapower as pp
+
+from src.attacks.attack_fr import apply_attack_to_pv, get_scenario, ramp_fleet_multiplier
+from src.attacks.base_attack import batch_schedules
+from src.load_data.load_profile_fr import interpolate_profile, pv_shape
+from src.powerflow.bfs import BFSSolver, is_radial
+from src.powerflow.network import NetworkModel
+from src.powerflow.zbus import ZBusSolver
+from src.result_store import ResultStore
+
+ENGINES = ("nr", "bfs")
+
+
+@dataclass
+class InjectionPlan:
+    timestamps: pd.DatetimeIndex
+    load_p_mw: np.ndarray          # (T, n_load)
+    sgen_p_mw: np.ndarray          # (T, n_sgen)
+    fleet_multiplier: np.ndarray   # (T,) fleet-wide or (T, n_sgen) per unit
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def compromised(self) -> np.ndarray:
+        """(T × n_sgen) units under attack (multiplier != 1) at each step."""
+        m = self.fleet_multiplier if self.fleet_multiplier.ndim == 2 else self.fleet_multiplier[:, None]
+        return np.broadcast_to(m != 1.0, self.sgen_p_mw.shape)
+
+
+def prepare_injections(profile: pd.DataFrame, base_load, base_pv,
+                       fleet_multiplier=None, seasonal_pv: bool = False) -> InjectionPlan:
+    """
+    Build the full injection schedule up front:
+      load[t, i] = base_load[i] * load_multiplier[t]
+      sgen[t, j] = base_pv[j] * pv_shape[t] * fleet_multiplier[t]
+    `fleet_multiplier` may be a (T,) vector or a (T × n_sgen) array.
+    """
+    timestamps = pd.DatetimeIndex(profile["timestamp"])
+    load_mult = profile["load_multiplier"].to_numpy(dtype=float)
+    base_load = np.asarray(base_load, dtype=float)
+    base_pv = np.asarray(base_pv, dtype=float)
+
+    if fleet_multiplier is None:
+        fleet_multiplier = np.ones(len(timestamps))
+    fleet_multiplier = np.asarray(fleet_multiplier, dtype=float)
+
+    shape = pv_shape(timestamps, seasonal=seasonal_pv)
+    if fleet_multiplier.ndim == 1:
+        sgen = (shape * fleet_multiplier)[:, None] * base_pv[None, :]
+    else:
+        sgen = shape[:, None] * fleet_multiplier * base_pv[None, :]
+
+    return InjectionPlan(
+        timestamps=timestamps,
+        load_p_mw=load_mult[:, None] * base_load[None, :],
+        sgen_p_mw=sgen,
+        fleet_multiplier=fleet_multiplier,
+    )
+
+
+def attack_fleet_multiplier(net, timestamps, attack_time, scenario: str,
+                            ramp: bool = False) -> np.ndarray:
+    """
+    Fleet multiplier schedule for `scenario` starting at `attack_time`.
+
+    ramp=False reproduces the original runners (step change at the 15-minute
+    boundary, and no attack if attack_time is not on the grid);
+    ramp=True follows the scenario's `ramp_seconds`.
+    """
+    ts = pd.DatetimeIndex(timestamps)
+    attack_time = pd.Timestamp(attack_time)
+    if not ramp and not (ts == attack_time).any():
+        return np.ones(len(ts))
+
+    multiplier = apply_attack_to_pv(net, scenario)
+    ramp_seconds = float(get_scenario(scenario)["ramp_seconds"]) if ramp else 0.0
+    return ramp_fleet_multiplier(ts, attack_time, multiplier, ramp_seconds)
+
+
+def _sweep_series(net, plan: InjectionPlan):
+    """
+    Solve every plan row in one backward/forward sweep batch. Returns
+    (vm, loading) arrays, or None if the net is meshed or has elements the
+    compiled model does not cover. Unconverged rows are re-solved with NR.
+    """
+    try:
+        model = NetworkModel.from_net(net)
+    except NotImplementedError:
+        return None
+    if not is_radial(model):
+        return None
+
+    V, converged = BFSSolver(model).solve(model.bus_injections(plan.load_p_mw, plan.sgen_p_mw))
+    vm = np.abs(V)
+    loading = model.line_loading(V, model.line_in_service)
+    for k in np.flatnonzero(~converged):
+        net.load["p_mw"] = plan.load_p_mw[k]
+        net.sgen["p_mw"] = plan.sgen_p_mw[k]
+        pp.runpp(net)
+        vm[k] = net.res_bus["vm_pu"].to_numpy()
+        loading[k] = net.res_line["loading_percent"].to_numpy()
+    return vm, loading
+
+
+def _envelope_frame(timestamps, vm, loading) -> pd.DataFrame:
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "min_vm_pu": np.nanmin(vm, axis=1),
+        "max_vm_pu": np.nanmax(vm, axis=1),
+        "max_line_loading": loading.max(axis=1),
+    })
+
+
+def run_injection_series(net, plan: InjectionPlan, callback=None, store=None,
+                         warm_start: bool = False, engine: str = "nr",
+                         control=None, cascade=None) -> pd.DataFrame:
+    """
+    Stream plan rows into the solver. Per step this only assigns two numpy
+    rows and reads back the result arrays.
+
+    `callback(k, net)` is invoked after each solve for callers that need more
+    than the voltage/loading envelope (e.g. per-line maxima); `store` is a
+    ResultStore that receives every bus voltage and line loading.
+    warm_start=True also warm-starts the first step from the net's existing
+    results (used when a long horizon is fed chunk by chunk).
+    engine="bfs" solves radial feeders in one sweep batch; it falls back to
+    NR for meshed grids and whenever a callback needs the solved net.
+    `cascade` (a SeriesScreen, src/cascade.py) is called once with the
+    plan's injections (the controlled ones with `control`) and the per-step
+    maximum loading after all steps are solved, so it works with every
+    engine.
+    `control` (an InverterControl or ReactiveMitigation) replaces the solver
+    with its control loop, gets the units under attack per step from the
+    plan, and adds the fleet Q and the number of tripped sgens per step.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}")
+    if control is not None and callback is not None:
+        raise ValueError("callbacks need a solved pandapower net; not available with inverter control")
+
+    if control is not None:
+        res = control.run_series(plan.load_p_mw, plan.sgen_p_mw, compromised=plan.compromised())
+        vm = np.abs(res.V)
+        loading = control.model.line_loading(res.V, control.model.line_in_service)
+        if store is not None:
+            store.record_rows(0, vm, loading)
+            store.flush()
+        df = _envelope_frame(plan.timestamps, vm, loading)
+        df["sgen_q_mvar"] = res.q_mvar.sum(axis=1)
+        df["tripped_sgens"] = (~res.active).sum(axis=1)
+        if cascade is not None:
+            # Cascades start from the controlled state: Q setpoints, tripped units and V.
+            S = control.model.bus_injections(plan.load_p_mw, plan.sgen_p_mw * res.active,
+                                             sgen_q_mvar=res.q_mvar)
+            cascade(S, df["max_line_loading"].to_numpy(), res.V)
+        return df
+
+    swept = _sweep_series(net, plan) if engine == "bfs" and callback is None else None
+    if swept is not None:
+        vm, loading = swept
+        if store is not None:
+            store.record_rows(0, vm, loading)
+            store.flush()
+        df = _envelope_frame(plan.timestamps, vm, loading)
+        _screen_cascades(cascade, plan, df["max_line_loading"].to_numpy())
+        return df
+
+    T = len(plan)
+    min_vm = np.empty(T)
+    max_vm = np.empty(T)
+    max_loading = np.empty(T)
+
+    for k in range(T):
+        net.load["p_mw"] = plan.load_p_mw[k]
+        net.sgen["p_mw"] = plan.sgen_p_mw[k]
+        pp.runpp(net, init="results" if (k or warm_start) else "auto")
+
+        vm = net.res_bus["vm_pu"].to_numpy()
+        min_vm[k] = vm.min()
+        max_vm[k] = vm.max()
+        max_loading[k] = net.res_line["loading_percent"].to_numpy().max()
+
+        if store is not None:
+            store.record(k, net)
+        if callback is not None:
+            callback(k, net)
+
+    if store is not None:
+        store.flush()
+    _screen_cascades(cascade, plan, max_loading)
+
+    return pd.DataFrame({
+        "timestamp": plan.timestamps,
+        "min_vm_pu": min_vm,
+        "max_vm_pu": max_vm,
+        "max_line_loading": max_loading,
+    })
+
+
+def _screen_cascades(cascade, plan: InjectionPlan, max_loading) -> None:
+    if cascade is not None and (max_loading > cascade.simulator.trip_loading).any():
+        model = cascade.simulator.model
+        cascade(model.bus_injections(plan.load_p_mw, plan.sgen_p_mw), max_loading)
+
+
+def run_timeseries(net, profile: pd.DataFrame, attack_time, scenario: str = "S3",
+                   with_attack: bool = True, base_load=None, base_pv=None,
+                   callback=None, store_dir=None, engine: str = "nr", control=None,
+                   attack=None, cascade=None) -> pd.DataFrame:
+    """
+    15-minute day with the attack applied as a step at `attack_time`
+    (the behaviour of the original per-row runners). `attack` (a
+    CyberAttack, src/attacks/base_attack.py) replaces the scenario step
+    with its (T × n_sgen) schedule.
+    """
+    base_load = net.load["p_mw"].to_numpy(copy=True) if base_load is None else base_load
+    base_pv = net.sgen["p_mw"].to_numpy(copy=True) if base_pv is None else base_pv
+    attack_time = pd.Timestamp(attack_time)
+    timestamps = pd.DatetimeIndex(profile["timestamp"])
+
+    fleet = None
+    if attack is not None:
+        fleet = attack.schedule(timestamps, base_pv) if with_attack else None
+    elif with_attack:
+        fleet = attack_fleet_multiplier(net, timestamps, attack_time, scenario)
+
+    plan = prepare_injections(profile, base_load, base_pv, fleet)
+    store = None
+    if store_dir is not None:
+        store = ResultStore.create(store_dir, net, plan.timestamps, scenario=scenario,
+                                   with_attack=with_attack, attack_time=attack_time)
+    df = run_injection_series(net, plan, callback=callback, store=store, engine=engine, control=control,
+                              cascade=cascade)
+    df["attack_applied"] = with_attack & (timestamps == attack_time)
+    return df
+
+
+def run_attack_variants(net, profile: pd.DataFrame, attacks, base_load=None, base_pv=None) -> pd.DataFrame:
+    """
+    Day envelopes for K attack variants (CyberAttack schedules), solved as
+    one batched Z-bus solve of K × T cases. One row per (variant, step).
+    """
+    base_load = net.load["p_mw"].to_numpy(copy=True) if base_load is None else np.asarray(base_load)
+    base_pv = net.sgen["p_mw"].to_numpy(copy=True) if base_pv is None else np.asarray(base_pv)
+    timestamps = pd.DatetimeIndex(profile["timestamp"])
+    plan = prepare_injections(profile, base_load, base_pv)
+    K, T = len(attacks), len(timestamps)
+
+    schedules = batch_schedules(attacks, timestamps, base_pv)
+    sgen = plan.sgen_p_mw[None] * schedules
+    load = np.broadcast_to(plan.load_p_mw[None], (K,) + plan.load_p_mw.shape)
+
+    model = NetworkModel.from_net(net)
+    V, _ = ZBusSolver(model).solve(model.bus_injections(load.reshape(K * T, -1), sgen.reshape(K * T, -1)))
+    df = _envelope_frame(np.tile(timestamps, K), np.abs(V), model.line_loading(V, model.line_in_service))
+    df.insert(0, "variant", np.repeat(np.arange(K), T))
+    weights = base_pv if base_pv.sum() > 0 else None
+    df["fleet_multiplier"] = np.average(schedules, axis=2, weights=weights).reshape(-1)
+    return df
+
+
+def multirate_index(coarse_index, windows, fine_step_s: float) -> pd.DatetimeIndex:
+    """
+    Union of the coarse timestamps and fine-step grids covering each
+    (start, end) window. Windows are clipped to the coarse horizon.
+    """
+    coarse = pd.DatetimeIndex(coarse_index)
+    parts = [coarse.values.astype("datetime64[ns]")]
+    step = pd.Timedelta(seconds=fine_step_s)
+
+    for start, end in windows:
+        start = max(pd.Timestamp(start), coarse[0])
+        end = min(pd.Timestamp(end), coarse[-1])
+        if end <= start:
+            continue
+        fine = pd.date_range(start, end, freq=step)
+        parts.append(fine.values.astype("datetime64[ns]"))
+
+    return pd.DatetimeIndex(np.unique(np.concatenate(parts)))
+
+
+def attack_windows(config, ramp_seconds: float):
+    """Refinement window around the attack: ramp plus detection, padded both sides."""
+    attack_time = pd.to_datetime(config.attack_time)
+    settle_s = max(ramp_seconds, config.detection_delay_s)
+    return [(
+        attack_time - pd.Timedelta(seconds=config.fine_window_pre_s),
+        attack_time + pd.Timedelta(seconds=settle_s + config.fine_window_post_s),
+    )]
+
+
+def run_multirate_timeseries(net, profile: pd.DataFrame, config,
+                             scenario: str = "S3", with_attack: bool = True,
+                             base_load=None, base_pv=None, store_dir=None,
+                             engine: str = "nr", control=None, attack=None) -> pd.DataFrame:
+    """
+    Multi-rate time series: 15-minute steps away from the attack,
+    `config.fine_step_s` steps inside the attack window.
+
+    Load and PV are interpolated onto the mixed grid in one vectorized pass
+    and the attack follows its `ramp_seconds` ramp. `attack` (a CyberAttack)
+    replaces the scenario's fleet multiplier with its (T × n_sgen)
+    schedule; the window still follows the scenario.
+    """
+    base_load = net.load["p_mw"].to_numpy(copy=True) if base_load is None else base_load
+    base_pv = net.sgen["p_mw"].to_numpy(copy=True) if base_pv is None else base_pv
+    attack_time = pd.to_datetime(config.attack_time)
+
+    ramp_seconds = float(get_scenario(scenario)["ramp_seconds"]) if with_attack else 0.0
+    index = multirate_index(profile["timestamp"], attack_windows(config, ramp_seconds), config.fine_step_s)
+
+    fleet = None
+    if with_attack:
+        fleet = (attack_fleet_multiplier(net, index, attack_time, scenario, ramp=True) if attack is None
+                 else attack.schedule(index, base_pv))
+
+    plan = prepare_injections(interpolate_profile(profile, index), base_load, base_pv, fleet)
+    store = None
+    if store_dir is not None:
+        store = ResultStore.create(store_dir, net, index, scenario=scenario, with_attack=with_attack,
+                                   attack_time=attack_time, fine_step_s=config.fine_step_s)
+    df = run_injection_series(net, plan, store=store, engine=engine, control=control)
+
+    step_s = np.diff(index.values.astype("datetime64[ns]").astype(np.int64), prepend=0) / 1e9
+    step_s[0] = 0.0
+    df.insert(1, "step_s", step_s)
+    fleet = plan.fleet_multiplier
+    if fleet.ndim == 2:
+        fleet = np.average(fleet, axis=1, weights=base_pv) if np.sum(base_pv) > 0 else fleet.mean(axis=1)
+    df.insert(2, "fleet_multiplier", fleet)
+    df["attack_applied"] = with_attack & (index == attack_time)
+    return df
+
+
+def stream_timeseries(net, chunks, config, scenario: str = "S3", with_attack: bool = True,
+                      daily_attack: bool = True, seasonal_pv: bool = True,
+                      out_csv=None, base_load=None, base_pv=None, engine: str = "nr") -> pd.DataFrame:
+    """
+    Bounded-memory runner for long horizons (months to a year, 15-minute or
+    1-minute steps). `chunks` is any iterable of profile DataFrames, e.g.
+    iter_load_profile() or iter_tiled_profile().
+
+    Each chunk is turned into an InjectionPlan, solved, appended to `out_csv`
+    (if given) and folded into a per-month summary; nothing else is kept, so
+    memory is flat regardless of horizon.
+
+    daily_attack=True repeats the attack every day at the clock time of
+    config.attack_time (PV stays derated until midnight); otherwise a single
+    step attack at config.attack_time persists to the end of the horizon.
+    """
+    base_load = net.load["p_mw"].to_numpy(copy=True) if base_load is None else base_load
+    base_pv = net.sgen["p_mw"].to_numpy(copy=True) if base_pv is None else base_pv
+    attack_time = pd.to_datetime(config.attack_time)
+    attack_tod = attack_time - attack_time.normalize()
+    multiplier = apply_attack_to_pv(net, scenario) if with_attack else 1.0
+
+    summary = {}
+    header = True
+    for i, chunk in enumerate(chunks):
+        ts = pd.DatetimeIndex(chunk["timestamp"])
+        if daily_attack:
+            attacked = (ts - ts.normalize()) >= attack_tod
+        else:
+            attacked = ts >= attack_time
+        fleet = np.where(attacked, multiplier, 1.0)
+
+        plan = prepare_injections(chunk, base_load, base_pv, fleet, seasonal_pv=seasonal_pv)
+        df = run_injection_series(net, plan, warm_start=i > 0, engine=engine)
+        df["fleet_multiplier"] = fleet
+
+        if out_csv is not None:
+            df.to_csv(out_csv, mode="w" if header else "a", header=header, index=False)
+            header = False
+
+        month = df["timestamp"].dt.to_period("M")
+        stats = pd.DataFrame({
+            "steps": df.groupby(month).size(),
+            "min_vm_pu": df.groupby(month)["min_vm_pu"].min(),
+            "max_vm_pu": df.groupby(month)["max_vm_pu"].max(),
+            "max_line_loading": df.groupby(month)["max_line_loading"].max(),
+            "undervoltage_steps": (df["min_vm_pu"] < config.v_min_limit).groupby(month).sum(),
+            "overvoltage_steps": (df["max_vm_pu"] > config.v_max_limit).groupby(month).sum(),
+            "overload_steps": (df["max_line_loading"] > config.max_line_loading).groupby(month).sum(),
+        })
+        for period, row in stats.iterrows():
+            summary[period] = _merge_month(summary.get(period), row)
+
+    counts = ["steps", "undervoltage_steps", "overvoltage_steps", "overload_steps"]
+    if not summary:
+        columns = ["steps", "min_vm_pu", "max_vm_pu", "max_line_loading"] + counts[1:]
+        return pd.DataFrame({"month": pd.PeriodIndex([], freq="M"),
+                             **{c: pd.Series(dtype=int if c in counts else float) for c in columns}})
+    out = pd.DataFrame.from_dict(summary, orient="index").sort_index()
+    out.index.name = "month"
+    out[counts] = out[counts].astype(int)
+    return out.reset_index()
+
+
+def _merge_month(acc, row):
+    if acc is None:
+        return row.to_dict()
+    return {
+        "steps": acc["steps"] + row["steps"],
+        "min_vm_pu": min(acc["min_vm_pu"], row["min_vm_pu"]),
+        "max_vm_pu": max(acc["max_vm_pu"], row["max_vm_pu"]),
+        "max_line_loading": max(acc["max_line_loading"], row["max_line_loading"]),
+        "undervoltage_steps": acc["undervoltage_steps"] + row["undervoltage_steps"],
+        "overvoltage_steps": acc["overvoltage_steps"] + row["overvoltage_steps"],
+        "overload_steps": acc["overload_steps"] + row["overload_steps"],
+    }
@@ -2,11 +2,29 @@ from pathlib import Path
 
 import pandas as pd
 
+from src.result_store import ResultStore
+
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 
 BASE_CSV = PROJECT_ROOT / "results" / "timeseries_BASE_no_attack_with_pv_profile.csv"
 ATTACK_CSV = PROJECT_ROOT / "results" / "timeseries_S3_attack_12_00_with_pv_profile.csv"
 
+def bus_voltage_extremes(store_dir, start=None, end=None) -> pd.DataFrame:
+    """
+    Per-bus min/max voltage and when it happened, read from a ResultStore
+    (optionally restricted to a [start, end] time window).
+    """
+    store = ResultStore.open(store_dir)
+    df = store.column_extremes("vm_pu", store.rows(start, end))
+    return df.rename(columns={
+        "name": "bus_name",
+        "min": "min_vm_pu",
+        "time_of_min": "time_of_min_vm",
+        "max": "max_vm_pu",
+        "time_of_max": "time_of_max_vm",
+    })
+
+
 def main():
     base = pd.read_csv(BASE_CSV)
     atk = pd.read_csv(ATTACK_CSV)